@@ -0,0 +1,8 @@
+from .codecs import alaw_to_pcm16, pcm16_to_alaw, pcm16_to_ulaw, ulaw_to_pcm16
+from .converter import TelephonyConverter, convert_to_telephony
+from .pcm import PCMFramer, downmix, is_pcm16_wav, read_wav, write_wav
+from .resample import Resampler, resample
+from .vad import SilenceTrimmer, TrimResult
+from .segment import split_at_silence
+from .join import audio_container, join_audio
+from .fake_source import FakeAudioSource
@@ -0,0 +1,106 @@
+import numpy as np
+
+# G.711 constants, following the reference (Sun Microsystems) implementation
+_ULAW_BIAS = 0x84
+_ULAW_CLIP = 8159
+_ULAW_SEGMENT_ENDS = np.array([0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF, 0x1FFF])
+_ALAW_SEGMENT_ENDS = np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF])
+
+
+def _build_ulaw_encode_table() -> np.ndarray:
+    samples = np.arange(-32768, 32768, dtype=np.int32) >> 2
+    negative = samples < 0
+    mask = np.where(negative, 0x7F, 0xFF)
+    magnitude = np.minimum(np.where(negative, -samples, samples), _ULAW_CLIP) + (_ULAW_BIAS >> 2)
+    segment = np.searchsorted(_ULAW_SEGMENT_ENDS, magnitude)
+    code = (np.minimum(segment, 7) << 4) | ((magnitude >> (segment + 1)) & 0x0F)
+    code = np.where(segment >= 8, 0x7F, code)
+    return (code ^ mask).astype(np.uint8)
+
+
+def _build_ulaw_decode_table() -> np.ndarray:
+    codes = ~np.arange(256, dtype=np.int32) & 0xFF
+    exponent = (codes >> 4) & 0x07
+    mantissa = codes & 0x0F
+    magnitude = (((mantissa << 3) + _ULAW_BIAS) << exponent) - _ULAW_BIAS
+    return np.where(codes & 0x80, -magnitude, magnitude).astype(np.int16)
+
+
+def _build_alaw_encode_table() -> np.ndarray:
+    samples = np.arange(-32768, 32768, dtype=np.int32) >> 3
+    negative = samples < 0
+    mask = np.where(negative, 0x55, 0xD5)
+    magnitude = np.where(negative, -samples - 1, samples)
+    segment = np.searchsorted(_ALAW_SEGMENT_ENDS, magnitude)
+    shift = np.where(segment < 2, 1, segment)
+    code = (np.minimum(segment, 7) << 4) | ((magnitude >> shift) & 0x0F)
+    code = np.where(segment >= 8, 0x7F, code)
+    return (code ^ mask).astype(np.uint8)
+
+
+def _build_alaw_decode_table() -> np.ndarray:
+    codes = np.arange(256, dtype=np.int32) ^ 0x55
+    segment = (codes & 0x70) >> 4
+    magnitude = (codes & 0x0F) << 4
+    magnitude = np.where(segment == 0, magnitude + 8, magnitude + 0x108)
+    magnitude = np.where(segment > 1, magnitude << np.maximum(segment - 1, 0), magnitude)
+    return np.where(codes & 0x80, magnitude, -magnitude).astype(np.int16)
+
+
+# Lookup tables: encoding is indexed by the sample reinterpreted as uint16 offset by 32768
+_ULAW_ENCODE = _build_ulaw_encode_table()
+_ULAW_DECODE = _build_ulaw_decode_table()
+_ALAW_ENCODE = _build_alaw_encode_table()
+_ALAW_DECODE = _build_alaw_decode_table()
+
+
+def pcm16_to_ulaw(samples: np.ndarray) -> np.ndarray:
+    """
+    Encode 16-bit PCM samples to G.711 mu-law.
+
+    Args:
+        samples (np.ndarray): int16 samples.
+
+    Returns:
+        np.ndarray: uint8 mu-law codes, one per sample.
+    """
+    return _ULAW_ENCODE[samples.astype(np.int32) + 32768]
+
+
+def ulaw_to_pcm16(codes: np.ndarray) -> np.ndarray:
+    """
+    Decode G.711 mu-law codes to 16-bit PCM samples.
+
+    Args:
+        codes (np.ndarray): uint8 mu-law codes.
+
+    Returns:
+        np.ndarray: int16 samples, one per code.
+    """
+    return _ULAW_DECODE[codes]
+
+
+def pcm16_to_alaw(samples: np.ndarray) -> np.ndarray:
+    """
+    Encode 16-bit PCM samples to G.711 A-law.
+
+    Args:
+        samples (np.ndarray): int16 samples.
+
+    Returns:
+        np.ndarray: uint8 A-law codes, one per sample.
+    """
+    return _ALAW_ENCODE[samples.astype(np.int32) + 32768]
+
+
+def alaw_to_pcm16(codes: np.ndarray) -> np.ndarray:
+    """
+    Decode G.711 A-law codes to 16-bit PCM samples.
+
+    Args:
+        codes (np.ndarray): uint8 A-law codes.
+
+    Returns:
+        np.ndarray: int16 samples, one per code.
+    """
+    return _ALAW_DECODE[codes]
@@ -0,0 +1,99 @@
+import numpy as np
+
+from aiphonecall.audio.codecs import pcm16_to_alaw, pcm16_to_ulaw
+from aiphonecall.audio.pcm import downmix
+from aiphonecall.audio.resample import Resampler
+
+_ENCODERS = {
+    "ulaw": pcm16_to_ulaw,
+    "alaw": pcm16_to_alaw,
+    "linear16": lambda samples: samples.astype("<i2"),
+}
+
+
+class TelephonyConverter:
+    """
+    Streaming conversion of 16-bit PCM to a telephony format.
+
+    Chains downmixing, resampling and G.711 encoding over byte chunks as they
+    arrive from a TTS stream, e.g. 24 kHz PCM from OpenAI to 8 kHz mu-law for a
+    phone call. Chunks may be split anywhere; an odd trailing byte is carried
+    over to the next chunk.
+
+    Attributes:
+        from_rate (int): Sample rate of the input in Hz.
+        channels (int): Number of interleaved channels of the input.
+        to_rate (int): Sample rate of the output in Hz.
+        encoding (str): Encoding of the output, "ulaw", "alaw" or "linear16".
+    """
+
+    def __init__(self, from_rate: int, channels: int = 1, to_rate: int = 8000, encoding: str = "ulaw"):
+        """
+        Initialize the converter.
+
+        Args:
+            from_rate (int): Sample rate of the input in Hz.
+            channels (int): Number of interleaved channels of the input, defaults to 1.
+            to_rate (int): Sample rate of the output in Hz, defaults to 8000.
+            encoding (str): Encoding of the output, "ulaw" (default), "alaw" or "linear16".
+
+        Raises:
+            ValueError: If the encoding is not supported.
+        """
+        if encoding not in _ENCODERS:
+            raise ValueError(f"Unsupported encoding {encoding!r}, expected one of {sorted(_ENCODERS)}")
+        self.from_rate = from_rate
+        self.channels = channels
+        self.to_rate = to_rate
+        self.encoding = encoding
+        self._resampler = Resampler(from_rate, to_rate)
+        self._remainder = b""
+
+    def process(self, chunk: bytes) -> bytes:
+        """
+        Convert the next chunk of little-endian 16-bit PCM.
+
+        Args:
+            chunk (bytes): The next chunk of input audio.
+
+        Returns:
+            bytes: The converted audio that can be produced so far.
+        """
+        data = self._remainder + chunk
+        frame = 2 * self.channels
+        usable = len(data) - len(data) % frame
+        self._remainder = data[usable:]
+        samples = downmix(np.frombuffer(data[:usable], dtype="<i2"), self.channels)
+        return self._encode(self._resampler.process(samples))
+
+    def flush(self) -> bytes:
+        """
+        Return the audio still held back by the resampler and reset the converter.
+
+        Returns:
+            bytes: The remaining converted audio.
+        """
+        self._remainder = b""
+        return self._encode(self._resampler.flush(np.int16))
+
+    def _encode(self, samples: np.ndarray) -> bytes:
+        return _ENCODERS[self.encoding](samples).tobytes()
+
+
+def convert_to_telephony(audio: bytes, from_rate: int, channels: int = 1, to_rate: int = 8000,
+                         encoding: str = "ulaw") -> bytes:
+    """
+    Convert a complete buffer of little-endian 16-bit PCM to a telephony format.
+
+    Args:
+        audio (bytes): The input audio.
+        from_rate (int): Sample rate of the input in Hz.
+        channels (int): Number of interleaved channels of the input, defaults to 1.
+        to_rate (int): Sample rate of the output in Hz, defaults to 8000.
+        encoding (str): Encoding of the output, "ulaw" (default), "alaw" or "linear16".
+
+    Returns:
+        bytes: The converted audio.
+    """
+    converter = TelephonyConverter(from_rate, channels, to_rate, encoding)
+    return converter.process(audio) + converter.flush()
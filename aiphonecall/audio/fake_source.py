@@ -0,0 +1,125 @@
+import asyncio
+import time
+from typing import AsyncIterator
+
+import numpy as np
+
+from aiphonecall.audio.pcm import PCMFramer, downmix, read_wav
+from aiphonecall.audio.resample import resample
+
+
+class FakeAudioSource:
+    """
+    Local stand-in for the inbound audio of a phone call.
+
+    A script of audio, silence and tones is built with the `add_*` methods and
+    played as 16-bit PCM frames of `frame_ms`, paced like a real media stream
+    (or faster, with `speed`). Drives a `CallSession` or a live STT session
+    without a telephony provider. The source can be iterated more than once.
+
+    Attributes:
+        sample_rate (int): Sample rate of the frames in Hz.
+        frame_ms (int): Duration of a frame in milliseconds.
+        speed (float): Playback speed; 0 plays the frames without pacing.
+        frames_sent (int): Number of frames played by the current iteration.
+    """
+
+    def __init__(self, sample_rate: int = 8000, frame_ms: int = 20, speed: float = 1.0):
+        """
+        Initialize an empty source.
+
+        Args:
+            sample_rate (int): Sample rate of the frames in Hz, defaults to 8000.
+            frame_ms (int): Duration of a frame in milliseconds, defaults to 20.
+            speed (float): Playback speed, defaults to 1 (real time). 0 plays the frames as
+                fast as they are consumed.
+        """
+        if speed < 0:
+            raise ValueError(f"speed must not be negative, got {speed}")
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.speed = speed
+        self.frames_sent = 0
+        self._script: list[bytes] = []
+
+    @property
+    def bytes_per_second(self) -> int:
+        """
+        int: Bytes of audio per second of the frames.
+        """
+        return self.sample_rate * 2
+
+    @property
+    def duration(self) -> float:
+        """
+        float: Seconds of audio in the script.
+        """
+        return sum(len(part) for part in self._script) / self.bytes_per_second
+
+    def add_audio(self, audio: bytes) -> "FakeAudioSource":
+        """
+        Append audio to the script.
+
+        Args:
+            audio (bytes): A 16-bit PCM WAV file, converted to mono at the sample rate of
+                the source, or raw little-endian 16-bit mono PCM at that rate.
+
+        Returns:
+            FakeAudioSource: The source, for chaining.
+        """
+        decoded = read_wav(audio)
+        if decoded is not None:
+            samples, sample_rate, channels = decoded
+            samples = resample(downmix(samples, channels), sample_rate, self.sample_rate)
+            audio = samples.astype("<i2").tobytes()
+        self._script.append(bytes(audio[:len(audio) - len(audio) % 2]))
+        return self
+
+    def add_silence(self, seconds: float) -> "FakeAudioSource":
+        """
+        Append silence to the script.
+
+        Args:
+            seconds (float): Duration of the silence.
+
+        Returns:
+            FakeAudioSource: The source, for chaining.
+        """
+        self._script.append(bytes(int(seconds * self.sample_rate) * 2))
+        return self
+
+    def add_tone(self, seconds: float, frequency: float = 440.0, amplitude: float = 0.3) -> "FakeAudioSource":
+        """
+        Append a sine tone to the script, e.g. as a stand-in for speech for a voice
+        activity detector.
+
+        Args:
+            seconds (float): Duration of the tone.
+            frequency (float): Frequency in Hz, defaults to 440.
+            amplitude (float): Amplitude relative to full scale, defaults to 0.3.
+
+        Returns:
+            FakeAudioSource: The source, for chaining.
+        """
+        t = np.arange(int(seconds * self.sample_rate)) / self.sample_rate
+        samples = amplitude * 32767 * np.sin(2 * np.pi * frequency * t)
+        self._script.append(samples.astype("<i2").tobytes())
+        return self
+
+    def __aiter__(self) -> AsyncIterator[bytes]:
+        return self._frames()
+
+    async def _frames(self) -> AsyncIterator[bytes]:
+        framer = PCMFramer(self.sample_rate, self.frame_ms, sample_width=2)
+        interval = self.frame_ms / 1000 / self.speed if self.speed else 0.0
+        self.frames_sent = 0
+        start = time.monotonic()
+        for part in self._script:
+            for frame in framer.feed(part):
+                yield frame
+                self.frames_sent += 1
+                # Paced against the start so that slow consumers don't accumulate drift
+                await asyncio.sleep(max(0.0, start + self.frames_sent * interval - time.monotonic()))
+        for frame in framer.flush(pad=b"\x00"):
+            yield frame
+            self.frames_sent += 1
@@ -0,0 +1,175 @@
+import struct
+from enum import Enum
+from typing import Iterable, Optional, Union
+
+# Bitrates in kbit/s of MPEG audio layer III, by MPEG-1 / MPEG-2 and 2.5 and bitrate index
+_MP3_BITRATES = {
+    1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates in Hz by version bits (MPEG-2.5, reserved, MPEG-2, MPEG-1) and sample rate index
+_MP3_SAMPLE_RATES = {
+    0b00: (11025, 12000, 8000),
+    0b10: (22050, 24000, 16000),
+    0b11: (44100, 48000, 32000),
+}
+_RAW_PREFIXES = ("pcm", "linear16", "mulaw", "ulaw", "alaw")
+
+
+def audio_container(output_format: Union[str, Enum, None]) -> str:
+    """
+    Tell how audio of a TTS output format is laid out, to join segments of it.
+
+    Args:
+        output_format (Union[str, Enum, None]): A provider output format, e.g.
+            "mp3_44100_128" or OpenAITTSOutputFormats.WAV. None is the providers'
+            default, MP3.
+
+    Returns:
+        str: "mp3", "wav", "raw" (headerless samples), "stream" (self-delimiting
+        packets that may be concatenated, Ogg and ADTS) or "flac".
+    """
+    value = output_format.value if isinstance(output_format, Enum) else output_format or "mp3"
+    name = value.lower()
+    if name.startswith("mp3"):
+        return "mp3"
+    if name.startswith("wav"):
+        return "wav"
+    if name.startswith(_RAW_PREFIXES):
+        return "raw"
+    if name.startswith(("opus", "aac")):
+        return "stream"
+    return name.split("_")[0]
+
+
+def join_audio(parts: Iterable[bytes], container: str) -> bytes:
+    """
+    Concatenate separately synthesized segments into one playable file.
+
+    - raw and stream: the bytes are concatenated.
+    - mp3: every segment is cut to whole frames, ID3 tags are kept only at the
+      start and end of the result, and Xing/Info/VBRI header frames are dropped,
+      since their frame counts describe a single segment (decoders fall back to
+      the frame headers, which stay valid across the join).
+    - wav: the sample data of all segments is placed in one data chunk behind
+      the header of the first, with the sizes rewritten.
+
+    Args:
+        parts (Iterable[bytes]): The segments, in order.
+        container (str): The layout, as returned by `audio_container`.
+
+    Returns:
+        bytes: The joined audio.
+
+    Raises:
+        ValueError: If the container can't be joined (FLAC), or WAV segments differ
+            in format.
+    """
+    parts = list(parts)
+    if container in ("raw", "stream") or len(parts) == 1:
+        return b"".join(parts)
+    if container == "mp3":
+        return _join_mp3(parts)
+    if container == "wav":
+        return _join_wav(parts)
+    raise ValueError(f"Segments of {container!r} audio can't be joined; use MP3, WAV or raw PCM")
+
+
+def _join_mp3(parts: list[bytes]) -> bytes:
+    joined = bytearray()
+    last = len(parts) - 1
+    for index, part in enumerate(parts):
+        tag_length = _id3v2_length(part)
+        if index == 0:
+            joined += part[:tag_length]
+        body = part[tag_length:]
+        trailer = b""
+        if len(body) >= 128 and body[-128:-125] == b"TAG":
+            body, trailer = body[:-128], body[-128:]
+        joined += _mp3_frames(body)
+        if index == last:
+            joined += trailer
+    return bytes(joined)
+
+
+def _id3v2_length(data: bytes) -> int:
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    # Tag size is a 28 bit "syncsafe" integer, excluding the header and footer
+    size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+    return 10 + size + (10 if data[5] & 0x10 else 0)
+
+
+def _mp3_frame_length(header: bytes) -> Optional[int]:
+    if len(header) < 4 or header[0] != 0xFF or header[1] & 0xE0 != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x03
+    layer = (header[1] >> 1) & 0x03
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    # Only layer III, as produced by the TTS services, with a fixed bitrate index
+    if version == 0b01 or layer != 0b01 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    mpeg1 = version == 0b11
+    bitrate = _MP3_BITRATES[1 if mpeg1 else 2][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    padding = (header[2] >> 1) & 0x01
+    return (144 if mpeg1 else 72) * bitrate // sample_rate + padding
+
+
+def _is_info_frame(frame: bytes) -> bool:
+    mpeg1 = (frame[1] >> 3) & 0x03 == 0b11
+    mono = frame[3] >> 6 == 0b11
+    side_info = (17 if mono else 32) if mpeg1 else (9 if mono else 17)
+    tag = frame[4 + side_info:8 + side_info]
+    return tag in (b"Xing", b"Info") or frame[36:40] == b"VBRI"
+
+
+def _mp3_frames(body: bytes) -> bytes:
+    position = 0
+    first = True
+    start = 0
+    while position < len(body):
+        length = _mp3_frame_length(body[position:position + 4])
+        if length is None:
+            # Lost sync (not a layer III stream we understand); keep the rest as is
+            return body[start:]
+        if position + length > len(body):
+            # Truncated last frame
+            return body[start:position]
+        if first and _is_info_frame(body[position:position + length]):
+            start = position + length
+        first = False
+        position += length
+    return body[start:]
+
+
+def _wav_chunks(data: bytes) -> tuple[bytes, bytes]:
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Segment is not a WAV file")
+    fmt = None
+    position = 12
+    while position + 8 <= len(data):
+        chunk_id = data[position:position + 4]
+        (size,) = struct.unpack("<I", data[position + 4:position + 8])
+        body = position + 8
+        if chunk_id == b"fmt ":
+            fmt = data[body:body + size]
+        elif chunk_id == b"data":
+            # Streamed WAV files carry a placeholder size; the data runs to the end
+            if fmt is None:
+                raise ValueError("WAV segment has no fmt chunk before its data")
+            return fmt, data[body:min(body + size, len(data))]
+        position = body + size + (size & 1)
+    raise ValueError("WAV segment has no data chunk")
+
+
+def _join_wav(parts: list[bytes]) -> bytes:
+    chunks = [_wav_chunks(part) for part in parts]
+    fmt = chunks[0][0]
+    if any(other != fmt for other, _ in chunks[1:]):
+        raise ValueError("WAV segments differ in format and can't be joined")
+    samples = b"".join(data for _, data in chunks)
+    header = b"fmt " + struct.pack("<I", len(fmt)) + fmt + (b"\0" if len(fmt) & 1 else b"")
+    body = b"WAVE" + header + b"data" + struct.pack("<I", len(samples)) + samples + (b"\0" if len(samples) & 1 else b"")
+    return b"RIFF" + struct.pack("<I", len(body)) + body
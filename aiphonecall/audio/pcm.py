@@ -0,0 +1,157 @@
+import io
+import wave
+from typing import Optional
+
+import numpy as np
+
+
+def downmix(samples: np.ndarray, channels: int) -> np.ndarray:
+    """
+    Mix interleaved multi-channel samples down to mono.
+
+    Args:
+        samples (np.ndarray): Interleaved samples; a trailing partial frame is dropped.
+        channels (int): Number of interleaved channels.
+
+    Returns:
+        np.ndarray: The mono samples, with the dtype of the input.
+    """
+    if channels == 1:
+        return samples
+    frames = samples[:len(samples) - len(samples) % channels].reshape(-1, channels)
+    return frames.mean(axis=1, dtype=np.float32).astype(samples.dtype)
+
+
+def read_wav(audio: bytes) -> Optional[tuple[np.ndarray, int, int]]:
+    """
+    Decode a 16-bit PCM WAV file.
+
+    Args:
+        audio (bytes): The WAV file.
+
+    Returns:
+        Optional[tuple[np.ndarray, int, int]]: The interleaved int16 samples, the sample
+        rate and the number of channels, or None if the audio is not a 16-bit PCM WAV
+        file.
+    """
+    if audio[:4] != b"RIFF" or audio[8:12] != b"WAVE":
+        return None
+    try:
+        with wave.open(io.BytesIO(audio), "rb") as reader:
+            if reader.getsampwidth() != 2:
+                return None
+            frames = reader.readframes(reader.getnframes())
+            return np.frombuffer(frames, dtype="<i2"), reader.getframerate(), reader.getnchannels()
+    except (wave.Error, EOFError):
+        return None
+
+
+def is_pcm16_wav(header: bytes) -> bool:
+    """
+    Tell from its first bytes whether a file is a 16-bit PCM WAV file.
+
+    Args:
+        header (bytes): The start of the file, up to and including its 'fmt ' chunk
+            (the first few hundred bytes are enough for common files).
+
+    Returns:
+        bool: Whether the header describes 16-bit PCM audio, as `read_wav` decodes.
+    """
+    if header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+        return False
+    position = 12
+    while position + 8 <= len(header):
+        size = int.from_bytes(header[position + 4:position + 8], "little")
+        if header[position:position + 4] == b"fmt ":
+            fmt = header[position + 8:position + 24]
+            return len(fmt) == 16 and fmt[0:2] == b"\x01\x00" and fmt[14:16] == b"\x10\x00"
+        # Chunks are padded to an even size
+        position += 8 + size + size % 2
+    return False
+
+
+def write_wav(samples: np.ndarray, sample_rate: int, channels: int = 1) -> bytes:
+    """
+    Encode samples as a 16-bit PCM WAV file.
+
+    Args:
+        samples (np.ndarray): Interleaved int16 samples.
+        sample_rate (int): Sample rate in Hz.
+        channels (int): Number of interleaved channels, defaults to 1.
+
+    Returns:
+        bytes: The WAV file.
+    """
+    output = io.BytesIO()
+    with wave.open(output, "wb") as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(samples.astype("<i2").tobytes())
+    return output.getvalue()
+
+
+class PCMFramer:
+    """
+    Splits a stream of raw audio bytes into fixed-duration frames.
+
+    Audio arrives from providers in network-sized chunks that don't line up with
+    samples, let alone with the 20 ms frames telephony media streams expect.
+    The framer buffers the remainder between chunks so every frame it returns is
+    complete.
+
+    Attributes:
+        frame_bytes (int): Size of a frame in bytes.
+    """
+
+    def __init__(self, sample_rate: int = 8000, frame_ms: int = 20, sample_width: int = 1, channels: int = 1):
+        """
+        Initialize the framer.
+
+        Args:
+            sample_rate (int): Sample rate of the audio in Hz, defaults to 8000.
+            frame_ms (int): Duration of a frame in milliseconds, defaults to 20.
+            sample_width (int): Bytes per sample, defaults to 1 (G.711).
+            channels (int): Number of interleaved channels, defaults to 1.
+        """
+        self.frame_bytes = sample_rate * frame_ms // 1000 * sample_width * channels
+        self._buffer = bytearray()
+
+    def feed(self, chunk: bytes) -> list[bytes]:
+        """
+        Add the next chunk of audio and return the frames it completes.
+
+        The frames are taken out of the buffer before returning, so a caller that
+        stops using them early (e.g. on a barge-in) doesn't get them again.
+
+        Args:
+            chunk (bytes): The next chunk of audio.
+
+        Returns:
+            list[bytes]: The completed frames, each exactly `frame_bytes` long.
+        """
+        self._buffer += chunk
+        complete = len(self._buffer) - len(self._buffer) % self.frame_bytes
+        frames = [bytes(self._buffer[start:start + self.frame_bytes])
+                  for start in range(0, complete, self.frame_bytes)]
+        del self._buffer[:complete]
+        return frames
+
+    def flush(self, pad: bytes = b"") -> list[bytes]:
+        """
+        Return the remaining partial frame, if any, and reset the framer.
+
+        Args:
+            pad (bytes): A single byte to pad the last frame to full length with (e.g.
+                b"\\xff" for mu-law silence), or b"" to return it short.
+
+        Returns:
+            list[bytes]: The last frame, or an empty list if nothing was buffered.
+        """
+        if not self._buffer:
+            return []
+        remainder = bytes(self._buffer)
+        self._buffer.clear()
+        if pad:
+            remainder += pad * (self.frame_bytes - len(remainder))
+        return [remainder]
@@ -0,0 +1,146 @@
+from math import gcd
+
+import numpy as np
+
+
+class Resampler:
+    """
+    Streaming polyphase resampler for rational sample-rate ratios.
+
+    Converts by the ratio to_rate / from_rate = L / M with a windowed-sinc
+    low-pass filter split into L phases of `taps` coefficients each, so every
+    output sample costs `taps` multiply-adds no matter how large L and M are.
+    Each call of `process` is computed as one vectorized gather + dot product
+    over the whole chunk; the filter history is carried over between chunks, so
+    feeding a signal in pieces gives the same output as feeding it at once.
+
+    The output is aligned with the input (the filter delay is compensated),
+    which means the last `taps / 2` input samples are only turned into output by
+    `flush`.
+
+    Attributes:
+        from_rate (int): Sample rate of the input in Hz.
+        to_rate (int): Sample rate of the output in Hz.
+        taps (int): Filter coefficients per output sample.
+    """
+
+    def __init__(self, from_rate: int, to_rate: int, taps: int = 32):
+        """
+        Initialize the resampler.
+
+        Args:
+            from_rate (int): Sample rate of the input in Hz.
+            to_rate (int): Sample rate of the output in Hz.
+            taps (int): Filter coefficients per output sample, defaults to 32. More taps
+                give a sharper anti-aliasing filter at a proportional CPU cost.
+        """
+        if from_rate <= 0 or to_rate <= 0:
+            raise ValueError(f"Sample rates must be positive, got {from_rate} and {to_rate}")
+        if taps < 2 or taps % 2:
+            raise ValueError(f"taps must be a positive even number, got {taps}")
+        self.from_rate = from_rate
+        self.to_rate = to_rate
+        self.taps = taps
+        divisor = gcd(from_rate, to_rate)
+        self._up = to_rate // divisor
+        self._down = from_rate // divisor
+        self._filter = self._design_filter()
+        # The last `taps` input samples, preceded by zeros before the first chunk
+        self._history = np.zeros(taps, dtype=np.float32)
+        self._consumed = 0
+        self._produced = 0
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Resample the next chunk of the signal.
+
+        Args:
+            samples (np.ndarray): The next mono samples, int16 or float.
+
+        Returns:
+            np.ndarray: The output samples that can be computed so far, with the dtype
+            of the input (int16 output is rounded and clipped).
+        """
+        dtype = samples.dtype
+        if self._up == self._down:
+            return samples.copy()
+        signal = np.concatenate([self._history, samples.astype(np.float32)])
+        self._consumed += len(samples)
+        output = self._compute(signal, self._consumed)
+        self._history = signal[-self.taps:]
+        return self._cast(output, dtype)
+
+    def flush(self, dtype=np.int16) -> np.ndarray:
+        """
+        Return the output still held back by the filter delay and reset the resampler.
+
+        Args:
+            dtype: dtype of the returned samples, defaults to int16.
+
+        Returns:
+            np.ndarray: The remaining output samples.
+        """
+        if self._up == self._down:
+            return np.zeros(0, dtype=dtype)
+        signal = np.concatenate([self._history, np.zeros(self.taps // 2, dtype=np.float32)])
+        total = -(-self._consumed * self._up // self._down)
+        output = self._compute(signal, self._consumed + self.taps // 2, limit=total)
+        self._history = np.zeros(self.taps, dtype=np.float32)
+        self._consumed = self._produced = 0
+        return self._cast(output, dtype)
+
+    def _compute(self, signal: np.ndarray, end: int, limit: int | None = None) -> np.ndarray:
+        # `signal` holds the input samples with indices [end - len(signal), end)
+        half = self.taps // 2
+        # Output n is centered on input position n * M / L and needs inputs up to
+        # floor(n * M / L) + half, so it can be computed once that index is < end
+        stop = -(-(end - half) * self._up // self._down)
+        if limit is not None:
+            stop = min(stop, limit)
+        outputs = np.arange(self._produced, max(stop, self._produced))
+        if not len(outputs):
+            return np.zeros(0, dtype=np.float32)
+        position = outputs * self._down
+        phase = position % self._up
+        base = position // self._up + half - (end - len(signal))
+        indices = base[:, None] - np.arange(self.taps)[None, :]
+        result = np.einsum("ij,ij->i", signal[indices], self._filter[phase])
+        self._produced = int(outputs[-1]) + 1
+        return result
+
+    def _design_filter(self) -> np.ndarray:
+        up, taps = self._up, self.taps
+        length = up * taps
+        # Cut off at the lower Nyquist frequency, relative to the upsampled rate
+        cutoff = 0.5 / max(up, self._down) * 0.95
+        # Centered on index length / 2, which is where `_compute` expects the filter delay
+        n = np.arange(length) - length // 2
+        window = np.kaiser(length + 1, 8.0)[:length]
+        prototype = 2 * cutoff * np.sinc(2 * cutoff * n) * window * up
+        # Polyphase layout: row p holds the coefficients used by outputs at phase p
+        polyphase = prototype.reshape(taps, up).T
+        return polyphase.astype(np.float32)
+
+    @staticmethod
+    def _cast(samples: np.ndarray, dtype) -> np.ndarray:
+        if np.issubdtype(dtype, np.integer):
+            info = np.iinfo(dtype)
+            return np.clip(np.rint(samples), info.min, info.max).astype(dtype)
+        return samples.astype(dtype)
+
+
+def resample(samples: np.ndarray, from_rate: int, to_rate: int, taps: int = 32) -> np.ndarray:
+    """
+    Resample a complete mono signal.
+
+    Args:
+        samples (np.ndarray): The mono samples, int16 or float.
+        from_rate (int): Sample rate of the input in Hz.
+        to_rate (int): Sample rate of the output in Hz.
+        taps (int): Filter coefficients per output sample, defaults to 32.
+
+    Returns:
+        np.ndarray: The resampled signal, with the dtype of the input.
+    """
+    resampler = Resampler(from_rate, to_rate, taps)
+    return np.concatenate([resampler.process(samples), resampler.flush(samples.dtype)])
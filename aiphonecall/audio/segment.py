@@ -0,0 +1,71 @@
+from typing import Optional
+
+import numpy as np
+
+from aiphonecall.audio.vad import SilenceTrimmer
+
+# Half the length of a pause that is long enough to cut in
+_BREAK_MS = 200
+
+
+def split_at_silence(samples: np.ndarray,
+                     sample_rate: int,
+                     channels: int = 1,
+                     max_seconds: float = 60.0,
+                     min_seconds: float = 15.0,
+                     detector: Optional[SilenceTrimmer] = None) -> list[tuple[int, int]]:
+    """
+    Split a long signal into bounded segments, cutting in pauses rather than in words.
+
+    Every segment is at most `max_seconds` long. Within the window between
+    `min_seconds` and `max_seconds` after the start of a segment, the cut is
+    placed inside the latest pause long enough to be a sentence break
+    (or, failing that, in the longest pause), found from the frame levels in one
+    vectorized pass. Only if the window contains no silence at all is the segment
+    cut hard at `max_seconds`.
+
+    Args:
+        samples (np.ndarray): Interleaved int16 samples.
+        sample_rate (int): Sample rate in Hz.
+        channels (int): Number of interleaved channels, defaults to 1.
+        max_seconds (float): Maximum duration of a segment, defaults to 60.
+        min_seconds (float): Minimum duration of a segment (except the last),
+            defaults to 15.
+        detector (Optional[SilenceTrimmer]): Detector whose threshold and frame length
+            decide what counts as silence, defaults to `SilenceTrimmer()`.
+
+    Returns:
+        list[tuple[int, int]]: The (start, end) of every segment, in sample frames (one
+        sample per channel), covering the whole signal in order.
+
+    Raises:
+        ValueError: If min_seconds is not smaller than max_seconds.
+    """
+    if not 0 <= min_seconds < max_seconds:
+        raise ValueError(f"Expected 0 <= min_seconds < max_seconds, got {min_seconds} and {max_seconds}")
+    detector = detector or SilenceTrimmer()
+    frames = samples[:len(samples) - len(samples) % channels].reshape(-1, channels)
+    mono = frames.mean(axis=1) if channels > 1 else frames[:, 0]
+    total = len(mono)
+
+    frame_length = max(1, sample_rate * detector.frame_ms // 1000)
+    since, until = detector.speech_distances(detector.speech_frames(mono, sample_rate))
+    # Frames in the middle of a pause score highest and speech frames score 0; scores
+    # are capped so that any pause of twice `_BREAK_MS` or more counts as equally good
+    depth = np.minimum(np.minimum(since, until), max(1, _BREAK_MS // detector.frame_ms))
+
+    max_frames = int(max_seconds * sample_rate) // frame_length
+    min_frames = int(min_seconds * sample_rate) // frame_length
+    boundaries = []
+    start = 0
+    while total - start * frame_length > max_frames * frame_length:
+        window = depth[start + min_frames:start + max_frames]
+        if window.max() > 0:
+            # The last best frame, so that segments stay close to max_seconds
+            cut = start + min_frames + len(window) - 1 - int(np.argmax(window[::-1]))
+        else:
+            cut = start + max_frames
+        boundaries.append(cut * frame_length)
+        start = cut
+    edges = [0] + boundaries + [total]
+    return list(zip(edges[:-1], edges[1:]))
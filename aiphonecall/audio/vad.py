@@ -0,0 +1,195 @@
+import threading
+from dataclasses import dataclass
+
+import numpy as np
+
+from aiphonecall.audio.pcm import read_wav, write_wav
+
+
+@dataclass
+class TrimResult:
+    """
+    Outcome of trimming silence from a recording.
+
+    Attributes:
+        audio (bytes): The trimmed recording, in the format of the input.
+        original_seconds (float): Duration of the input.
+        trimmed_seconds (float): Duration of the trimmed recording.
+        has_speech (bool): Whether any frame was above the threshold. If not, the
+            trimmed recording is empty and there is nothing to transcribe.
+    """
+    audio: bytes
+    original_seconds: float
+    trimmed_seconds: float
+    has_speech: bool = True
+
+    @property
+    def removed_seconds(self) -> float:
+        """
+        float: Duration cut from the recording.
+        """
+        return self.original_seconds - self.trimmed_seconds
+
+
+class SilenceTrimmer:
+    """
+    Energy-based voice activity detection that cuts silence out of recordings.
+
+    The signal is split into short frames whose RMS level is computed in one
+    vectorized pass; frames above `threshold_db` count as speech. Silence before
+    the first and after the last speech frame is removed except for `padding_ms`,
+    and silent gaps inside the recording are shortened to `max_gap_ms` so that
+    dead air and long pauses are not uploaded, while word boundaries keep enough
+    silence for the recognizer.
+
+    A trimmer keeps running totals of the audio it processed and removed (see
+    `removed_seconds`), so one instance shared by many calls measures the
+    savings.
+
+    Attributes:
+        threshold_db (float): Level in dBFS above which a frame is speech.
+        frame_ms (int): Duration of the analysis frames in milliseconds.
+        padding_ms (int): Silence kept before the first and after the last speech frame.
+        max_gap_ms (int): Longest silent gap kept inside the recording.
+        processed_seconds (float): Total duration of all recordings trimmed so far.
+        removed_seconds (float): Total duration removed from them so far.
+    """
+
+    def __init__(self,
+                 threshold_db: float = -45.0,
+                 frame_ms: int = 20,
+                 padding_ms: int = 200,
+                 max_gap_ms: int = 600):
+        """
+        Initialize the trimmer.
+
+        Args:
+            threshold_db (float): Level in dBFS above which a frame is speech, defaults
+                to -45. Raise it for noisy lines.
+            frame_ms (int): Duration of the analysis frames in milliseconds, defaults to 20.
+            padding_ms (int): Silence kept before the first and after the last speech
+                frame, defaults to 200.
+            max_gap_ms (int): Longest silent gap kept inside the recording, defaults to 600.
+        """
+        self.threshold_db = threshold_db
+        self.frame_ms = frame_ms
+        self.padding_ms = padding_ms
+        self.max_gap_ms = max_gap_ms
+        self.processed_seconds = 0.0
+        self.removed_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        # Stable across instances and runs, as it is part of the STT cache keys
+        return (f"SilenceTrimmer(threshold_db={self.threshold_db}, frame_ms={self.frame_ms}, "
+                f"padding_ms={self.padding_ms}, max_gap_ms={self.max_gap_ms})")
+
+    def speech_frames(self, samples: np.ndarray, sample_rate: int) -> np.ndarray:
+        """
+        Classify the frames of a signal as speech or silence.
+
+        Args:
+            samples (np.ndarray): Mono int16 samples.
+            sample_rate (int): Sample rate in Hz.
+
+        Returns:
+            np.ndarray: One bool per frame (the last one may be partial), True for speech.
+        """
+        frame = self._frame_length(sample_rate)
+        padded = np.zeros(-(-len(samples) // frame) * frame, dtype=np.float32)
+        padded[:len(samples)] = samples
+        frames = padded.reshape(-1, frame)
+        power = np.mean(np.square(frames / 32768.0), axis=1)
+        level = 10 * np.log10(np.maximum(power, 1e-12))
+        return level > self.threshold_db
+
+    def keep_mask(self, samples: np.ndarray, sample_rate: int) -> np.ndarray:
+        """
+        Compute which samples of a signal survive trimming.
+
+        Args:
+            samples (np.ndarray): Mono int16 samples.
+            sample_rate (int): Sample rate in Hz.
+
+        Returns:
+            np.ndarray: One bool per sample, True for the samples that are kept.
+        """
+        speech = self.speech_frames(samples, sample_rate)
+        since, until = self.speech_distances(speech)
+        inside = (since <= len(speech)) & (until <= len(speech))
+
+        padding = self.padding_ms // self.frame_ms
+        gap_side = self.max_gap_ms // self.frame_ms // 2
+        keep = np.where(inside,
+                        (since <= gap_side) | (until <= gap_side),
+                        (since <= padding) | (until <= padding))
+        return np.repeat(keep, self._frame_length(sample_rate))[:len(samples)]
+
+    @staticmethod
+    def speech_distances(speech: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Measure how far every frame is from speech.
+
+        Args:
+            speech (np.ndarray): One bool per frame, as returned by `speech_frames`.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: For every frame, the number of frames since the
+            previous and until the next speech frame (0 for speech frames). Frames with
+            no speech before or after them get a distance larger than the frame count.
+        """
+        count = len(speech)
+        index = np.arange(count)
+        # Sentinels far enough outside [0, count) to put the distance above `count`
+        previous = np.maximum.accumulate(np.where(speech, index, -count - 1))
+        following = np.minimum.accumulate(np.where(speech, index, 2 * count + 1)[::-1])[::-1]
+        return index - previous, following - index
+
+    def trim_samples(self, samples: np.ndarray, sample_rate: int, channels: int = 1) -> np.ndarray:
+        """
+        Trim silence from a signal.
+
+        Args:
+            samples (np.ndarray): Interleaved int16 samples.
+            sample_rate (int): Sample rate in Hz.
+            channels (int): Number of interleaved channels, defaults to 1. Speech is
+                detected on the mix of all channels.
+
+        Returns:
+            np.ndarray: The kept samples, still interleaved.
+        """
+        frames = samples[:len(samples) - len(samples) % channels].reshape(-1, channels)
+        mono = frames.mean(axis=1) if channels > 1 else frames[:, 0]
+        return frames[self.keep_mask(mono, sample_rate)].reshape(-1)
+
+    def trim(self, audio: bytes) -> TrimResult:
+        """
+        Trim silence from a recording.
+
+        16-bit PCM WAV files are trimmed; other formats (e.g. MP3, which would need
+        to be decoded first) are returned unchanged, with nothing removed.
+
+        Args:
+            audio (bytes): The recording.
+
+        Returns:
+            TrimResult: The trimmed recording and how much of it was removed.
+        """
+        decoded = read_wav(audio)
+        if decoded is None:
+            return TrimResult(audio=audio, original_seconds=0.0, trimmed_seconds=0.0)
+        samples, sample_rate, channels = decoded
+
+        kept = self.trim_samples(samples, sample_rate, channels)
+        samples_per_second = sample_rate * channels
+        result = TrimResult(audio=write_wav(kept, sample_rate, channels),
+                            original_seconds=len(samples) / samples_per_second,
+                            trimmed_seconds=len(kept) / samples_per_second,
+                            has_speech=len(kept) > 0)
+        with self._lock:
+            self.processed_seconds += result.original_seconds
+            self.removed_seconds += result.removed_seconds
+        return result
+
+    def _frame_length(self, sample_rate: int) -> int:
+        return max(1, sample_rate * self.frame_ms // 1000)
@@ -0,0 +1,9 @@
+from .disk_audio_cache import DiskAudioCache
+from .cached_tts import CachedTTSProvider
+from .phrase_store import PhraseStore, WarmupResult
+from .response_cache import MemoryLRUCache, ResponseCache
+from .sqlite_cache import SQLiteResponseCache
+from .cached_llm import CachedLLMProvider
+from .cached_stt import CachedSTTProvider
+from .coalesced_tts import CoalescedTTSProvider
+from .coalesced_llm import CoalescedLLMProvider
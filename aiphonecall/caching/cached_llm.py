@@ -0,0 +1,248 @@
+from typing import AsyncIterator, Iterator, Optional
+
+from aiphonecall.caching.response_cache import ResponseCache
+from aiphonecall.interfaces.llm_provider_interface import LLMProvider
+from aiphonecall.utils.fingerprint import bind_arguments, fingerprint
+from aiphonecall.utils.singleflight import SingleFlight
+
+
+class CachedLLMProvider(LLMProvider):
+    """
+    LLMProvider wrapper serving repeated chats from a ResponseCache.
+
+    Entries are keyed on the wrapped provider and the exact request it would
+    send, i.e. the model, the parameters and the messages, with the provider's
+    defaults applied. Only deterministic calls (temperature 0) are cached unless
+    `cache_nondeterministic` is set, since replaying one sample of a random
+    reply would silently change the behaviour of the caller. Calls with a
+    Conversation depend on its history and record into it, so they always go
+    to the provider.
+
+    Every chat method accepts `bypass_cache=True` to skip the lookup; the fresh
+    reply still replaces the cached one.
+
+    Cacheable `chat`/`achat` misses that are in flight at the same time with the
+    same payload share one upstream request. Streams are not coalesced.
+
+    Closing the wrapper closes the wrapped provider.
+
+    Attributes:
+        provider (LLMProvider): The wrapped provider.
+        cache (ResponseCache): The cache the replies are stored in.
+        ttl (Optional[float]): Seconds the replies are cached, None for the cache's default.
+        cache_nondeterministic (bool): Whether calls with a temperature above 0 are cached.
+        single_flight (SingleFlight): Coalesces concurrent identical misses.
+    """
+
+    def __init__(self,
+                 provider: LLMProvider,
+                 cache: ResponseCache,
+                 ttl: Optional[float] = None,
+                 cache_nondeterministic: bool = False,
+                 single_flight: Optional[SingleFlight] = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            provider (LLMProvider): The provider to wrap.
+            cache (ResponseCache): The cache the replies are stored in. Can be shared by
+                several wrappers since the provider is part of every key.
+            ttl (Optional[float]): Seconds the replies are cached, defaults to the cache's
+                default.
+            cache_nondeterministic (bool): Whether calls with a temperature above 0 are
+                cached too, defaults to False.
+            single_flight (Optional[SingleFlight]): Coalescer of concurrent misses, defaults
+                to a new one. Share one between wrappers to coalesce across them.
+        """
+        super().__init__(provider.api_key, provider.transport, provider.limiter)
+        self.provider = provider
+        self.cache = cache
+        self.ttl = ttl
+        self.cache_nondeterministic = cache_nondeterministic
+        self.single_flight = single_flight or SingleFlight()
+
+    def _create_payload(self, **kwargs) -> tuple[str, dict, dict]:
+        return self.provider._create_payload(**kwargs)
+
+    def close(self) -> None:
+        super().close()
+        self.provider.close()
+
+    async def aclose(self) -> None:
+        await super().aclose()
+        await self.provider.aclose()
+
+    def cache_key(self, text: Optional[str] = None, model=None, **kwargs) -> Optional[str]:
+        """
+        Return the cache key of a chat request.
+
+        Args:
+            text (Optional[str]): The text to chat with the LLM.
+            model: The model to use, defaults to the provider's default.
+            **kwargs: Additional provider-specific parameters (temperature, messages, ...).
+
+        Returns:
+            Optional[str]: The key the reply is cached under, or None if the request must
+            not be cached.
+        """
+        arguments = bind_arguments(self.provider.achat, **self._options(text, model, kwargs))
+        if arguments.get("conversation") is not None:
+            return None
+        temperature = arguments.get("temperature")
+        if not self.cache_nondeterministic and temperature != 0:
+            return None
+        url, _, data = self.provider._create_payload(**arguments)
+        # The text is part of the key on its own since providers may send it outside `data`
+        return fingerprint(type(self.provider).__name__, url, data, arguments.get("text"))
+
+    def chat(self, text: Optional[str] = None, model=None, bypass_cache: bool = False, **kwargs) -> str:
+        """
+        Synchronously chat with the LLM, using the cache when possible.
+
+        Args:
+            text (Optional[str]): The text to chat with the LLM.
+            model: The model to use, defaults to the provider's default.
+            bypass_cache (bool): Whether to skip the cache lookup, defaults to False.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            str: Returns the output text from the LLM.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ValueError: If invalid parameters are provided.
+        """
+        options = self._options(text, model, kwargs)
+        key = self.cache_key(**options)
+        if key is not None and not bypass_cache:
+            reply = self.cache.get(key)
+            if reply is not None:
+                return reply
+        if key is None:
+            return self.provider.chat(**options)
+
+        def chat() -> str:
+            reply = self.provider.chat(**options)
+            self.cache.put(key, reply, self.ttl)
+            return reply
+
+        return self.single_flight.do_sync(key, chat)
+
+    async def achat(self, text: Optional[str] = None, model=None, bypass_cache: bool = False, **kwargs) -> str:
+        """
+        Asynchronously chat with the LLM, using the cache when possible.
+
+        Args:
+            text (Optional[str]): The text to chat with the LLM.
+            model: The model to use, defaults to the provider's default.
+            bypass_cache (bool): Whether to skip the cache lookup, defaults to False.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            str: Returns the output text from the LLM.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ValueError: If invalid parameters are provided.
+        """
+        options = self._options(text, model, kwargs)
+        key = self.cache_key(**options)
+        if key is not None and not bypass_cache:
+            reply = self.cache.get(key)
+            if reply is not None:
+                return reply
+        if key is None:
+            return await self.provider.achat(**options)
+
+        async def chat() -> str:
+            reply = await self.provider.achat(**options)
+            self.cache.put(key, reply, self.ttl)
+            return reply
+
+        return await self.single_flight.do(key, chat)
+
+    def chat_stream(self,
+                    text: Optional[str] = None,
+                    model=None,
+                    bypass_cache: bool = False,
+                    **kwargs) -> Iterator[str]:
+        """
+        Synchronously chat with the LLM, yielding the reply as it is generated.
+
+        A cached reply is yielded as a single delta. Otherwise the provider's stream
+        is passed through and cached once it completes.
+
+        Args:
+            text (Optional[str]): The text to chat with the LLM.
+            model: The model to use, defaults to the provider's default.
+            bypass_cache (bool): Whether to skip the cache lookup, defaults to False.
+            **kwargs: Additional provider-specific parameters.
+
+        Yields:
+            str: Text deltas of the reply, in order.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ValueError: If invalid parameters are provided.
+        """
+        options = self._options(text, model, kwargs)
+        key = self.cache_key(**options)
+        if key is not None and not bypass_cache:
+            reply = self.cache.get(key)
+            if reply is not None:
+                yield reply
+                return
+        deltas = []
+        for delta in self.provider.chat_stream(**options):
+            deltas.append(delta)
+            yield delta
+        if key is not None:
+            self.cache.put(key, "".join(deltas), self.ttl)
+
+    async def achat_stream(self,
+                           text: Optional[str] = None,
+                           model=None,
+                           bypass_cache: bool = False,
+                           **kwargs) -> AsyncIterator[str]:
+        """
+        Asynchronously chat with the LLM, yielding the reply as it is generated.
+
+        A cached reply is yielded as a single delta. Otherwise the provider's stream
+        is passed through and cached once it completes.
+
+        Args:
+            text (Optional[str]): The text to chat with the LLM.
+            model: The model to use, defaults to the provider's default.
+            bypass_cache (bool): Whether to skip the cache lookup, defaults to False.
+            **kwargs: Additional provider-specific parameters.
+
+        Yields:
+            str: Text deltas of the reply, in order.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ValueError: If invalid parameters are provided.
+        """
+        options = self._options(text, model, kwargs)
+        key = self.cache_key(**options)
+        if key is not None and not bypass_cache:
+            reply = self.cache.get(key)
+            if reply is not None:
+                yield reply
+                return
+        deltas = []
+        async for delta in self.provider.achat_stream(**options):
+            deltas.append(delta)
+            yield delta
+        if key is not None:
+            self.cache.put(key, "".join(deltas), self.ttl)
+
+    @staticmethod
+    def _options(text: Optional[str], model, kwargs: dict) -> dict:
+        # Only forward what was given so the provider's own defaults apply
+        options = dict(kwargs)
+        if text is not None:
+            options["text"] = text
+        if model is not None:
+            options["model"] = model
+        return options
@@ -0,0 +1,170 @@
+from typing import Optional
+
+from aiphonecall.caching.response_cache import ResponseCache
+from aiphonecall.interfaces.stt_provider_interface import STTProvider
+from aiphonecall.interfaces.stt_stream_session_interface import STTStreamSession
+from aiphonecall.utils.audio_source import AudioSource, ahash_audio, hash_audio
+from aiphonecall.utils.fingerprint import bind_arguments, fingerprint
+from aiphonecall.utils.singleflight import SingleFlight
+
+
+class CachedSTTProvider(STTProvider):
+    """
+    STTProvider wrapper serving repeated transcriptions from a ResponseCache.
+
+    Entries are keyed on the wrapped provider, the request URL (which carries
+    the model and its options), the remaining call parameters and the sha256 of
+    the audio content, so re-processing the same recording under another file
+    name is still a hit. Files are hashed in chunks before the upload; the
+    audio is only read twice on a miss. Live sessions are passed through.
+
+    `speech2text` and `aspeech2text` accept `bypass_cache=True` to skip the
+    lookup; the fresh transcript still replaces the cached one. Misses for the
+    same audio that are in flight at the same time share one upload.
+
+    Closing the wrapper closes the wrapped provider.
+
+    Attributes:
+        provider (STTProvider): The wrapped provider.
+        cache (ResponseCache): The cache the transcripts are stored in.
+        ttl (Optional[float]): Seconds the transcripts are cached, None for the cache's default.
+        single_flight (SingleFlight): Coalesces concurrent identical misses.
+    """
+
+    def __init__(self,
+                 provider: STTProvider,
+                 cache: ResponseCache,
+                 ttl: Optional[float] = None,
+                 single_flight: Optional[SingleFlight] = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            provider (STTProvider): The provider to wrap.
+            cache (ResponseCache): The cache the transcripts are stored in. Can be shared
+                by several wrappers since the provider is part of every key.
+            ttl (Optional[float]): Seconds the transcripts are cached, defaults to the
+                cache's default.
+            single_flight (Optional[SingleFlight]): Coalescer of concurrent misses, defaults
+                to a new one. Share one between wrappers to coalesce across them.
+        """
+        super().__init__(provider.api_key, provider.transport, provider.limiter)
+        self.provider = provider
+        self.cache = cache
+        self.ttl = ttl
+        self.single_flight = single_flight or SingleFlight()
+
+    def _create_payload(self, **kwargs) -> tuple:
+        return self.provider._create_payload(**kwargs)
+
+    def close(self) -> None:
+        super().close()
+        self.provider.close()
+
+    async def aclose(self) -> None:
+        await super().aclose()
+        await self.provider.aclose()
+
+    def cache_key(self, digest: str, model=None, **kwargs) -> str:
+        """
+        Return the cache key of a transcription request.
+
+        Args:
+            digest (str): The sha256 of the audio, as computed by `hash_audio`.
+            model: The model to use, defaults to the provider's default.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            str: The key the transcript is cached under.
+        """
+        arguments = bind_arguments(self.provider.aspeech2text, None, **self._options(model, kwargs))
+        url = self.provider._create_payload(**arguments)[0]
+        # The audio is in the digest, the model and options in the URL; anything the
+        # provider handles client side (e.g. silence trimming) is added as is
+        extra = {name: value for name, value in arguments.items() if name not in ("audio", "model", "timeout")}
+        return fingerprint(type(self.provider).__name__, url, digest, extra)
+
+    def speech2text(self, audio: AudioSource, model=None, bypass_cache: bool = False, **kwargs) -> str:
+        """
+        Synchronously convert speech to text, using the cache when possible.
+
+        Args:
+            audio (AudioSource): The audio that needs conversion.
+            model: The model to use, defaults to the provider's default.
+            bypass_cache (bool): Whether to skip the cache lookup, defaults to False.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            str: Returns the output text from the speech.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ValueError: If invalid parameters are provided.
+        """
+        digest, audio = hash_audio(audio)
+        options = self._options(model, kwargs)
+        key = self.cache_key(digest, **options)
+        if not bypass_cache:
+            text = self.cache.get(key)
+            if text is not None:
+                return text
+
+        def transcribe() -> str:
+            text = self.provider.speech2text(audio, **options)
+            self.cache.put(key, text, self.ttl)
+            return text
+
+        return self.single_flight.do_sync(key, transcribe)
+
+    async def aspeech2text(self, audio: AudioSource, model=None, bypass_cache: bool = False, **kwargs) -> str:
+        """
+        Asynchronously convert speech to text, using the cache when possible.
+
+        Args:
+            audio (AudioSource): The audio that needs conversion.
+            model: The model to use, defaults to the provider's default.
+            bypass_cache (bool): Whether to skip the cache lookup, defaults to False.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            str: Returns the output text from the speech.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ValueError: If invalid parameters are provided.
+        """
+        digest, audio = await ahash_audio(audio)
+        options = self._options(model, kwargs)
+        key = self.cache_key(digest, **options)
+        if not bypass_cache:
+            text = self.cache.get(key)
+            if text is not None:
+                return text
+
+        async def transcribe() -> str:
+            text = await self.provider.aspeech2text(audio, **options)
+            self.cache.put(key, text, self.ttl)
+            return text
+
+        return await self.single_flight.do(key, transcribe)
+
+    def aspeech2text_stream(self, model=None, **kwargs) -> STTStreamSession:
+        """
+        Open a live speech-to-text session of the wrapped provider; live audio is not cached.
+
+        Args:
+            model: The model to use, defaults to the provider's default.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            STTStreamSession: The session of the wrapped provider.
+        """
+        return self.provider.aspeech2text_stream(**self._options(model, kwargs))
+
+    @staticmethod
+    def _options(model, kwargs: dict) -> dict:
+        # Only forward what was given so the provider's own defaults apply
+        options = dict(kwargs)
+        if model is not None:
+            options["model"] = model
+        return options
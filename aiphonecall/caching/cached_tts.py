@@ -0,0 +1,204 @@
+from io import BytesIO
+from typing import IO, AsyncIterator, Optional
+
+from aiphonecall.caching.disk_audio_cache import DiskAudioCache
+from aiphonecall.interfaces.tts_provider_interface import TTSProvider
+from aiphonecall.utils.fingerprint import normalize_text, payload_fingerprint
+from aiphonecall.utils.singleflight import SingleFlight
+
+
+class CachedTTSProvider(TTSProvider):
+    """
+    TTSProvider wrapper serving repeated syntheses from a DiskAudioCache.
+
+    Entries are keyed on the wrapped provider, the normalized text and the
+    exact request the provider would send for it, i.e. the model, the voice and
+    the voice settings (such as ElevenLabs stability and similarity) with the
+    provider's defaults applied. Texts are whitespace-normalized before being
+    synthesized, so "Please  hold" and "Please hold" share an entry.
+
+    Identical `transcribe`/`atranscribe` misses that are in flight at the same
+    time share one upstream request, so a burst of calls starting with the same
+    greeting synthesizes it once. Streams are not coalesced.
+
+    Closing the wrapper closes the wrapped provider.
+
+    Attributes:
+        provider (TTSProvider): The wrapped provider.
+        cache (DiskAudioCache): The cache the audio is stored in.
+        single_flight (SingleFlight): Coalesces concurrent identical misses.
+    """
+
+    def __init__(self,
+                 provider: TTSProvider,
+                 cache: DiskAudioCache,
+                 chunk_size: int = 16 * 1024,
+                 single_flight: Optional[SingleFlight] = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            provider (TTSProvider): The provider to wrap.
+            cache (DiskAudioCache): The cache the audio is stored in. Can be shared by
+                several wrappers since the provider is part of every key.
+            chunk_size (int): Size of the chunks cached audio is streamed in by
+                `atranscribe_stream`, defaults to 16 KiB.
+            single_flight (Optional[SingleFlight]): Coalescer of concurrent misses, defaults
+                to a new one. Share one between wrappers to coalesce across them.
+        """
+        super().__init__(provider.api_key, provider.transport, provider.limiter)
+        self.provider = provider
+        self.cache = cache
+        self.chunk_size = chunk_size
+        self.single_flight = single_flight or SingleFlight()
+
+    def _create_payload(self, **kwargs) -> tuple[str, dict, dict]:
+        return self.provider._create_payload(**kwargs)
+
+    def close(self) -> None:
+        super().close()
+        self.provider.close()
+
+    async def aclose(self) -> None:
+        await super().aclose()
+        await self.provider.aclose()
+
+    def cache_key(self, text: str, voice=None, model=None, **kwargs) -> str:
+        """
+        Return the cache key of a synthesis request.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice: The voice to use, defaults to the provider's default.
+            model: The model to use, defaults to the provider's default.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            str: The key the audio is cached under.
+        """
+        return payload_fingerprint(self.provider, self.provider.atranscribe,
+                                   normalize_text(text), **self._options(voice, model, kwargs))
+
+    def transcribe(self, text: str, voice=None, model=None, **kwargs) -> IO[bytes]:
+        """
+        Synchronously convert text to speech, using the cache when possible.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice: The voice to use, defaults to the provider's default.
+            model: The model to use, defaults to the provider's default.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            IO[bytes]: A binary stream containing the generated audio.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ValueError: If invalid parameters are provided.
+        """
+        text = normalize_text(text)
+        options = self._options(voice, model, kwargs)
+        key = self.cache_key(text, **options)
+        audio = self.cache.get(key)
+        if audio is not None:
+            # Callers don't close the stream, so copy the audio out rather than hand
+            # them the mapping; only `atranscribe_stream` serves hits zero-copy
+            with audio:
+                return BytesIO(audio.read())
+
+        def synthesize() -> bytes:
+            data = self.provider.transcribe(text, **options).read()
+            self.cache.put(key, data)
+            return data
+
+        return BytesIO(self.single_flight.do_sync(key, synthesize))
+
+    async def atranscribe(self, text: str, voice=None, model=None, **kwargs) -> IO[bytes]:
+        """
+        Asynchronously convert text to speech, using the cache when possible.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice: The voice to use, defaults to the provider's default.
+            model: The model to use, defaults to the provider's default.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            IO[bytes]: A binary stream containing the generated audio.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ValueError: If invalid parameters are provided.
+        """
+        text = normalize_text(text)
+        options = self._options(voice, model, kwargs)
+        key = self.cache_key(text, **options)
+        audio = self.cache.get(key)
+        if audio is not None:
+            # Callers don't close the stream, so copy the audio out rather than hand
+            # them the mapping; only `atranscribe_stream` serves hits zero-copy
+            with audio:
+                return BytesIO(audio.read())
+
+        async def synthesize() -> bytes:
+            data = (await self.provider.atranscribe(text, **options)).read()
+            self.cache.put(key, data)
+            return data
+
+        return BytesIO(await self.single_flight.do(key, synthesize))
+
+    async def atranscribe_stream(self, text: str, voice=None, model=None, **kwargs) -> AsyncIterator[bytes]:
+        """
+        Asynchronously convert text to speech, yielding the audio as it arrives.
+
+        Cached audio is yielded zero-copy as `chunk_size` memoryview slices of its
+        memory map, which stays open until the stream finishes or is closed.
+        Otherwise the provider's stream is passed through and cached once it
+        completes.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice: The voice to use, defaults to the provider's default.
+            model: The model to use, defaults to the provider's default.
+            **kwargs: Additional provider-specific parameters.
+
+        Yields:
+            bytes: Chunks of the generated audio, in order. Cache hits are yielded as
+            read-only memoryviews, which support the buffer protocol like bytes.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ValueError: If invalid parameters are provided.
+        """
+        text = normalize_text(text)
+        options = self._options(voice, model, kwargs)
+        key = self.cache_key(text, **options)
+        audio = self.cache.get(key)
+        if audio is not None:
+            view = memoryview(audio)
+            try:
+                for start in range(0, len(view), self.chunk_size):
+                    yield view[start:start + self.chunk_size]
+            finally:
+                view.release()
+                try:
+                    audio.close()
+                except BufferError:
+                    # The caller still holds slices; the mapping is released with the last one
+                    pass
+            return
+        audio_stream = BytesIO()
+        async for chunk in self.provider.atranscribe_stream(text, **options):
+            audio_stream.write(chunk)
+            yield chunk
+        self.cache.put(key, audio_stream.getvalue())
+
+    @staticmethod
+    def _options(voice, model, kwargs: dict) -> dict:
+        # Only forward what was given so the provider's own defaults apply
+        options = dict(kwargs)
+        if voice is not None:
+            options["voice"] = voice
+        if model is not None:
+            options["model"] = model
+        return options
@@ -0,0 +1,151 @@
+from typing import AsyncIterator, Iterator, Optional
+
+from aiphonecall.interfaces.llm_provider_interface import LLMProvider
+from aiphonecall.utils.fingerprint import bind_arguments, fingerprint
+from aiphonecall.utils.singleflight import SingleFlight
+
+
+class CoalescedLLMProvider(LLMProvider):
+    """
+    LLMProvider wrapper sharing one upstream request between concurrent identical chats.
+
+    Requests are keyed on the wrapped provider and the exact request it would
+    send (model, parameters and messages, with the provider's defaults
+    applied). Calls with a Conversation record into it, so they always make
+    their own request. Nothing is kept once the call is done; use
+    `CachedLLMProvider`, which coalesces its misses the same way, to also
+    serve later requests. Streams are not coalesced.
+
+    Closing the wrapper closes the wrapped provider.
+
+    Attributes:
+        provider (LLMProvider): The wrapped provider.
+        single_flight (SingleFlight): Coalesces concurrent identical requests.
+    """
+
+    def __init__(self, provider: LLMProvider, single_flight: Optional[SingleFlight] = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            provider (LLMProvider): The provider to wrap.
+            single_flight (Optional[SingleFlight]): Coalescer of concurrent requests, defaults
+                to a new one. Share one between wrappers to coalesce across them.
+        """
+        super().__init__(provider.api_key, provider.transport, provider.limiter)
+        self.provider = provider
+        self.single_flight = single_flight or SingleFlight()
+
+    def _create_payload(self, **kwargs) -> tuple[str, dict, dict]:
+        return self.provider._create_payload(**kwargs)
+
+    def close(self) -> None:
+        super().close()
+        self.provider.close()
+
+    async def aclose(self) -> None:
+        await super().aclose()
+        await self.provider.aclose()
+
+    def request_key(self, text: Optional[str] = None, model=None, **kwargs) -> Optional[str]:
+        """
+        Return the key identical chat requests share.
+
+        Args:
+            text (Optional[str]): The text to chat with the LLM.
+            model: The model to use, defaults to the provider's default.
+            **kwargs: Additional provider-specific parameters (temperature, messages, ...).
+
+        Returns:
+            Optional[str]: The fingerprint of the request, or None if it must not be shared.
+        """
+        arguments = bind_arguments(self.provider.achat, **self._options(text, model, kwargs))
+        if arguments.get("conversation") is not None:
+            return None
+        url, _, data = self.provider._create_payload(**arguments)
+        # The text is part of the key on its own since providers may send it outside `data`
+        return fingerprint(type(self.provider).__name__, url, data, arguments.get("text"))
+
+    def chat(self, text: Optional[str] = None, model=None, **kwargs) -> str:
+        """
+        Synchronously chat with the LLM, joining an identical request in flight.
+
+        Args:
+            text (Optional[str]): The text to chat with the LLM.
+            model: The model to use, defaults to the provider's default.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            str: Returns the output text from the LLM.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ValueError: If invalid parameters are provided.
+        """
+        options = self._options(text, model, kwargs)
+        key = self.request_key(**options)
+        if key is None:
+            return self.provider.chat(**options)
+        return self.single_flight.do_sync(key, lambda: self.provider.chat(**options))
+
+    async def achat(self, text: Optional[str] = None, model=None, **kwargs) -> str:
+        """
+        Asynchronously chat with the LLM, joining an identical request in flight.
+
+        Args:
+            text (Optional[str]): The text to chat with the LLM.
+            model: The model to use, defaults to the provider's default.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            str: Returns the output text from the LLM.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ValueError: If invalid parameters are provided.
+        """
+        options = self._options(text, model, kwargs)
+        key = self.request_key(**options)
+        if key is None:
+            return await self.provider.achat(**options)
+        return await self.single_flight.do(key, lambda: self.provider.achat(**options))
+
+    def chat_stream(self, text: Optional[str] = None, model=None, **kwargs) -> Iterator[str]:
+        """
+        Synchronously chat with the wrapped provider, yielding the reply as it is
+        generated; streams are not coalesced.
+
+        Args:
+            text (Optional[str]): The text to chat with the LLM.
+            model: The model to use, defaults to the provider's default.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            Iterator[str]: Text deltas of the reply, in order.
+        """
+        return self.provider.chat_stream(**self._options(text, model, kwargs))
+
+    def achat_stream(self, text: Optional[str] = None, model=None, **kwargs) -> AsyncIterator[str]:
+        """
+        Asynchronously chat with the wrapped provider, yielding the reply as it is
+        generated; streams are not coalesced.
+
+        Args:
+            text (Optional[str]): The text to chat with the LLM.
+            model: The model to use, defaults to the provider's default.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            AsyncIterator[str]: Text deltas of the reply, in order.
+        """
+        return self.provider.achat_stream(**self._options(text, model, kwargs))
+
+    @staticmethod
+    def _options(text: Optional[str], model, kwargs: dict) -> dict:
+        # Only forward what was given so the provider's own defaults apply
+        options = dict(kwargs)
+        if text is not None:
+            options["text"] = text
+        if model is not None:
+            options["model"] = model
+        return options
@@ -0,0 +1,137 @@
+from io import BytesIO
+from typing import IO, AsyncIterator, Optional
+
+from aiphonecall.interfaces.tts_provider_interface import TTSProvider
+from aiphonecall.utils.fingerprint import payload_fingerprint
+from aiphonecall.utils.singleflight import SingleFlight
+
+
+class CoalescedTTSProvider(TTSProvider):
+    """
+    TTSProvider wrapper sharing one upstream request between concurrent identical syntheses.
+
+    Requests are keyed on the wrapped provider and the exact request it would
+    send (model, voice, voice settings and text, with the provider's defaults
+    applied), so only requests that would be byte-for-byte the same share a
+    call. Nothing is kept once the call is done; use `CachedTTSProvider`,
+    which coalesces its misses the same way, to also serve later requests.
+    Streams are not coalesced.
+
+    Closing the wrapper closes the wrapped provider.
+
+    Attributes:
+        provider (TTSProvider): The wrapped provider.
+        single_flight (SingleFlight): Coalesces concurrent identical requests.
+    """
+
+    def __init__(self, provider: TTSProvider, single_flight: Optional[SingleFlight] = None):
+        """
+        Initialize the wrapper.
+
+        Args:
+            provider (TTSProvider): The provider to wrap.
+            single_flight (Optional[SingleFlight]): Coalescer of concurrent requests, defaults
+                to a new one. Share one between wrappers to coalesce across them.
+        """
+        super().__init__(provider.api_key, provider.transport, provider.limiter)
+        self.provider = provider
+        self.single_flight = single_flight or SingleFlight()
+
+    def _create_payload(self, **kwargs) -> tuple[str, dict, dict]:
+        return self.provider._create_payload(**kwargs)
+
+    def close(self) -> None:
+        super().close()
+        self.provider.close()
+
+    async def aclose(self) -> None:
+        await super().aclose()
+        await self.provider.aclose()
+
+    def request_key(self, text: str, voice=None, model=None, **kwargs) -> str:
+        """
+        Return the key identical synthesis requests share.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice: The voice to use, defaults to the provider's default.
+            model: The model to use, defaults to the provider's default.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            str: The fingerprint of the request.
+        """
+        return payload_fingerprint(self.provider, self.provider.atranscribe,
+                                   text, **self._options(voice, model, kwargs))
+
+    def transcribe(self, text: str, voice=None, model=None, **kwargs) -> IO[bytes]:
+        """
+        Synchronously convert text to speech, joining an identical request in flight.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice: The voice to use, defaults to the provider's default.
+            model: The model to use, defaults to the provider's default.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            IO[bytes]: A binary stream containing the generated audio.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ValueError: If invalid parameters are provided.
+        """
+        options = self._options(voice, model, kwargs)
+        key = self.request_key(text, **options)
+        return BytesIO(self.single_flight.do_sync(key, lambda: self.provider.transcribe(text, **options).read()))
+
+    async def atranscribe(self, text: str, voice=None, model=None, **kwargs) -> IO[bytes]:
+        """
+        Asynchronously convert text to speech, joining an identical request in flight.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice: The voice to use, defaults to the provider's default.
+            model: The model to use, defaults to the provider's default.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            IO[bytes]: A binary stream containing the generated audio.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ValueError: If invalid parameters are provided.
+        """
+        options = self._options(voice, model, kwargs)
+        key = self.request_key(text, **options)
+
+        async def synthesize() -> bytes:
+            return (await self.provider.atranscribe(text, **options)).read()
+
+        return BytesIO(await self.single_flight.do(key, synthesize))
+
+    def atranscribe_stream(self, text: str, voice=None, model=None, **kwargs) -> AsyncIterator[bytes]:
+        """
+        Asynchronously convert text to speech with the wrapped provider, yielding the
+        audio as it arrives; streams are not coalesced.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice: The voice to use, defaults to the provider's default.
+            model: The model to use, defaults to the provider's default.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            AsyncIterator[bytes]: Chunks of the generated audio, in order.
+        """
+        return self.provider.atranscribe_stream(text, **self._options(voice, model, kwargs))
+
+    @staticmethod
+    def _options(voice, model, kwargs: dict) -> dict:
+        # Only forward what was given so the provider's own defaults apply
+        options = dict(kwargs)
+        if voice is not None:
+            options["voice"] = voice
+        if model is not None:
+            options["model"] = model
+        return options
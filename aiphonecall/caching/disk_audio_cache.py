@@ -0,0 +1,161 @@
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import IO, Optional
+
+
+class DiskAudioCache:
+    """
+    Content-addressed on-disk audio cache with a size cap and LRU eviction.
+
+    Every entry is stored as one file named after its key. Hits are returned
+    as a memory map of the file, so readers can slice it without copying, and
+    refresh the file's modification time so the LRU order survives process restarts. When the total size goes
+    over `max_bytes` the least recently used entries are deleted.
+
+    The cache is safe to share between threads and providers.
+
+    Attributes:
+        directory (str): Directory the entries are stored in.
+        max_bytes (int): Maximum total size of the entries.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups not found in the cache.
+        evictions (int): Number of entries evicted to stay under `max_bytes`.
+    """
+
+    _SUFFIX = ".audio"
+
+    def __init__(self, directory: str, max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize the cache, indexing the entries already present in the directory.
+
+        Args:
+            directory (str): Directory the entries are stored in. Created if missing.
+            max_bytes (int): Maximum total size of the entries, defaults to 512 MiB.
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+
+    @property
+    def size(self) -> int:
+        """
+        int: Total size in bytes of the cached entries.
+        """
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def get(self, key: str) -> Optional[IO[bytes]]:
+        """
+        Look up an entry, marking it as most recently used.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            Optional[IO[bytes]]: A read-only memory map of the audio positioned at the
+            start, or None if the key is not cached. The caller must close it (e.g. with
+            a `with` block) to release the mapping and its file descriptor.
+        """
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    audio = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                os.utime(path)
+            except (FileNotFoundError, ValueError):
+                # Deleted behind our back (or emptied, which can't be mapped)
+                self._size -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return audio
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Store an entry, evicting least recently used entries if the cache grows too big.
+
+        Entries larger than `max_bytes` and empty entries are not stored.
+
+        Args:
+            key (str): The key of the entry.
+            data (bytes): The audio to store.
+        """
+        if not data or len(data) > self.max_bytes:
+            return
+        # Write to a temporary file first so readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        with self._lock:
+            self._size -= self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._size += len(data)
+            self._evict()
+
+    def clear(self) -> None:
+        """
+        Delete all entries and reset the counters.
+        """
+        with self._lock:
+            for key in self._entries:
+                self._remove(key)
+            self._entries.clear()
+            self._size = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self._SUFFIX)
+
+    def _load_index(self) -> None:
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if name.endswith(".tmp"):
+                # Leftover of an interrupted write
+                os.remove(path)
+            elif name.endswith(self._SUFFIX):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, name[:-len(self._SUFFIX)], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self._size += size
+        with self._lock:
+            self._evict()
+
+    def _evict(self) -> None:
+        while self._size > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            self._remove(key)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
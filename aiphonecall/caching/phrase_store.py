@@ -0,0 +1,181 @@
+import asyncio
+import threading
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, Optional
+
+from aiphonecall.interfaces.tts_provider_interface import TTSProvider
+from aiphonecall.utils.fingerprint import normalize_text, payload_fingerprint
+
+
+@dataclass
+class WarmupResult:
+    """
+    Outcome of a `PhraseStore.warmup` run.
+
+    Attributes:
+        synthesized (int): Number of phrases synthesized and stored.
+        skipped (int): Number of phrases that were already stored.
+        failed (dict[str, Exception]): Phrases that could not be synthesized, with the error.
+    """
+    synthesized: int = 0
+    skipped: int = 0
+    failed: dict[str, Exception] = field(default_factory=dict)
+
+
+class PhraseStore:
+    """
+    In-process store of pre-synthesized phrases.
+
+    Frequently spoken phrases (greetings, fillers like "one moment", IVR menu
+    prompts) are synthesized ahead of time with `warmup` and kept in memory.
+    Providers the store is attached to check it in `transcribe`, `atranscribe`
+    and `atranscribe_stream` before going to the network, so even the first
+    caller of the day gets the audio without synthesis latency.
+
+    Entries are keyed like `CachedTTSProvider` entries: on the provider, the
+    normalized text and the exact request it would send, so a phrase warmed
+    for one voice or model is never served for another.
+
+    Attributes:
+        hits (int): Number of lookups served from the store.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self._audio: dict[str, bytes] = {}
+        # Normalized texts of the stored phrases, to skip hashing unrelated texts
+        self._texts: set[str] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._audio)
+
+    def lookup(self, provider: TTSProvider, text: str, **kwargs) -> Optional[bytes]:
+        """
+        Return the stored audio of a synthesis request, if any.
+
+        Args:
+            provider (TTSProvider): The provider the request is made on.
+            text (str): The text to convert to speech.
+            **kwargs: The voice, model and provider-specific parameters of the request.
+
+        Returns:
+            Optional[bytes]: The pre-synthesized audio, or None if it is not stored.
+        """
+        text = normalize_text(text)
+        if text not in self._texts:
+            return None
+        audio = self._audio.get(payload_fingerprint(provider, provider.atranscribe, text, **kwargs))
+        if audio is not None:
+            with self._lock:
+                self.hits += 1
+        return audio
+
+    def put(self, provider: TTSProvider, text: str, audio: bytes, **kwargs) -> None:
+        """
+        Store the audio of a synthesis request.
+
+        Args:
+            provider (TTSProvider): The provider the audio was synthesized with.
+            text (str): The synthesized text.
+            audio (bytes): The synthesized audio.
+            **kwargs: The voice, model and provider-specific parameters of the request.
+        """
+        text = normalize_text(text)
+        key = payload_fingerprint(provider, provider.atranscribe, text, **kwargs)
+        with self._lock:
+            self._audio[key] = audio
+            self._texts.add(text)
+
+    def clear(self) -> None:
+        """
+        Remove all stored phrases.
+        """
+        with self._lock:
+            self._audio.clear()
+            self._texts.clear()
+
+    async def warmup(self,
+                     provider: TTSProvider,
+                     phrases: Iterable[str],
+                     concurrency: int = 4,
+                     progress: Optional[Callable[[int, int, str], None]] = None,
+                     **kwargs) -> WarmupResult:
+        """
+        Pre-synthesize phrases concurrently and attach the store to the provider.
+
+        Phrases already in the store are skipped, so calling this again (e.g. from
+        `schedule`) only synthesizes new or previously failed phrases. Call it once
+        per voice/model combination.
+
+        Args:
+            provider (TTSProvider): The provider to synthesize with. Its `phrase_store`
+                is set to this store.
+            phrases (Iterable[str]): The phrases to synthesize.
+            concurrency (int): Maximum number of simultaneous syntheses, defaults to 4.
+                Keep it under the provider's rate limits.
+            progress (Optional[Callable[[int, int, str], None]]): Called with the number
+                of finished phrases, the total and the phrase after each phrase.
+            **kwargs: The voice, model and provider-specific parameters to synthesize with.
+
+        Returns:
+            WarmupResult: Counts of the synthesized and skipped phrases and the failures.
+        """
+        if concurrency < 1:
+            raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+        provider.phrase_store = self
+        phrases = list(dict.fromkeys(normalize_text(phrase) for phrase in phrases))
+        result = WarmupResult()
+        semaphore = asyncio.Semaphore(concurrency)
+        done = 0
+
+        async def synthesize(phrase: str) -> None:
+            nonlocal done
+            try:
+                if self.lookup(provider, phrase, **kwargs) is not None:
+                    result.skipped += 1
+                    return
+                async with semaphore:
+                    audio = await provider.atranscribe(phrase, **kwargs)
+                self.put(provider, phrase, audio.read(), **kwargs)
+                result.synthesized += 1
+            except Exception as e:
+                result.failed[phrase] = e
+            finally:
+                done += 1
+                if progress is not None:
+                    progress(done, len(phrases), phrase)
+
+        await asyncio.gather(*(synthesize(phrase) for phrase in phrases))
+        return result
+
+    def schedule(self,
+                 provider: TTSProvider,
+                 phrases: Iterable[str],
+                 interval: float,
+                 concurrency: int = 4,
+                 progress: Optional[Callable[[int, int, str], None]] = None,
+                 **kwargs) -> asyncio.Task:
+        """
+        Run `warmup` now and then every `interval` seconds in a background task.
+
+        Args:
+            provider (TTSProvider): The provider to synthesize with.
+            phrases (Iterable[str]): The phrases to synthesize.
+            interval (float): Seconds between two warmup runs.
+            concurrency (int): Maximum number of simultaneous syntheses, defaults to 4.
+            progress (Optional[Callable[[int, int, str], None]]): Progress callback,
+                see `warmup`.
+            **kwargs: The voice, model and provider-specific parameters to synthesize with.
+
+        Returns:
+            asyncio.Task: The background task. Cancel it to stop the schedule.
+        """
+        phrases = list(phrases)
+
+        async def run() -> None:
+            while True:
+                await self.warmup(provider, phrases, concurrency=concurrency, progress=progress, **kwargs)
+                await asyncio.sleep(interval)
+
+        return asyncio.create_task(run())
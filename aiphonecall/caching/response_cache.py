@@ -0,0 +1,137 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Optional
+
+
+class ResponseCache(ABC):
+    """
+    Abstract base class of the exact-match caches for text responses.
+
+    Stores LLM replies and transcripts under the request fingerprints computed
+    by CachedLLMProvider and CachedSTTProvider. Entries can expire after a time
+    to live. Implementations must be safe to share between threads.
+
+    Attributes:
+        default_ttl (Optional[float]): Seconds entries live if `put` is given no ttl,
+            None for no expiry.
+        hits (int): Number of lookups served from the cache.
+        misses (int): Number of lookups not found in the cache (or expired).
+    """
+
+    def __init__(self, default_ttl: Optional[float] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            default_ttl (Optional[float]): Seconds entries live if `put` is given no ttl,
+                defaults to None (no expiry).
+        """
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up an entry that has not expired.
+
+        Args:
+            key (str): The key of the entry.
+
+        Returns:
+            Optional[str]: The cached response, or None if there is none.
+        """
+        pass
+
+    @abstractmethod
+    def put(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """
+        Store an entry, replacing any previous one.
+
+        Args:
+            key (str): The key of the entry.
+            value (str): The response to store.
+            ttl (Optional[float]): Seconds the entry lives, defaults to `default_ttl`.
+        """
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """
+        Remove an entry if it exists.
+
+        Args:
+            key (str): The key of the entry.
+        """
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        """
+        Delete all entries and reset the counters.
+        """
+        pass
+
+    def _expiry(self, ttl: Optional[float]) -> Optional[float]:
+        ttl = self.default_ttl if ttl is None else ttl
+        return None if ttl is None else time.time() + ttl
+
+
+class MemoryLRUCache(ResponseCache):
+    """
+    In-process response cache with a bounded number of entries and LRU eviction.
+
+    Attributes:
+        max_entries (int): Maximum number of entries kept.
+        evictions (int): Number of entries evicted to stay under `max_entries`.
+    """
+
+    def __init__(self, max_entries: int = 1024, default_ttl: Optional[float] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of entries kept, defaults to 1024.
+            default_ttl (Optional[float]): Seconds entries live if `put` is given no ttl,
+                defaults to None (no expiry).
+        """
+        super().__init__(default_ttl)
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> (value, expiry time or None), least recently used first
+        self._entries: OrderedDict[str, tuple[str, Optional[float]]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (entry[1] is not None and entry[1] <= time.time()):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._entries[key] = (value, self._expiry(ttl))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
@@ -0,0 +1,97 @@
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from aiphonecall.caching.response_cache import ResponseCache
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    Response cache persisted in a SQLite database.
+
+    Survives restarts and can be shared by the processes of a batch job through
+    the database file. Expired entries are skipped on lookup and removed by
+    `purge_expired`, which also runs whenever the cache grows past
+    `max_entries`; then the least recently used entries are deleted as well.
+
+    Attributes:
+        path (str): Path of the database file, or ":memory:".
+        max_entries (Optional[int]): Maximum number of entries kept, None for no limit.
+    """
+
+    def __init__(self, path: str, max_entries: Optional[int] = None, default_ttl: Optional[float] = None):
+        """
+        Initialize the cache, creating the database if needed.
+
+        Args:
+            path (str): Path of the database file, or ":memory:".
+            max_entries (Optional[int]): Maximum number of entries kept, defaults to None
+                (no limit).
+            default_ttl (Optional[float]): Seconds entries live if `put` is given no ttl,
+                defaults to None (no expiry).
+        """
+        super().__init__(default_ttl)
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        with self._lock:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS responses ("
+                                     "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                                     "expires REAL, accessed REAL NOT NULL)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute("SELECT value FROM responses WHERE key = ? "
+                                           "AND (expires IS NULL OR expires > ?)", (key, now)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            self._connection.execute("INSERT OR REPLACE INTO responses (key, value, expires, accessed) "
+                                     "VALUES (?, ?, ?, ?)", (key, value, self._expiry(ttl), time.time()))
+            if self.max_entries is not None:
+                count = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+                if count > self.max_entries:
+                    self._purge_expired()
+                    self._connection.execute("DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                                             "ORDER BY accessed DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM responses")
+            self.hits = self.misses = 0
+
+    def purge_expired(self) -> None:
+        """
+        Delete the entries whose time to live has passed.
+        """
+        with self._lock:
+            self._purge_expired()
+
+    def close(self) -> None:
+        """
+        Close the database connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def _purge_expired(self) -> None:
+        self._connection.execute("DELETE FROM responses WHERE expires IS NOT NULL AND expires <= ?", (time.time(),))
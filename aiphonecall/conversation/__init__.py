@@ -0,0 +1 @@
+from .conversation import Conversation, estimate_tokens
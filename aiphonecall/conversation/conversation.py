@@ -0,0 +1,272 @@
+from enum import Enum
+from typing import Callable, Optional, Union
+
+from aiphonecall.interfaces.llm_provider_interface import LLMProvider
+
+# Tokens the chat format adds around every message (role, separators)
+_MESSAGE_OVERHEAD = 4
+
+_SUMMARY_PREFIX = "Summary of the earlier conversation: "
+_SUMMARY_PROMPT = (
+    "Summarize the following phone conversation for the assistant who will continue it. "
+    "Keep names, numbers, dates, decisions and open requests; be brief and factual.\n\n"
+    "{previous}{transcript}"
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text without a tokenizer.
+
+    English text averages about four characters per token with the OpenAI
+    tokenizers; the estimate only has to be good enough to keep the prompt
+    within budget.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        int: The estimated number of tokens.
+    """
+    return (len(text) + 3) // 4
+
+
+class Conversation:
+    """
+    Message history of a multi-turn chat, kept within a token budget.
+
+    The prompt is built as the system prompt, an optional summary of the turns
+    that no longer fit, and the recent turns, in this order. New turns are only
+    appended, so between two compactions every request starts with exactly the
+    same bytes as the previous one and provider-side prompt caching keeps
+    working.
+
+    When a request would exceed `max_tokens`, the oldest turns are removed until
+    the prompt is down to `target_tokens`. The gap between the two is the
+    hysteresis: the prefix then stays stable for many turns, instead of changing
+    on every turn as a sliding window would. Removed turns are dropped, or folded
+    into the summary if a `summarizer` is set, which costs one extra LLM call per
+    compaction.
+
+    Attributes:
+        system_prompt (str): The system message that starts every prompt.
+        max_tokens (int): Prompt size that triggers a compaction.
+        target_tokens (int): Prompt size a compaction reduces the history to.
+        keep_last (int): Number of most recent messages that are never removed.
+        summary (str): Summary of the removed turns, empty if there is none.
+        compactions (int): Number of compactions so far.
+    """
+
+    def __init__(self,
+                 system_prompt: str = "You are a helpful assistant.",
+                 max_tokens: int = 4000,
+                 target_tokens: Optional[int] = None,
+                 keep_last: int = 4,
+                 summarizer: Optional[LLMProvider] = None,
+                 summary_model: Union[str, Enum, None] = None,
+                 token_counter: Callable[[str], int] = estimate_tokens):
+        """
+        Initialize the conversation.
+
+        Args:
+            system_prompt (str): The system message, defaults to "You are a helpful assistant.".
+            max_tokens (int): Prompt size that triggers a compaction, defaults to 4000.
+            target_tokens (Optional[int]): Prompt size a compaction reduces the history to,
+                defaults to 60% of max_tokens.
+            keep_last (int): Number of most recent messages that are never removed,
+                defaults to 4.
+            summarizer (Optional[LLMProvider]): Provider that summarizes removed turns. If
+                None (default), removed turns are dropped.
+            summary_model (Union[str, Enum, None]): Model of the summarizer, defaults to the
+                summarizer's default model.
+            token_counter (Callable[[str], int]): Function counting the tokens of a text,
+                defaults to `estimate_tokens`. Pass a real tokenizer for exact budgets.
+        """
+        target_tokens = int(max_tokens * 0.6) if target_tokens is None else target_tokens
+        if not 0 < target_tokens <= max_tokens:
+            raise ValueError(f"Expected 0 < target_tokens <= max_tokens, got {target_tokens} and {max_tokens}")
+        self.system_prompt = system_prompt
+        self.max_tokens = max_tokens
+        self.target_tokens = target_tokens
+        self.keep_last = keep_last
+        self.summarizer = summarizer
+        self.summary_model = summary_model
+        self.token_counter = token_counter
+        self.summary = ""
+        self.compactions = 0
+        self._history: list[dict] = []
+        self._history_tokens: list[int] = []
+        self._removed: list[dict] = []
+
+    @property
+    def history(self) -> list[dict]:
+        """
+        list[dict]: The recent user and assistant messages, oldest first.
+        """
+        return list(self._history)
+
+    @property
+    def messages(self) -> list[dict]:
+        """
+        list[dict]: The complete prompt: system prompt, summary and recent turns.
+        """
+        return self._prefix() + list(self._history)
+
+    @property
+    def prompt_tokens(self) -> int:
+        """
+        int: Estimated size of the prompt in tokens.
+        """
+        return self._prefix_tokens() + sum(self._history_tokens)
+
+    def request_messages(self, text: Optional[str] = None) -> list[dict]:
+        """
+        Build the messages of a request, without recording the new turn yet.
+
+        The turn is recorded with `record` once the reply has arrived, so a failed
+        request can simply be retried.
+
+        Args:
+            text (Optional[str]): The new user message, if any.
+
+        Returns:
+            list[dict]: The messages to send.
+        """
+        messages = self.messages
+        if text is not None:
+            messages.append({"role": "user", "content": text})
+        return messages
+
+    def record(self, text: Optional[str], reply: str) -> None:
+        """
+        Append a completed turn to the history.
+
+        Args:
+            text (Optional[str]): The user message of the turn, if any.
+            reply (str): The reply of the assistant.
+        """
+        if text is not None:
+            self._append({"role": "user", "content": text})
+        self._append({"role": "assistant", "content": reply})
+
+    def add_message(self, role: str, content: str) -> None:
+        """
+        Append a single message to the history, e.g. a greeting spoken before the
+        first user turn.
+
+        Args:
+            role (str): "user" or "assistant".
+            content (str): The text of the message.
+        """
+        self._append({"role": role, "content": content})
+
+    def needs_compaction(self, text: Optional[str] = None) -> bool:
+        """
+        Tell whether a request with the given user message would exceed `max_tokens`.
+
+        Args:
+            text (Optional[str]): The new user message, if any.
+
+        Returns:
+            bool: Whether `compact` would remove turns.
+        """
+        pending = self._count(text) if text is not None else 0
+        return self.prompt_tokens + pending > self.max_tokens
+
+    def compact(self, text: Optional[str] = None) -> bool:
+        """
+        Remove the oldest turns if the next request would exceed the budget.
+
+        With a summarizer, the removed turns are folded into the summary with a
+        synchronous LLM call.
+
+        Args:
+            text (Optional[str]): The new user message, if any.
+
+        Returns:
+            bool: Whether turns were removed.
+        """
+        if not self._trim(text):
+            return False
+        if self.summarizer is not None:
+            self._set_summary(self.summarizer.chat(self._summary_prompt(), **self._summary_kwargs()))
+        self._removed.clear()
+        return True
+
+    async def acompact(self, text: Optional[str] = None) -> bool:
+        """
+        Remove the oldest turns if the next request would exceed the budget.
+
+        With a summarizer, the removed turns are folded into the summary with an
+        asynchronous LLM call.
+
+        Args:
+            text (Optional[str]): The new user message, if any.
+
+        Returns:
+            bool: Whether turns were removed.
+        """
+        if not self._trim(text):
+            return False
+        if self.summarizer is not None:
+            self._set_summary(await self.summarizer.achat(self._summary_prompt(), **self._summary_kwargs()))
+        self._removed.clear()
+        return True
+
+    def clear(self) -> None:
+        """
+        Forget the history and the summary, keeping the system prompt.
+        """
+        self._history.clear()
+        self._history_tokens.clear()
+        self._removed.clear()
+        self.summary = ""
+
+    def _append(self, message: dict) -> None:
+        self._history.append(message)
+        self._history_tokens.append(self._count(message["content"]))
+
+    def _count(self, content: str) -> int:
+        return self.token_counter(content) + _MESSAGE_OVERHEAD
+
+    def _prefix(self) -> list[dict]:
+        prefix = [{"role": "system", "content": self.system_prompt}]
+        if self.summary:
+            prefix.append({"role": "system", "content": _SUMMARY_PREFIX + self.summary})
+        return prefix
+
+    def _prefix_tokens(self) -> int:
+        return sum(self._count(message["content"]) for message in self._prefix())
+
+    def _trim(self, text: Optional[str]) -> bool:
+        if not self.needs_compaction(text):
+            return False
+        pending = self._count(text) if text is not None else 0
+        removable = max(0, len(self._history) - self.keep_last)
+        removed = 0
+        while removed < removable and self.prompt_tokens + pending > self.target_tokens:
+            self._removed.append(self._history.pop(0))
+            self._history_tokens.pop(0)
+            removed += 1
+        # Never start the history with an orphaned assistant reply
+        while removed < removable and self._history and self._history[0]["role"] == "assistant":
+            self._removed.append(self._history.pop(0))
+            self._history_tokens.pop(0)
+            removed += 1
+        if removed:
+            self.compactions += 1
+        return removed > 0
+
+    def _summary_prompt(self) -> str:
+        previous = f"Earlier summary: {self.summary}\n\n" if self.summary else ""
+        transcript = "\n".join(f"{message['role']}: {message['content']}" for message in self._removed)
+        return _SUMMARY_PROMPT.format(previous=previous, transcript=transcript)
+
+    def _summary_kwargs(self) -> dict:
+        kwargs = {"temperature": 0.0}
+        if self.summary_model is not None:
+            kwargs["model"] = self.summary_model
+        return kwargs
+
+    def _set_summary(self, summary: str) -> None:
+        self.summary = summary.strip()
@@ -0,0 +1,314 @@
+import asyncio
+import socket
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Iterator, Optional, Union
+
+import aiohttp
+import requests
+import urllib3
+
+from aiphonecall.utils.deadline import ProviderTimeoutError, RequestBudget, Timeouts
+from aiphonecall.utils.rate_limit import RateLimiter
+from aiphonecall.utils.transport import HTTPTransport
+
+
+class BaseProvider:
+    """
+    Common base for all LLM, STT and TTS providers.
+
+    Holds the authentication credentials, the pooled HTTP transport and the
+    rate limiter used for every request, and gives providers a context-manager /
+    `close()` lifecycle for the sync paths and an async context-manager /
+    `aclose()` lifecycle for all of them.
+
+    Async calls can be cancelled at any point, e.g. when the caller barges in:
+    the connection of the request is closed at once, the audio or text
+    received so far is discarded (streams keep what they already yielded),
+    and the cancellation is not counted as a failure of the service by the
+    rate limiter or the routers.
+
+    Attributes:
+        api_key (str): Authentication key for the service.
+        transport (HTTPTransport): Pooled HTTP transport used for the requests.
+        limiter (RateLimiter): Rate limits and adaptive concurrency of the requests.
+        timeouts (Timeouts): Default time budget of every request; override it per call
+            with the `timeout` argument of the provider methods.
+    """
+
+    def __init__(self,
+                 api_key: str,
+                 transport: Optional[HTTPTransport] = None,
+                 limiter: Optional[RateLimiter] = None):
+        """
+        Initialize the provider with authentication credentials.
+
+        Args:
+            api_key (str): Authentication key for the service.
+            transport (Optional[HTTPTransport]): Pooled HTTP transport to use. Defaults to
+                the shared transport so providers hitting the same host reuse connections.
+            limiter (Optional[RateLimiter]): Rate limiter to use. Defaults to the limiter
+                registered for the provider class and API key, so every instance using
+                the key shares its limits.
+        """
+        self.api_key = api_key
+        self.transport = transport if transport is not None else HTTPTransport.shared()
+        self.transport.acquire()
+        self._released = False
+        self.limiter = limiter if limiter is not None else RateLimiter.shared(type(self).__name__, api_key)
+        # Bounded by default so that a hung upstream can't pin a thread or coroutine forever
+        self.timeouts = Timeouts(connect=10.0, first_byte=60.0)
+
+    @contextmanager
+    def _post(self,
+              url: str,
+              units: float = 0,
+              timeout: Union[float, Timeouts, None] = None,
+              **kwargs) -> Iterator[requests.Response]:
+        """
+        Send a POST request through the transport within the limits of the provider.
+
+        The request holds a concurrency permit until the context exits, so a
+        streamed body counts as in flight while it is read. Throttled (429)
+        responses are retried after their Retry-After as the limiter allows, if
+        the body can be sent again and the time budget allows; the final
+        response is returned as is, for the caller to check.
+
+        The request is bounded by the provider's `timeouts` with `timeout`
+        applied and by the deadline of the context (see `deadline`). The body is
+        streamed, so the total timeout covers reading it inside the context as
+        well: when it expires, the connection is shut down and discarded.
+
+        Args:
+            url (str): The URL to post to.
+            units (float): Characters or tokens of the request, for the per-minute limit.
+            timeout (Union[float, Timeouts, None]): Time budget of this request; a number
+                is the total seconds. Defaults to the provider's `timeouts`.
+            **kwargs: Arguments of `HTTPTransport.post`.
+
+        Yields:
+            requests.Response: The response, closed when the context exits.
+
+        Raises:
+            ProviderTimeoutError: If the request runs out of time.
+        """
+        timeouts = self.timeouts.merge(timeout)
+        started = time.monotonic()
+        position = _body_position(kwargs.get("data"))
+        kwargs["stream"] = True
+        attempt = 0
+        while True:
+            with self.limiter.slot(units, max_wait=RequestBudget(timeouts, started).total) as outcome:
+                budget = RequestBudget(timeouts, started)
+                start = time.monotonic()
+                try:
+                    response = self.transport.post(url, timeout=(budget.connect, budget.first_byte), **kwargs)
+                except requests.ConnectTimeout as e:
+                    raise budget.error("connect") from e
+                except requests.RequestException as e:
+                    if _is_read_timeout(e):
+                        raise budget.error("first_byte") from e
+                    raise
+                outcome.record(response.status_code, time.monotonic() - start)
+                delay = self.limiter.retry_delay(response.status_code, response.headers.get("Retry-After"), attempt)
+                if delay is None or position is None or not _fits(delay, budget, start):
+                    left = None if budget.total is None else budget.total - (time.monotonic() - start)
+                    with response, _expiry(response, left) as expired:
+                        try:
+                            yield response
+                        except ProviderTimeoutError:
+                            raise
+                        except Exception as e:
+                            if expired.is_set():
+                                raise budget.error("total") from e
+                            if _is_read_timeout(e):
+                                raise budget.error("first_byte") from e
+                            raise
+                        if expired.is_set():
+                            # The body may have looked complete when the connection was cut
+                            raise budget.error("total")
+                    return
+                response.close()
+            time.sleep(delay)
+            _rewind(kwargs.get("data"), position)
+            attempt += 1
+
+    @asynccontextmanager
+    async def _apost(self,
+                     url: str,
+                     units: float = 0,
+                     timeout: Union[float, Timeouts, None] = None,
+                     **kwargs) -> AsyncIterator[aiohttp.ClientResponse]:
+        """
+        Send a POST request through the pooled async session within the limits of the provider.
+
+        The async counterpart of `_post`, sharing the same limits and timeouts.
+        When a timeout expires, aiohttp closes the connection instead of
+        returning it to the pool. So does cancelling the request, or closing
+        the stream reading its body, before the body is complete.
+
+        Args:
+            url (str): The URL to post to.
+            units (float): Characters or tokens of the request, for the per-minute limit.
+            timeout (Union[float, Timeouts, None]): Time budget of this request; a number
+                is the total seconds. Defaults to the provider's `timeouts`.
+            **kwargs: Arguments of `aiohttp.ClientSession.post`.
+
+        Yields:
+            aiohttp.ClientResponse: The response, released when the context exits.
+
+        Raises:
+            ProviderTimeoutError: If the request runs out of time.
+        """
+        timeouts = self.timeouts.merge(timeout)
+        started = time.monotonic()
+        session = await self.transport.asession()
+        position = _body_position(kwargs.get("data"))
+        attempt = 0
+        while True:
+            async with self.limiter.aslot(units, max_wait=RequestBudget(timeouts, started).total) as outcome:
+                budget = RequestBudget(timeouts, started)
+                client_timeout = aiohttp.ClientTimeout(total=budget.total, connect=budget.connect,
+                                                       sock_read=budget.first_byte)
+                start = time.monotonic()
+                try:
+                    async with session.post(url, timeout=client_timeout, **kwargs) as response:
+                        outcome.record(response.status, time.monotonic() - start)
+                        delay = self.limiter.retry_delay(response.status, response.headers.get("Retry-After"),
+                                                         attempt)
+                        if delay is None or position is None or not _fits(delay, budget, start):
+                            try:
+                                yield response
+                            except (asyncio.CancelledError, GeneratorExit):
+                                # The rest of the body is not wanted: drop the connection now
+                                # rather than draining it or leaving it to the pool's cleanup
+                                response.close()
+                                raise
+                            return
+                except ProviderTimeoutError:
+                    raise
+                except aiohttp.ConnectionTimeoutError as e:
+                    raise budget.error("connect") from e
+                except aiohttp.SocketTimeoutError as e:
+                    raise budget.error("first_byte") from e
+                except asyncio.TimeoutError as e:
+                    raise budget.error("total") from e
+            await asyncio.sleep(delay)
+            _rewind(kwargs.get("data"), position)
+            attempt += 1
+
+    def close(self) -> None:
+        """
+        Release the provider's transport, closing its pooled sync connections if no
+        other provider uses it.
+        """
+        if self._release():
+            self.transport.close()
+
+    async def aclose(self) -> None:
+        """
+        Release the provider's transport, closing all of its pooled connections if no
+        other provider uses it.
+        """
+        if self._release():
+            await self.transport.aclose()
+
+    def _release(self) -> bool:
+        """
+        Unregister the provider from its transport, once.
+
+        Returns:
+            bool: Whether the provider was its last user.
+        """
+        if self._released:
+            return False
+        self._released = True
+        return self.transport.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.aclose()
+
+
+def _body_position(data) -> Optional[int]:
+    """
+    Return where a request body starts, or None if it can't be sent a second time.
+    """
+    if data is None or isinstance(data, (bytes, bytearray, memoryview, str, dict)):
+        return 0
+    if hasattr(data, "seek") and hasattr(data, "tell"):
+        try:
+            return data.tell()
+        except OSError:
+            return None
+    # Generators and async iterators are consumed by the first attempt
+    return None
+
+
+def _rewind(data, position: int) -> None:
+    if hasattr(data, "seek"):
+        data.seek(position)
+
+
+def _fits(delay: float, budget: RequestBudget, start: float) -> bool:
+    """
+    Tell whether a retry after `delay` seconds still fits the time left.
+    """
+    return budget.total is None or delay < budget.total - (time.monotonic() - start)
+
+
+@contextmanager
+def _expiry(response: requests.Response, seconds: Optional[float]) -> Iterator[threading.Event]:
+    """
+    Shut the connection of a streamed response down once `seconds` have passed.
+
+    Shutting the socket down (rather than closing the response from another
+    thread) reliably wakes up a read blocked on it.
+
+    Yields:
+        threading.Event: Set if the time ran out.
+    """
+    expired = threading.Event()
+    if seconds is None:
+        yield expired
+        return
+
+    def expire() -> None:
+        expired.set()
+        sock = getattr(getattr(response.raw, "_connection", None), "sock", None)
+        try:
+            if sock is not None:
+                sock.shutdown(socket.SHUT_RDWR)
+            else:
+                response.close()
+        except OSError:
+            pass
+
+    timer = threading.Timer(max(0.0, seconds), expire)
+    timer.daemon = True
+    timer.start()
+    try:
+        yield expired
+    finally:
+        timer.cancel()
+
+
+def _is_read_timeout(error: Exception) -> bool:
+    """
+    Tell whether reading a streamed body failed on the read (first byte) timeout.
+    """
+    if isinstance(error, (requests.ReadTimeout, urllib3.exceptions.ReadTimeoutError, socket.timeout)):
+        return True
+    cause = error.args[0] if isinstance(error, requests.ConnectionError) and error.args else None
+    if isinstance(cause, urllib3.exceptions.MaxRetryError):
+        cause = cause.reason
+    return isinstance(cause, urllib3.exceptions.ReadTimeoutError)
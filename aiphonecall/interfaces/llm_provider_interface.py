@@ -1,9 +1,13 @@
 from abc import ABC, abstractmethod
 from enum import Enum
-from typing import Union
+from typing import AsyncIterator, Iterator, Union, Optional
 
+from aiphonecall.interfaces.base_provider import BaseProvider
+from aiphonecall.utils.rate_limit import RateLimiter
+from aiphonecall.utils.transport import HTTPTransport
 
-class LLMProvider(ABC):
+
+class LLMProvider(BaseProvider, ABC):
     """
     Abstract base class defining the interface for LLM providers.
 
@@ -14,16 +18,25 @@ class LLMProvider(ABC):
 
     Attributes:
         api_key (str): Authentication key for the LLM service.
+        transport (HTTPTransport): Pooled HTTP transport used for the requests.
+        limiter (RateLimiter): Rate limits and adaptive concurrency of the requests.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(self,
+                 api_key: str,
+                 transport: Optional[HTTPTransport] = None,
+                 limiter: Optional[RateLimiter] = None):
         """
         Initialize the LLM provider with authentication credentials.
 
         Args:
             api_key (str): Authentication key for the LLM service.
+            transport (Optional[HTTPTransport]): Pooled HTTP transport to use, defaults
+                to the shared transport.
+            limiter (Optional[RateLimiter]): Rate limiter to use, defaults to the limiter
+                shared by the provider class and API key.
         """
-        self.api_key = api_key
+        super().__init__(api_key, transport, limiter)
 
     @abstractmethod
     def _create_payload(self, **kwargs) -> tuple[str, dict, dict]:
@@ -86,3 +99,52 @@ class LLMProvider(ABC):
             ValueError: If invalid parameters are provided.
         """
         pass
+
+    @abstractmethod
+    def chat_stream(self,
+                    text: str,
+                    model: Union[str, Enum],
+                    **kwargs) -> Iterator[str]:
+        """
+        Synchronously chat with the LLM, yielding the reply as it is generated.
+
+        Args:
+            text (str): Your message to chat with the LLM.
+            model (Union[str, Enum]): The LLM model to use for conversation.
+                Can be either a string identifier or provider-specific enum.
+            **kwargs: Additional provider-specific parameters
+
+        Yields:
+            str: Text deltas of the reply, in order.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ValueError: If invalid parameters are provided.
+        """
+        pass
+
+    @abstractmethod
+    def achat_stream(self,
+                     text: str,
+                     model: Union[str, Enum],
+                     **kwargs) -> AsyncIterator[str]:
+        """
+        Asynchronously chat with the LLM, yielding the reply as it is generated.
+
+        Implementations must yield each text delta as soon as it is received so
+        downstream stages can start working before the reply is complete.
+
+        Args:
+            text (str): Your message to chat with the LLM.
+            model (Union[str, Enum]): The LLM model to use for conversation.
+                Can be either a string identifier or provider-specific enum.
+            **kwargs: Additional provider-specific parameters
+
+        Yields:
+            str: Text deltas of the reply, in order.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ValueError: If invalid parameters are provided.
+        """
+        pass
@@ -1,9 +1,85 @@
+import asyncio
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Union, BinaryIO
+from typing import AsyncIterator, Callable, Collection, Iterable, Union, Optional
 
+from aiphonecall.audio.pcm import is_pcm16_wav, read_wav, write_wav
+from aiphonecall.audio.segment import split_at_silence
+from aiphonecall.audio.vad import SilenceTrimmer
+from aiphonecall.interfaces.base_provider import BaseProvider
+from aiphonecall.interfaces.stt_stream_session_interface import STTStreamSession
+from aiphonecall.utils.audio_source import AudioSource, apeek_audio, aread_audio, peek_audio, read_audio
+from aiphonecall.utils.concurrency import iterate_in_thread, map_bounded
+from aiphonecall.utils.files import iter_files
+from aiphonecall.utils.rate_limit import RateLimiter
+from aiphonecall.utils.transport import HTTPTransport
 
-class STTProvider(ABC):
+# Enough of a WAV file to reach its format chunk
+_HEADER_BYTES = 4096
+
+
+@dataclass
+class TranscriptSegment:
+    """
+    One segment of a recording transcribed by `STTProvider.aspeech2text_long`.
+
+    Attributes:
+        index (int): Position of the segment in the recording.
+        start (float): Offset of the segment from the start of the recording, in seconds.
+        end (float): End of the segment, in seconds from the start of the recording.
+        text (str): The transcript of the segment, empty if it failed.
+        attempts (int): Number of times the segment was sent.
+        error (Optional[Exception]): The error of the last attempt, if the segment failed.
+    """
+    index: int
+    start: float
+    end: float
+    text: str = ""
+    attempts: int = 0
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """
+        bool: Whether the segment was transcribed successfully.
+        """
+        return self.error is None
+
+
+@dataclass
+class LongTranscript:
+    """
+    Transcript of a long recording, stitched from its segments.
+
+    Attributes:
+        segments (list[TranscriptSegment]): The segments, in recording order.
+    """
+    segments: list[TranscriptSegment] = field(default_factory=list)
+
+    @property
+    def text(self) -> str:
+        """
+        str: The transcripts of all successful segments, joined in order.
+        """
+        return " ".join(segment.text for segment in self.segments if segment.text)
+
+    @property
+    def failed(self) -> list[TranscriptSegment]:
+        """
+        list[TranscriptSegment]: The segments that could not be transcribed.
+        """
+        return [segment for segment in self.segments if not segment.ok]
+
+    @property
+    def complete(self) -> bool:
+        """
+        bool: Whether every segment was transcribed.
+        """
+        return not self.failed
+
+
+class STTProvider(BaseProvider, ABC):
     """
     Abstract base class defining the interface for Speech-To-Text providers.
 
@@ -14,19 +90,28 @@ class STTProvider(ABC):
 
     Attributes:
         api_key (str): Authentication key for the STT service.
+        transport (HTTPTransport): Pooled HTTP transport used for the requests.
+        limiter (RateLimiter): Rate limits and adaptive concurrency of the requests.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(self,
+                 api_key: str,
+                 transport: Optional[HTTPTransport] = None,
+                 limiter: Optional[RateLimiter] = None):
         """
         Initialize the STT provider with authentication credentials.
 
         Args:
             api_key (str): Authentication key for the STT service.
+            transport (Optional[HTTPTransport]): Pooled HTTP transport to use, defaults
+                to the shared transport.
+            limiter (Optional[RateLimiter]): Rate limiter to use, defaults to the limiter
+                shared by the provider class and API key.
         """
-        self.api_key = api_key
+        super().__init__(api_key, transport, limiter)
 
     @abstractmethod
-    def _create_payload(self, **kwargs) -> tuple[str, dict, BinaryIO]:
+    def _create_payload(self, **kwargs) -> tuple[str, dict, AudioSource]:
         """
         Create the API request payload for the STT service.
 
@@ -34,23 +119,26 @@ class STTProvider(ABC):
             **kwargs: Arbitrary keyword arguments specific to the STT provider.
 
         Returns:
-            tuple[str, dict, BinaryIO]: A tuple containing:
+            tuple[str, dict, AudioSource]: A tuple containing:
                 - URL endpoint for the API request
                 - Headers for the API request
-                - File data payload for the API request . e.g. open('file.wav', 'rb')
+                - Audio source for the API request. It is opened with `open_audio`
+                  for the duration of the request, e.g. 'file.wav' or b'...'
         """
         pass
 
     @abstractmethod
     def speech2text(self,
-                    filepath: str,
+                    audio: AudioSource,
                     model: Union[str, Enum],
                     **kwargs) -> str:
         """
         Synchronously convert speech to text.
 
         Args:
-            filepath (str): The path of the file that needs conversion.
+            audio (AudioSource): The audio that needs conversion: a file path, bytes,
+                memoryview or binary file object (async methods also accept an async
+                iterator of bytes).
             model (Union[str, Enum]): The model to use for speech to text conversion.
                 Can be either a string identifier or provider-specific enum.
             **kwargs: Additional provider-specific parameters
@@ -66,14 +154,16 @@ class STTProvider(ABC):
 
     @abstractmethod
     async def aspeech2text(self,
-                           filepath: str,
+                           audio: AudioSource,
                            model: Union[str, Enum],
                            **kwargs) -> str:
         """
         Asynchronously convert speech to text.
 
         Args:
-            filepath (str): The path of the file that needs conversion.
+            audio (AudioSource): The audio that needs conversion: a file path, bytes,
+                memoryview or binary file object (async methods also accept an async
+                iterator of bytes).
             model (Union[str, Enum]): The model to use for speech to text conversion.
                 Can be either a string identifier or provider-specific enum.
             **kwargs: Additional provider-specific parameters
@@ -86,3 +176,196 @@ class STTProvider(ABC):
             ValueError: If invalid parameters are provided.
         """
         pass
+
+    @abstractmethod
+    def aspeech2text_stream(self,
+                            model: Union[str, Enum],
+                            **kwargs) -> STTStreamSession:
+        """
+        Open a live speech-to-text session.
+
+        Unlike `aspeech2text`, which transcribes a complete recording, the session
+        accepts raw audio frames while they are being captured and delivers
+        interim and final transcripts plus endpointing events as they happen.
+
+        Args:
+            model (Union[str, Enum]): The model to use for speech to text conversion.
+                Can be either a string identifier or provider-specific enum.
+            **kwargs: Additional provider-specific parameters (e.g. encoding, sample rate).
+
+        Returns:
+            STTStreamSession: The session. It connects when entered as an async
+            context manager.
+
+        Raises:
+            ValueError: If invalid parameters are provided.
+        """
+        pass
+
+    @staticmethod
+    def _trim_silence(audio: AudioSource, trimmer: SilenceTrimmer) -> tuple[AudioSource, bool]:
+        """
+        Cut the silence of a 16-bit PCM WAV recording before it is uploaded.
+
+        Only the header is read to tell the format. Recordings in other formats are
+        passed through untouched, so files are still streamed from disk.
+
+        Args:
+            audio (AudioSource): The audio to upload.
+            trimmer (SilenceTrimmer): The trimmer to use; it accumulates the seconds removed.
+
+        Returns:
+            tuple[AudioSource, bool]: The audio to upload, and whether it has any speech.
+        """
+        header, audio = peek_audio(audio, _HEADER_BYTES)
+        if not is_pcm16_wav(header):
+            return audio, True
+        trimmed = trimmer.trim(read_audio(audio))
+        return trimmed.audio, trimmed.has_speech
+
+    @staticmethod
+    async def _atrim_silence(audio: AudioSource, trimmer: SilenceTrimmer) -> tuple[AudioSource, bool]:
+        """
+        Cut the silence of a 16-bit PCM WAV recording before it is uploaded, off the
+        event loop.
+
+        Only the header is read to tell the format. Recordings in other formats are
+        passed through untouched, so files and async iterators are still streamed.
+
+        Args:
+            audio (AudioSource): The audio to upload, which may be an async iterator.
+            trimmer (SilenceTrimmer): The trimmer to use; it accumulates the seconds removed.
+
+        Returns:
+            tuple[AudioSource, bool]: The audio to upload, and whether it has any speech.
+        """
+        header, audio = await apeek_audio(audio, _HEADER_BYTES)
+        if not is_pcm16_wav(header):
+            return audio, True
+        if hasattr(audio, "__aiter__"):
+            data = await aread_audio(audio)
+            trimmed = await asyncio.to_thread(trimmer.trim, data)
+        else:
+            trimmed = await asyncio.to_thread(lambda: trimmer.trim(read_audio(audio)))
+        return trimmed.audio, trimmed.has_speech
+
+    async def aspeech2text_long(self,
+                                audio: AudioSource,
+                                segment_seconds: float = 60.0,
+                                concurrency: int = 4,
+                                retries: int = 2,
+                                retry_delay: float = 1.0,
+                                **kwargs) -> LongTranscript:
+        """
+        Asynchronously convert a long recording to text in parallel segments.
+
+        The recording is split at pauses into segments of at most `segment_seconds`,
+        which are uploaded through `aspeech2text` with at most `concurrency` uploads
+        in flight, so wall-clock time no longer equals the provider's serial
+        processing time. Segments that fail are retried, without sending the others
+        again, up to `retries` more times with exponential backoff. The transcript
+        is stitched in recording order and every segment keeps its time offset.
+
+        Args:
+            audio (AudioSource): The recording, a 16-bit PCM WAV file in any of the
+                supported source types.
+            segment_seconds (float): Maximum duration of a segment, defaults to 60.
+            concurrency (int): Maximum number of simultaneous uploads, defaults to 4.
+            retries (int): How many more times failed segments are sent, defaults to 2.
+            retry_delay (float): Seconds to wait before the first retry round, doubled
+                for every further round, defaults to 1.
+            **kwargs: Parameters passed to every `aspeech2text` call (e.g. model).
+
+        Returns:
+            LongTranscript: The stitched transcript. Segments that still failed after all
+            retries are reported in `failed` instead of failing the whole recording.
+
+        Raises:
+            ValueError: If the audio is not a 16-bit PCM WAV file.
+        """
+        data = await aread_audio(audio)
+        # Decoding copies the whole recording, so keep it off the event loop like the split
+        decoded = await asyncio.to_thread(read_wav, data)
+        if decoded is None:
+            raise ValueError("Long-audio transcription requires a 16-bit PCM WAV recording")
+        samples, sample_rate, channels = decoded
+        frames = samples[:len(samples) - len(samples) % channels].reshape(-1, channels)
+        bounds = await asyncio.to_thread(split_at_silence, samples, sample_rate, channels,
+                                         segment_seconds, min(15.0, segment_seconds / 4))
+        transcript = LongTranscript([TranscriptSegment(index, start / sample_rate, end / sample_rate)
+                                     for index, (start, end) in enumerate(bounds)])
+
+        async def transcribe(segment: TranscriptSegment) -> None:
+            start, end = bounds[segment.index]
+            wav = write_wav(frames[start:end].reshape(-1), sample_rate, channels)
+            segment.attempts += 1
+            try:
+                segment.text = await self.aspeech2text(wav, **kwargs)
+                segment.error = None
+            except Exception as e:
+                segment.error = e
+
+        pending = transcript.segments
+        for attempt in range(retries + 1):
+            if attempt:
+                await asyncio.sleep(retry_delay * 2 ** (attempt - 1))
+            async for _ in map_bounded(transcribe, pending, concurrency):
+                pass
+            pending = transcript.failed
+            if not pending:
+                break
+        return transcript
+
+    async def aspeech2text_many(self,
+                                sources: Union[str, Iterable[str]],
+                                concurrency: int = 8,
+                                skip: Union[Collection[str], Callable[[str], bool], None] = None,
+                                recursive: bool = True,
+                                return_exceptions: bool = True,
+                                **kwargs) -> AsyncIterator[tuple[str, Union[str, Exception]]]:
+        """
+        Asynchronously convert many recordings to text with parallel uploads.
+
+        Sources are expanded lazily into files, in batches on a worker thread so
+        that walking large directories doesn't block the event loop, and uploaded
+        through `aspeech2text` over the provider's pooled transport, with at most
+        `concurrency` uploads in flight. Results are yielded as soon as each upload
+        completes, so they can arrive out of order.
+
+        Args:
+            sources (Union[str, Iterable[str]]): A file path, glob pattern or directory,
+                or an iterable of them.
+            concurrency (int): Maximum number of simultaneous uploads, defaults to 8.
+            skip (Union[Collection[str], Callable[[str], bool], None]): Files that already
+                have results, to resume an interrupted run. Either a collection of paths
+                or a predicate called with each path, on the thread expanding the sources.
+            recursive (bool): Whether directories are walked recursively, defaults to True.
+            return_exceptions (bool): If True (default) a failing file yields its exception
+                in place of the transcript and the run goes on; if False the first
+                failure is raised and the remaining uploads are cancelled.
+            **kwargs: Parameters passed to every `aspeech2text` call (e.g. model).
+
+        Yields:
+            tuple[str, Union[str, Exception]]: The path and its transcript (or error),
+            in completion order.
+
+        Raises:
+            FileNotFoundError: If a plain path in `sources` does not exist.
+        """
+        if skip is None:
+            paths = iter_files(sources, recursive)
+        elif callable(skip):
+            paths = (path for path in iter_files(sources, recursive) if not skip(path))
+        else:
+            paths = (path for path in iter_files(sources, recursive) if path not in skip)
+
+        async def transcribe(path: str) -> tuple[str, Union[str, Exception]]:
+            try:
+                return path, await self.aspeech2text(path, **kwargs)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                return path, e
+
+        async for result in map_bounded(transcribe, iterate_in_thread(paths), concurrency):
+            yield result
@@ -0,0 +1,99 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import AsyncIterator, Optional
+
+
+class STTStreamEventType(Enum):
+    INTERIM = "interim"
+    FINAL = "final"
+    SPEECH_STARTED = "speech_started"
+    UTTERANCE_END = "utterance_end"
+
+
+@dataclass
+class STTStreamEvent:
+    """
+    Event received from a live speech-to-text session.
+
+    Attributes:
+        type (STTStreamEventType): The kind of event.
+        text (str): The transcript, for INTERIM and FINAL events.
+        speech_final (bool): For FINAL events, whether the service detected the end
+            of the speaker's turn (endpointing) after this transcript.
+        start (Optional[float]): Start of the event in seconds from the start of the stream.
+        duration (Optional[float]): Duration in seconds of the audio the transcript covers.
+        end (Optional[float]): End of the last spoken word in seconds from the start of the
+            stream, if known. For UTTERANCE_END events, the end of the utterance.
+        raw (dict): The message as received from the service.
+    """
+    type: STTStreamEventType
+    text: str = ""
+    speech_final: bool = False
+    start: Optional[float] = None
+    duration: Optional[float] = None
+    end: Optional[float] = None
+    raw: dict = field(default_factory=dict)
+
+
+class STTStreamSession(ABC):
+    """
+    Abstract base class defining a live speech-to-text session.
+
+    Raw audio frames are pushed with `send` while the call is running, and
+    interim and final transcripts plus endpointing events are consumed by
+    iterating over the session. Use it as an async context manager to connect
+    and close it:
+
+        async with stt.aspeech2text_stream(...) as session:
+            ...  # send frames from one task, `async for event in session` in another
+    """
+
+    @abstractmethod
+    async def connect(self) -> None:
+        """
+        Open the connection to the service.
+        """
+        pass
+
+    @abstractmethod
+    async def send(self, audio: bytes) -> None:
+        """
+        Push a frame of raw audio to the service.
+
+        Args:
+            audio (bytes): The audio frame, in the encoding the session was opened with.
+        """
+        pass
+
+    @abstractmethod
+    async def finish(self) -> None:
+        """
+        Signal the end of the audio. Remaining events are still delivered, then the
+        iteration ends.
+        """
+        pass
+
+    @abstractmethod
+    def __aiter__(self) -> AsyncIterator[STTStreamEvent]:
+        """
+        Iterate over the events of the session until it is finished or closed.
+
+        Yields:
+            STTStreamEvent: The events, in the order they are received.
+        """
+        pass
+
+    @abstractmethod
+    async def aclose(self) -> None:
+        """
+        Close the connection immediately.
+        """
+        pass
+
+    async def __aenter__(self) -> "STTStreamSession":
+        await self.connect()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.aclose()
@@ -1,9 +1,47 @@
+import contextvars
 from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import IO, Union
+from io import BytesIO
+from typing import IO, AsyncIterator, Iterable, Union, Optional, TYPE_CHECKING
 
+from aiphonecall.audio.join import audio_container, join_audio
+from aiphonecall.interfaces.base_provider import BaseProvider
+from aiphonecall.utils.concurrency import map_bounded
+from aiphonecall.utils.text import split_sentences
+from aiphonecall.utils.rate_limit import RateLimiter
+from aiphonecall.utils.transport import HTTPTransport
 
-class TTSProvider(ABC):
+if TYPE_CHECKING:
+    from aiphonecall.caching.phrase_store import PhraseStore
+
+
+@dataclass
+class TTSBatchResult:
+    """
+    Result of a single item of `TTSProvider.atranscribe_many`.
+
+    Attributes:
+        index (int): Position of the item in the input.
+        params (dict): Parameters the item was synthesized with, including 'text'.
+        audio (Optional[IO[bytes]]): The generated audio, or None if the item failed.
+        error (Optional[Exception]): The error the item failed with, if any.
+    """
+    index: int
+    params: dict = field(default_factory=dict)
+    audio: Optional[IO[bytes]] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        """
+        bool: Whether the item was synthesized successfully.
+        """
+        return self.error is None
+
+
+class TTSProvider(BaseProvider, ABC):
     """
     Abstract base class defining the interface for Text-to-Speech providers.
 
@@ -14,16 +52,43 @@ class TTSProvider(ABC):
 
     Attributes:
         api_key (str): Authentication key for the TTS service.
+        transport (HTTPTransport): Pooled HTTP transport used for the requests.
+        limiter (RateLimiter): Rate limits and adaptive concurrency of the requests.
+        phrase_store (Optional[PhraseStore]): Store of pre-synthesized phrases checked
+            before going to the network, if any.
     """
 
-    def __init__(self, api_key: str):
+    def __init__(self,
+                 api_key: str,
+                 transport: Optional[HTTPTransport] = None,
+                 limiter: Optional[RateLimiter] = None):
         """
         Initialize the TTS provider with authentication credentials.
 
         Args:
             api_key (str): Authentication key for the TTS service.
+            transport (Optional[HTTPTransport]): Pooled HTTP transport to use, defaults
+                to the shared transport.
+            limiter (Optional[RateLimiter]): Rate limiter to use, defaults to the limiter
+                shared by the provider class and API key.
         """
-        self.api_key = api_key
+        super().__init__(api_key, transport, limiter)
+        self.phrase_store: Optional["PhraseStore"] = None
+
+    def _stored_phrase(self, text: str, **kwargs) -> Optional[bytes]:
+        """
+        Return the pre-synthesized audio of a request from the phrase store, if any.
+
+        Args:
+            text (str): The text to convert to speech.
+            **kwargs: The voice, model and provider-specific parameters of the request.
+
+        Returns:
+            Optional[bytes]: The stored audio, or None if there is none.
+        """
+        if self.phrase_store is None:
+            return None
+        return self.phrase_store.lookup(self, text, **kwargs)
 
     @abstractmethod
     def _create_payload(self, **kwargs) -> tuple[str, dict, dict]:
@@ -46,6 +111,7 @@ class TTSProvider(ABC):
                    text: str,
                    voice: Union[str, Enum],
                    model: Union[str, Enum],
+                   output_format: Union[str, Enum, None] = None,
                    **kwargs) -> IO[bytes]:
         """
         Synchronously convert text to speech.
@@ -56,6 +122,9 @@ class TTSProvider(ABC):
                 Can be either a string identifier or provider-specific enum.
             model (Union[str, Enum]): The model to use for speech synthesis.
                 Can be either a string identifier or provider-specific enum.
+            output_format (Union[str, Enum, None]): Encoding and sample rate of the audio,
+                mapped to the provider's native parameters (e.g. 8 kHz mu-law for the
+                telephony leg). Defaults to the provider's default format.
             **kwargs: Additional provider-specific parameters (e.g., stability,
                      similarity for ElevenLabs).
 
@@ -73,6 +142,7 @@ class TTSProvider(ABC):
                           text: str,
                           voice: Union[str, Enum],
                           model: Union[str, Enum],
+                          output_format: Union[str, Enum, None] = None,
                           **kwargs) -> IO[bytes]:
         """
         Asynchronously convert text to speech.
@@ -83,6 +153,9 @@ class TTSProvider(ABC):
                 Can be either a string identifier or provider-specific enum.
             model (Union[str, Enum]): The model to use for speech synthesis.
                 Can be either a string identifier or provider-specific enum.
+            output_format (Union[str, Enum, None]): Encoding and sample rate of the audio,
+                mapped to the provider's native parameters (e.g. 8 kHz mu-law for the
+                telephony leg). Defaults to the provider's default format.
             **kwargs: Additional provider-specific parameters (e.g., stability,
                      similarity for ElevenLabs).
 
@@ -93,4 +166,216 @@ class TTSProvider(ABC):
             HTTPError: If the API request fails.
             ValueError: If invalid parameters are provided.
         """
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    def atranscribe_stream(self,
+                           text: str,
+                           voice: Union[str, Enum],
+                           model: Union[str, Enum],
+                           output_format: Union[str, Enum, None] = None,
+                           **kwargs) -> AsyncIterator[bytes]:
+        """
+        Asynchronously convert text to speech, yielding audio chunks as they arrive.
+
+        Implementations must yield each chunk as soon as it is received from the
+        service instead of buffering the whole response, so callers can start
+        playback while the synthesis is still running.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice (Union[str, Enum]): The voice to use for speech synthesis.
+                Can be either a string identifier or provider-specific enum.
+            model (Union[str, Enum]): The model to use for speech synthesis.
+                Can be either a string identifier or provider-specific enum.
+            output_format (Union[str, Enum, None]): Encoding and sample rate of the audio,
+                mapped to the provider's native parameters (e.g. 8 kHz mu-law for the
+                telephony leg). Defaults to the provider's default format.
+            **kwargs: Additional provider-specific parameters (e.g., stability,
+                     similarity for ElevenLabs).
+
+        Yields:
+            bytes: Chunks of the generated audio, in order.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ValueError: If invalid parameters are provided.
+        """
+        pass
+
+    async def atranscribe_many(self,
+                               items: Iterable[Union[str, dict]],
+                               concurrency: int = 8,
+                               **kwargs) -> AsyncIterator[TTSBatchResult]:
+        """
+        Asynchronously convert many texts to speech with bounded concurrency.
+
+        Items are read lazily and synthesized through `atranscribe` over the
+        provider's pooled transport, with at most `concurrency` requests in flight.
+        Results are yielded as soon as they complete, so they can arrive out of
+        order; each carries the index of its item. A failing item is reported
+        through the `error` of its result and does not abort the batch.
+
+        Args:
+            items (Iterable[Union[str, dict]]): The texts to convert, or dicts of
+                `atranscribe` parameters that must include 'text'.
+            concurrency (int): Maximum number of simultaneous requests, defaults to 8.
+            **kwargs: Parameters shared by all items (e.g. voice, model). Parameters
+                given in an item's dict take precedence.
+
+        Yields:
+            TTSBatchResult: The result of each item, in completion order.
+        """
+
+        async def synthesize(entry: tuple[int, Union[str, dict]]) -> TTSBatchResult:
+            index, item = entry
+            params = dict(kwargs)
+            if isinstance(item, str):
+                params["text"] = item
+            else:
+                params.update(item)
+            try:
+                return TTSBatchResult(index=index, params=params, audio=await self.atranscribe(**params))
+            except Exception as e:
+                return TTSBatchResult(index=index, params=params, error=e)
+
+        async for result in map_bounded(synthesize, enumerate(items), concurrency):
+            yield result
+
+    def _long_segments(self, text: str, output_format: Union[str, Enum, None], max_chars: int) -> list[str]:
+        """
+        Split a long text for `transcribe_long` / `atranscribe_long`.
+
+        Args:
+            text (str): The text to convert to speech.
+            output_format (Union[str, Enum, None]): The requested output format.
+            max_chars (int): Maximum length of a segment.
+
+        Returns:
+            list[str]: The segments, each between half and all of max_chars long where
+            the sentence boundaries allow it.
+
+        Raises:
+            ValueError: If the text needs several segments and the output format can't
+                be joined.
+        """
+        segments = split_sentences(text, min_chars=max_chars // 2, max_chars=max_chars)
+        if len(segments) > 1 and audio_container(output_format) == "flac":
+            raise ValueError("FLAC segments can't be joined; use MP3, WAV or PCM for long texts")
+        return segments
+
+    def transcribe_long(self,
+                        text: str,
+                        voice: Union[str, Enum, None] = None,
+                        model: Union[str, Enum, None] = None,
+                        output_format: Union[str, Enum, None] = None,
+                        max_chars: int = 500,
+                        concurrency: int = 4,
+                        **kwargs) -> IO[bytes]:
+        """
+        Synchronously convert a long text to speech in parallel segments.
+
+        The text is split at sentence boundaries into segments of at most
+        `max_chars`, which stays below the providers' request length limits. The
+        segments are synthesized through `transcribe` on up to `concurrency`
+        threads sharing the pooled transport, so the total time follows the
+        slowest segment instead of the sum of all, and the audio is joined in
+        order (frame-aware for MP3, with a rewritten header for WAV, as is for PCM).
+
+        Args:
+            text (str): The text to convert to speech.
+            voice (Union[str, Enum, None]): The voice to use for speech synthesis, defaults
+                to the provider's default.
+            model (Union[str, Enum, None]): The model to use for speech synthesis, defaults
+                to the provider's default.
+            output_format (Union[str, Enum, None]): Encoding and sample rate of the audio,
+                defaults to the provider's default format. FLAC can't be joined.
+            max_chars (int): Maximum length of a segment, defaults to 500.
+            concurrency (int): Maximum number of simultaneous requests, defaults to 4.
+            **kwargs: Additional provider-specific parameters passed to `transcribe`.
+
+        Returns:
+            IO[bytes]: A binary stream containing the generated audio.
+
+        Raises:
+            HTTPError: If a request fails; the segments not started yet are skipped.
+            ValueError: If invalid parameters are provided.
+        """
+        segments = self._long_segments(text, output_format, max_chars)
+        options = _long_options(voice, model, output_format, kwargs)
+        if len(segments) <= 1:
+            return self.transcribe(text=text, **options)
+
+        def synthesize(segment: str) -> bytes:
+            return self.transcribe(text=segment, **options).read()
+
+        # Run every segment in a copy of this context, so that a `deadline` applies to it too
+        context = contextvars.copy_context()
+        executor = ThreadPoolExecutor(max_workers=concurrency)
+        try:
+            parts = list(executor.map(lambda segment: context.copy().run(synthesize, segment), segments))
+        finally:
+            executor.shutdown(cancel_futures=True)
+        return BytesIO(join_audio(parts, audio_container(output_format)))
+
+    async def atranscribe_long(self,
+                               text: str,
+                               voice: Union[str, Enum, None] = None,
+                               model: Union[str, Enum, None] = None,
+                               output_format: Union[str, Enum, None] = None,
+                               max_chars: int = 500,
+                               concurrency: int = 4,
+                               **kwargs) -> IO[bytes]:
+        """
+        Asynchronously convert a long text to speech in parallel segments.
+
+        The text is split at sentence boundaries into segments of at most
+        `max_chars`, which stays below the providers' request length limits. The
+        segments are synthesized concurrently through `atranscribe`, with at most
+        `concurrency` requests in flight, so the total time follows the slowest
+        segment instead of the sum of all, and the audio is joined in order
+        (frame-aware for MP3, with a rewritten header for WAV, as is for PCM).
+
+        Args:
+            text (str): The text to convert to speech.
+            voice (Union[str, Enum, None]): The voice to use for speech synthesis, defaults
+                to the provider's default.
+            model (Union[str, Enum, None]): The model to use for speech synthesis, defaults
+                to the provider's default.
+            output_format (Union[str, Enum, None]): Encoding and sample rate of the audio,
+                defaults to the provider's default format. FLAC can't be joined.
+            max_chars (int): Maximum length of a segment, defaults to 500.
+            concurrency (int): Maximum number of simultaneous requests, defaults to 4.
+            **kwargs: Additional provider-specific parameters passed to `atranscribe`.
+
+        Returns:
+            IO[bytes]: A binary stream containing the generated audio.
+
+        Raises:
+            HTTPError: If a request fails; the other requests are cancelled.
+            ValueError: If invalid parameters are provided.
+        """
+        segments = self._long_segments(text, output_format, max_chars)
+        options = _long_options(voice, model, output_format, kwargs)
+        if len(segments) <= 1:
+            return await self.atranscribe(text=text, **options)
+
+        async def synthesize(entry: tuple[int, str]) -> tuple[int, bytes]:
+            index, segment = entry
+            audio = await self.atranscribe(text=segment, **options)
+            return index, audio.read()
+
+        parts: list[bytes] = [b""] * len(segments)
+        async for index, audio in map_bounded(synthesize, enumerate(segments), concurrency):
+            parts[index] = audio
+        return BytesIO(join_audio(parts, audio_container(output_format)))
+
+
+def _long_options(voice, model, output_format, kwargs: dict) -> dict:
+    # Only forward what was given so the provider's own defaults apply
+    options = {**kwargs, "output_format": output_format}
+    if voice is not None:
+        options["voice"] = voice
+    if model is not None:
+        options["model"] = model
+    return options
@@ -1,7 +1,12 @@
-import aiohttp
-import requests
+import json
+from typing import AsyncIterator, Iterator, Optional
 
+from aiphonecall.conversation.conversation import Conversation, estimate_tokens
 from aiphonecall.interfaces.llm_provider_interface import LLMProvider
+from aiphonecall.utils.sse import SSEDecoder
+from aiphonecall.utils.deadline import Timeouts
+from aiphonecall.utils.rate_limit import RateLimiter
+from aiphonecall.utils.transport import HTTPTransport
 from aiphonecall.utils.util import validate_str_value
 from .openai_llm_schema import OpenAILLMModels
 
@@ -10,25 +15,34 @@ class OpenAILLMProvider(LLMProvider):
     """
     Openai implementation of the LLMProvider interface.
 
-    Provides chat completion OPENAI API, using various models
+    Provides chat completion OPENAI API, using various models. Every chat method
+    takes either a single message, an explicit list of messages, or a
+    Conversation that supplies the history and records the new turn.
     """
 
-    def __init__(self, api_key):
-        super().__init__(api_key)
+    def __init__(self,
+                 api_key: str,
+                 transport: Optional[HTTPTransport] = None,
+                 limiter: Optional[RateLimiter] = None):
+        super().__init__(api_key, transport, limiter)
 
     def _create_payload(self, **kwargs) -> tuple[str, dict, dict]:
         """
         Create the API request payload for OPENAI LLM service.
 
         Args:
-            **kwargs: Must include 'text', 'temperature' and  'model'
+            **kwargs: Must include 'temperature' and  'model', and either 'text' or
+                     'messages' (a list of chat messages sent as is). Optionally
+                     'stream' to request a streamed (SSE) completion.
 
         Returns:
             tuple[str, dict, dict]: URL, headers, and data payload for the API request
 
         """
         text = kwargs.get("text")
+        messages = kwargs.get("messages")
         temperature = kwargs.get("temperature")
+        stream = kwargs.get("stream", False)
         # Use the utility validation method to ensure the voice and model are valid and
         # convert them to enums if they are strings
         model = validate_str_value(OpenAILLMModels, kwargs.get("model"))
@@ -39,69 +53,300 @@ class OpenAILLMProvider(LLMProvider):
         data = {
             "model": model.value,
             "temperature": temperature,
-            "messages": [{"role": "system", "content": "You are a helpful assistant."},
-                         {"role": "user", "content": text}]
+            "messages": messages or [{"role": "system", "content": "You are a helpful assistant."},
+                                     {"role": "user", "content": text}]
         }
+        if stream:
+            data["stream"] = True
 
         return url, headers, data
 
     def chat(self,
-             text: str,
+             text: Optional[str] = None,
              model: OpenAILLMModels | str = OpenAILLMModels.GPT_4o_MINI,
              temperature: float = 0.8,
+             messages: Optional[list[dict]] = None,
+             conversation: Optional[Conversation] = None,
+             timeout: float | Timeouts | None = None,
              **kwargs) -> str:
         """
         Synchronously chats with the LLM.
 
         Args:
-            text (str): The text to chat with the LLM.
+            text (Optional[str]): The text to chat with the LLM. May be omitted if the
+                messages already end with the user's turn.
             model (Union[str, OpenAILLMModels]): The model to use, defaults to GPT_4o_MINI.
             temperature (float): The randomness of the chat response.
             0.0 is deterministic, 1.0 is completely random.
+            messages (Optional[list[dict]]): Earlier chat messages to send before the text,
+                including the system message.
+            conversation (Optional[Conversation]): Conversation providing the system prompt
+                and history, trimmed to its token budget before the request. The turn is
+                recorded in it once the reply is complete.
+            timeout (Union[float, Timeouts, None]): Time budget of the request, either the total
+                seconds or connect, first byte and total timeouts. Defaults to the provider's
+                `timeouts`, and is shortened to the deadline of the context if any.
 
         Returns:
             str: Returns the output text from the LLM.
 
         Raises:
             HTTPError: If the API request fails.
+            ProviderTimeoutError: If the request runs out of time.
             ValueError: If invalid parameters are provided.
         """
-        url, headers, data = self._create_payload(text=text, model=model, temperature=temperature)
+        if conversation is not None:
+            conversation.compact(text)
+        messages = self._request_messages(text, messages, conversation)
+        url, headers, data = self._create_payload(text=text, messages=messages, model=model, temperature=temperature)
 
-        response = requests.post(url, headers=headers, json=data)
-        if not response.ok:
-            print(response.text)
-            response.raise_for_status()
-        text = response.json()['choices'][0]['message']['content']
-        return text
+        with self._post(url, units=self._prompt_tokens(data), timeout=timeout, headers=headers,
+                        json=data) as response:
+            if not response.ok:
+                print(response.text)
+                response.raise_for_status()
+            reply = response.json()['choices'][0]['message']['content']
+        if conversation is not None:
+            conversation.record(text, reply)
+        return reply
 
     async def achat(self,
-                    text: str,
+                    text: Optional[str] = None,
                     model: OpenAILLMModels | str = OpenAILLMModels.GPT_4o_MINI,
                     temperature: float = 0.8,
+                    messages: Optional[list[dict]] = None,
+                    conversation: Optional[Conversation] = None,
+                    timeout: float | Timeouts | None = None,
                     **kwargs) -> str:
         """
         Asynchronously chats with the LLM.
 
         Args:
-            text (str): The text to chat with the LLM.
+            text (Optional[str]): The text to chat with the LLM. May be omitted if the
+                messages already end with the user's turn.
             model (Union[str, OpenAILLMModels]): The model to use, defaults to GPT_4o_MINI.
             temperature (float): The randomness of the chat response.
             0.0 is deterministic, 1.0 is completely random.
+            messages (Optional[list[dict]]): Earlier chat messages to send before the text,
+                including the system message.
+            conversation (Optional[Conversation]): Conversation providing the system prompt
+                and history, trimmed to its token budget before the request. The turn is
+                recorded in it once the reply is complete.
+            timeout (Union[float, Timeouts, None]): Time budget of the request, either the total
+                seconds or connect, first byte and total timeouts. Defaults to the provider's
+                `timeouts`, and is shortened to the deadline of the context if any.
 
         Returns:
             str: Returns the output text from the LLM.
 
         Raises:
             HTTPError: If the API request fails.
+            ProviderTimeoutError: If the request runs out of time.
             ValueError: If invalid parameters are provided.
         """
-        url, headers, data = self._create_payload(text=text, model=model, temperature=temperature)
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=data) as response:
+        if conversation is not None:
+            await conversation.acompact(text)
+        messages = self._request_messages(text, messages, conversation)
+        url, headers, data = self._create_payload(text=text, messages=messages, model=model, temperature=temperature)
+        async with self._apost(url, units=self._prompt_tokens(data), timeout=timeout, headers=headers,
+                               json=data) as response:
+            if not response.ok:
+                print(response.text)
+                response.raise_for_status()  # Check if the request was successful
+            response = await response.json()
+            reply = response['choices'][0]['message']['content']
+        if conversation is not None:
+            conversation.record(text, reply)
+        return reply
+
+    def chat_stream(self,
+                    text: Optional[str] = None,
+                    model: OpenAILLMModels | str = OpenAILLMModels.GPT_4o_MINI,
+                    temperature: float = 0.8,
+                    messages: Optional[list[dict]] = None,
+                    conversation: Optional[Conversation] = None,
+                    timeout: float | Timeouts | None = None,
+                    **kwargs) -> Iterator[str]:
+        """
+        Synchronously chats with the LLM, yielding the reply as it is generated.
+
+        Args:
+            text (Optional[str]): The text to chat with the LLM. May be omitted if the
+                messages already end with the user's turn.
+            model (Union[str, OpenAILLMModels]): The model to use, defaults to GPT_4o_MINI.
+            temperature (float): The randomness of the chat response.
+            0.0 is deterministic, 1.0 is completely random.
+            messages (Optional[list[dict]]): Earlier chat messages to send before the text,
+                including the system message.
+            conversation (Optional[Conversation]): Conversation providing the system prompt
+                and history, trimmed to its token budget before the request. The turn is
+                recorded in it once the reply is complete, or as far as it was delivered if
+                the caller stops the stream; not if the request fails.
+            timeout (Union[float, Timeouts, None]): Time budget of the request, either the total
+                seconds or connect, first byte and total timeouts. Defaults to the provider's
+                `timeouts`, and is shortened to the deadline of the context if any.
+
+        Yields:
+            str: Text deltas of the reply, in order.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ProviderTimeoutError: If the request runs out of time.
+            ValueError: If invalid parameters are provided.
+        """
+        if conversation is not None:
+            conversation.compact(text)
+        messages = self._request_messages(text, messages, conversation)
+        url, headers, data = self._create_payload(text=text, messages=messages, model=model, temperature=temperature,
+                                                  stream=True)
+
+        reply = []
+        failed = False
+        try:
+            with self._post(url, units=self._prompt_tokens(data), timeout=timeout, headers=headers,
+                            json=data, stream=True) as response:
                 if not response.ok:
-                    print(response.text)
-                    response.raise_for_status()  # Check if the request was successful
-                response = await response.json()
-                text = response['choices'][0]['message']['content']
-                return text
+                    response.raise_for_status()
+                decoder = SSEDecoder()
+                # chunk_size=None reads the data as it arrives instead of waiting for full chunks
+                for line in response.iter_lines(chunk_size=None):
+                    event = decoder.feed_line(line)
+                    if event is None:
+                        continue
+                    if event == "[DONE]":
+                        return
+                    delta = self._parse_delta(event)
+                    if delta:
+                        reply.append(delta)
+                        yield delta
+        except Exception:
+            failed = True
+            raise
+        finally:
+            # A reply cut short by the caller (closed or cancelled) is recorded as far
+            # as it was delivered; one cut short by an error is not
+            if conversation is not None and reply and not failed:
+                conversation.record(text, "".join(reply))
+
+    async def achat_stream(self,
+                           text: Optional[str] = None,
+                           model: OpenAILLMModels | str = OpenAILLMModels.GPT_4o_MINI,
+                           temperature: float = 0.8,
+                           messages: Optional[list[dict]] = None,
+                           conversation: Optional[Conversation] = None,
+                           timeout: float | Timeouts | None = None,
+                           **kwargs) -> AsyncIterator[str]:
+        """
+        Asynchronously chats with the LLM, yielding the reply as it is generated.
+
+        Args:
+            text (Optional[str]): The text to chat with the LLM. May be omitted if the
+                messages already end with the user's turn.
+            model (Union[str, OpenAILLMModels]): The model to use, defaults to GPT_4o_MINI.
+            temperature (float): The randomness of the chat response.
+            0.0 is deterministic, 1.0 is completely random.
+            messages (Optional[list[dict]]): Earlier chat messages to send before the text,
+                including the system message.
+            conversation (Optional[Conversation]): Conversation providing the system prompt
+                and history, trimmed to its token budget before the request. The turn is
+                recorded in it once the reply is complete, or as far as it was delivered if
+                the caller stops the stream; not if the request fails.
+            timeout (Union[float, Timeouts, None]): Time budget of the request, either the total
+                seconds or connect, first byte and total timeouts. Defaults to the provider's
+                `timeouts`, and is shortened to the deadline of the context if any.
+
+        Yields:
+            str: Text deltas of the reply, in order.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ProviderTimeoutError: If the request runs out of time.
+            ValueError: If invalid parameters are provided.
+        """
+        if conversation is not None:
+            await conversation.acompact(text)
+        messages = self._request_messages(text, messages, conversation)
+        url, headers, data = self._create_payload(text=text, messages=messages, model=model, temperature=temperature,
+                                                  stream=True)
+        reply = []
+        failed = False
+        try:
+            async with self._apost(url, units=self._prompt_tokens(data), timeout=timeout, headers=headers,
+                                   json=data) as response:
+                if not response.ok:
+                    response.raise_for_status()
+                decoder = SSEDecoder()
+                async for line in response.content:
+                    event = decoder.feed_line(line)
+                    if event is None:
+                        continue
+                    if event == "[DONE]":
+                        return
+                    delta = self._parse_delta(event)
+                    if delta:
+                        reply.append(delta)
+                        yield delta
+        except Exception:
+            failed = True
+            raise
+        finally:
+            # A reply cut short by the caller (closed or cancelled) is recorded as far
+            # as it was delivered; one cut short by an error is not
+            if conversation is not None and reply and not failed:
+                conversation.record(text, "".join(reply))
+
+    @staticmethod
+    def _prompt_tokens(data: dict) -> int:
+        """
+        Estimate the tokens of a request's messages, for the tokens per minute limit.
+
+        Args:
+            data (dict): The data payload of the request.
+
+        Returns:
+            int: The estimated number of prompt tokens.
+        """
+        return sum(estimate_tokens(message.get("content") or "") for message in data["messages"])
+
+    @staticmethod
+    def _request_messages(text: Optional[str],
+                          messages: Optional[list[dict]],
+                          conversation: Optional[Conversation]) -> Optional[list[dict]]:
+        """
+        Assemble the messages of a request from the chat method arguments.
+
+        Args:
+            text (Optional[str]): The new user message, if any.
+            messages (Optional[list[dict]]): Explicit earlier messages, if any.
+            conversation (Optional[Conversation]): The conversation, if any.
+
+        Returns:
+            Optional[list[dict]]: The messages to send, or None for a single message with
+            the default system prompt.
+
+        Raises:
+            ValueError: If there is neither a text nor messages to send.
+        """
+        if conversation is not None:
+            return conversation.request_messages(text)
+        if messages is not None:
+            return list(messages) + ([{"role": "user", "content": text}] if text is not None else [])
+        if text is None:
+            raise ValueError("Either text, messages or a conversation must be provided")
+        return None
+
+    @staticmethod
+    def _parse_delta(event: str) -> Optional[str]:
+        """
+        Extract the text delta from a streamed chat completion chunk.
+
+        Args:
+            event (str): The data of a single SSE event.
+
+        Returns:
+            Optional[str]: The content delta of the chunk, if any.
+        """
+        choices = json.loads(event).get("choices")
+        if not choices:
+            return None
+        return choices[0].get("delta", {}).get("content")
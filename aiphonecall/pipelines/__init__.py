@@ -0,0 +1,2 @@
+from .sentence_pipeline import SentencePipeline
+from .call_session import CallSession, TurnLatency
@@ -0,0 +1,495 @@
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterable, AsyncIterator, Callable, Optional
+
+from aiphonecall.conversation.conversation import Conversation
+from aiphonecall.interfaces.llm_provider_interface import LLMProvider
+from aiphonecall.interfaces.stt_provider_interface import STTProvider
+from aiphonecall.interfaces.stt_stream_session_interface import STTStreamEvent, STTStreamEventType, STTStreamSession
+from aiphonecall.interfaces.tts_provider_interface import TTSProvider
+from aiphonecall.pipelines.sentence_pipeline import SentencePipeline
+from aiphonecall.utils.deadline import ProviderTimeoutError
+
+_END = object()
+
+
+@dataclass
+class TurnLatency:
+    """
+    Timeline of one turn of a call, from the end of the caller's speech to the reply.
+
+    Timestamps are `time.monotonic()` seconds, None for the steps the turn did
+    not reach. The properties break the response latency down by stage.
+
+    Attributes:
+        index (int): Number of the turn in the call, from 0.
+        text (str): What the caller said.
+        detected (float): When the STT service signalled the end of the turn.
+        speech_end (Optional[float]): When the audio of the caller's last word was sent to the
+            STT service. None if the rate of the audio or the word timings are unknown.
+        started (Optional[float]): When the LLM request of the reply was sent.
+        first_token (Optional[float]): When the first text of the reply arrived.
+        first_audio (Optional[float]): When the first audio of the reply was ready for playback.
+        completed (Optional[float]): When the last audio of the reply was ready for playback.
+        reply (str): The reply generated by the LLM, as far as it got.
+        error (Optional[Exception]): Why the reply failed, if it did.
+        interrupted (Optional[float]): When the caller barged in on the reply.
+        silenced (Optional[float]): When the consumer of `CallSession.run` stopped getting
+            the reply's audio after the barge-in: when it next asked for audio, or the
+            barge-in itself if it was already waiting for some.
+        stopped (Optional[float]): When the LLM and TTS requests of the reply were
+            cancelled and their connections closed after the barge-in.
+        discarded_bytes (int): Reply audio discarded by the barge-in before it was played.
+    """
+    index: int
+    text: str
+    detected: float
+    speech_end: Optional[float] = None
+    started: Optional[float] = None
+    first_token: Optional[float] = None
+    first_audio: Optional[float] = None
+    completed: Optional[float] = None
+    reply: str = ""
+    error: Optional[Exception] = None
+    interrupted: Optional[float] = None
+    silenced: Optional[float] = None
+    stopped: Optional[float] = None
+    discarded_bytes: int = 0
+
+    @property
+    def stt_latency(self) -> Optional[float]:
+        """
+        Optional[float]: Seconds from the end of the speech to the end of the turn being
+        detected, i.e. endpointing and final transcription.
+        """
+        return _elapsed(self.speech_end, self.detected)
+
+    @property
+    def queue_delay(self) -> Optional[float]:
+        """
+        Optional[float]: Seconds the turn waited for the previous replies.
+        """
+        return _elapsed(self.detected, self.started)
+
+    @property
+    def llm_latency(self) -> Optional[float]:
+        """
+        Optional[float]: Seconds from the LLM request to the first text of the reply.
+        """
+        return _elapsed(self.started, self.first_token)
+
+    @property
+    def tts_latency(self) -> Optional[float]:
+        """
+        Optional[float]: Seconds from the first text of the reply to its first audio,
+        including the wait for the first complete sentence.
+        """
+        return _elapsed(self.first_token, self.first_audio)
+
+    @property
+    def response_latency(self) -> Optional[float]:
+        """
+        Optional[float]: Seconds from the end of the speech (or, if unknown, the end of
+        the turn being detected) to the first audio of the reply.
+        """
+        return _elapsed(self.speech_end if self.speech_end is not None else self.detected, self.first_audio)
+
+    @property
+    def cancel_latency(self) -> Optional[float]:
+        """
+        Optional[float]: Seconds from the barge-in to the consumer getting no more of the
+        reply's audio, i.e. how long it was still busy with the audio it was given.
+        """
+        return _elapsed(self.interrupted, self.silenced)
+
+    @property
+    def teardown_latency(self) -> Optional[float]:
+        """
+        Optional[float]: Seconds from the barge-in to the requests of the reply being cancelled.
+        """
+        return _elapsed(self.interrupted, self.stopped)
+
+
+class CallSession:
+    """
+    Runs a phone conversation through an STT, an LLM and a TTS provider.
+
+    The caller's audio is streamed to a live STT session, every end of turn the
+    service detects becomes a chat with the LLM, and the reply is synthesized
+    sentence by sentence while it is generated (see SentencePipeline). The
+    stages run as concurrent tasks connected by bounded queues: audio frames
+    wait in a queue of `max_pending_frames`, detected turns in one of
+    `max_pending_turns` and reply audio in one of `max_pending_audio` chunks.
+    A full queue holds the stage before it back (backpressure). The reply's
+    SentencePipeline only buffers a bounded amount of audio ahead of that
+    queue, so a slow consumer of the reply audio slows the synthesis (and the
+    LLM stream feeding it) down instead of letting buffers grow. Turns are
+    answered one at a time, in order.
+
+    When the caller speaks while a reply is being generated or its audio is
+    still queued (barge-in), the reply is cut off: its LLM and TTS requests
+    are cancelled, which closes their connections, and the queued audio is
+    discarded. The audio already yielded is the consumer's to stop, e.g. in
+    `on_barge_in`. Barge-in triggers on transcribed words rather than on voice
+    activity, so noise on the line doesn't cut replies off.
+
+    The timeline of every turn is kept in `turns`. A failed reply (e.g. one
+    whose first audio wasn't ready within `turn_timeout`) is recorded there
+    and the call goes on; a failure of the STT session ends the call.
+
+        session = CallSession(stt, llm, tts, conversation=Conversation("You are ..."))
+        async for chunk in session.run(inbound_audio):
+            ...  # play the reply audio
+
+    Attributes:
+        stt (STTProvider): Provider of the live transcription.
+        llm (LLMProvider): Provider of the replies.
+        tts (TTSProvider): Provider of the reply audio.
+        conversation (Conversation): History of the call, sent with every chat.
+        turn_timeout (Optional[float]): Seconds the first audio of a reply may take.
+        barge_in (bool): Whether the caller's speech interrupts the reply.
+        bytes_per_second (Optional[int]): Bytes per second of the inbound audio.
+        turns (list[TurnLatency]): The turns so far, in order.
+    """
+
+    def __init__(self,
+                 stt: STTProvider,
+                 llm: LLMProvider,
+                 tts: TTSProvider,
+                 conversation: Optional[Conversation] = None,
+                 stt_kwargs: Optional[dict] = None,
+                 llm_kwargs: Optional[dict] = None,
+                 tts_kwargs: Optional[dict] = None,
+                 tts_concurrency: int = 2,
+                 turn_timeout: Optional[float] = None,
+                 bytes_per_second: Optional[int] = None,
+                 max_pending_frames: int = 50,
+                 max_pending_turns: int = 2,
+                 max_pending_audio: int = 64,
+                 barge_in: bool = True,
+                 on_turn: Optional[Callable[[TurnLatency], None]] = None,
+                 on_barge_in: Optional[Callable[[TurnLatency], None]] = None):
+        """
+        Initialize the session.
+
+        Args:
+            stt (STTProvider): Provider of the live transcription.
+            llm (LLMProvider): Provider of the replies.
+            tts (TTSProvider): Provider of the reply audio.
+            conversation (Optional[Conversation]): History of the call, defaults to a new
+                Conversation with the default system prompt.
+            stt_kwargs (Optional[dict]): Parameters of `aspeech2text_stream`, e.g. the
+                encoding and sample rate of the inbound audio.
+            llm_kwargs (Optional[dict]): Parameters of every `achat_stream`, e.g. the model.
+            tts_kwargs (Optional[dict]): Parameters of every synthesis, e.g. the voice and
+                the output format.
+            tts_concurrency (int): Sentences of a reply synthesized at a time, defaults to 2.
+            turn_timeout (Optional[float]): Seconds from the start of a reply within which its
+                first audio must be ready. The rest of the reply is paced by the playback, so
+                it isn't bounded by it; its requests are bounded by the providers' own
+                timeouts. Defaults to None (no limit).
+            bytes_per_second (Optional[int]): Bytes per second of the inbound audio (e.g.
+                16000 for 8 kHz 16-bit mono), to time the end of the caller's speech.
+                Without it, the STT latency of the turns is unknown.
+            max_pending_frames (int): Inbound audio frames buffered before the audio source
+                is held back, defaults to 50.
+            max_pending_turns (int): Detected turns buffered before the transcription is
+                held back, defaults to 2.
+            max_pending_audio (int): Chunks of reply audio buffered before the synthesis is
+                held back, defaults to 64.
+            barge_in (bool): Whether the caller's speech interrupts the reply, defaults
+                to True.
+            on_turn (Optional[Callable[[TurnLatency], None]]): Called with every turn once
+                its reply is done, failed or interrupted.
+            on_barge_in (Optional[Callable[[TurnLatency], None]]): Called with the turn whose
+                reply was interrupted, as soon as its pending audio is discarded, e.g. to clear
+                the playback buffer of the phone call.
+        """
+        if tts_concurrency < 1:
+            raise ValueError(f"tts_concurrency must be at least 1, got {tts_concurrency}")
+        self.stt = stt
+        self.llm = llm
+        self.tts = tts
+        self.conversation = conversation if conversation is not None else Conversation()
+        self.stt_kwargs = stt_kwargs or {}
+        self.llm_kwargs = llm_kwargs or {}
+        self.tts_kwargs = tts_kwargs or {}
+        self.tts_concurrency = tts_concurrency
+        self.turn_timeout = turn_timeout
+        self.bytes_per_second = bytes_per_second
+        self.max_pending_frames = max_pending_frames
+        self.max_pending_turns = max_pending_turns
+        self.max_pending_audio = max_pending_audio
+        self.barge_in = barge_in
+        self.on_turn = on_turn
+        self.on_barge_in = on_barge_in
+        self.turns: list[TurnLatency] = []
+        self._output: Optional[asyncio.Queue] = None
+        self._reply_turn: Optional[TurnLatency] = None
+        self._reply_task: Optional[asyncio.Task] = None
+        self._silencing: Optional[TurnLatency] = None
+        self._awaiting_audio = False
+
+    async def run(self, audio: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+        """
+        Run the call, yielding the audio of the replies as it becomes available.
+
+        The call ends once the audio source is exhausted and the remaining turns
+        are answered, or when the iteration is stopped (e.g. the caller hung up).
+
+        Args:
+            audio (AsyncIterable[bytes]): Frames of the caller's audio, in the format
+                the STT session was opened with.
+
+        Yields:
+            bytes: Chunks of the reply audio, in order.
+
+        Raises:
+            HTTPError: If the STT session fails.
+        """
+        frames: asyncio.Queue = asyncio.Queue(self.max_pending_frames)
+        turns: asyncio.Queue = asyncio.Queue(self.max_pending_turns)
+        output: asyncio.Queue = asyncio.Queue(self.max_pending_audio)
+        self._output = output
+        clock = _AudioClock(self.bytes_per_second)
+        async with self.stt.aspeech2text_stream(**self.stt_kwargs) as session:
+            stages = [self._read(audio, frames),
+                      self._send(session, frames, clock),
+                      self._listen(session, turns, clock),
+                      self._respond(turns, output)]
+            tasks = [asyncio.create_task(self._stage(stage, output)) for stage in stages]
+            try:
+                while True:
+                    if self._silencing is not None:
+                        self._silencing.silenced = time.monotonic()
+                        self._silencing = None
+                    self._awaiting_audio = True
+                    try:
+                        chunk = await output.get()
+                    finally:
+                        self._awaiting_audio = False
+                    if chunk is _END:
+                        break
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    yield chunk
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                self._output = None
+                self._silencing = None
+
+    def interrupt(self) -> bool:
+        """
+        Cut the current reply off, as on barge-in.
+
+        The LLM and TTS requests of the reply are cancelled, which closes their
+        connections, and its audio not yet yielded by `run` is discarded. The
+        timing is recorded on the turn (see `TurnLatency.cancel_latency`).
+
+        Returns:
+            bool: Whether there was a reply to interrupt.
+        """
+        interrupted = time.monotonic()
+        turn, task, output = self._reply_turn, self._reply_task, self._output
+        if turn is None or output is None:
+            return False
+        replying = task is not None and not task.done()
+        if replying:
+            task.cancel()
+        # Only the audio is dropped; the end of the call or a failure stays queued
+        kept, discarded = [], 0
+        while not output.empty():
+            item = output.get_nowait()
+            if isinstance(item, bytes):
+                discarded += len(item)
+            else:
+                kept.append(item)
+        for item in kept:
+            output.put_nowait(item)
+        if not replying and not discarded:
+            return False
+        turn.interrupted = interrupted
+        turn.discarded_bytes += discarded
+        # The consumer stops getting the reply once it asks `run` for more audio
+        if self._awaiting_audio:
+            turn.silenced = interrupted
+        else:
+            self._silencing = turn
+        if not replying:
+            turn.stopped = interrupted
+        if self.on_barge_in is not None:
+            self.on_barge_in(turn)
+        return True
+
+    @staticmethod
+    async def _stage(stage, output: asyncio.Queue) -> None:
+        # Failures are queued behind the audio already produced, which is still played
+        try:
+            await stage
+        except Exception as e:
+            await output.put(e)
+
+    @staticmethod
+    async def _read(audio: AsyncIterable[bytes], frames: asyncio.Queue) -> None:
+        async for frame in audio:
+            await frames.put(frame)
+        await frames.put(_END)
+
+    @staticmethod
+    async def _send(session: STTStreamSession, frames: asyncio.Queue, clock: "_AudioClock") -> None:
+        while True:
+            frame = await frames.get()
+            if frame is _END:
+                await session.finish()
+                return
+            await session.send(frame)
+            clock.sent(len(frame))
+
+    async def _listen(self, session: STTStreamSession, turns: asyncio.Queue, clock: "_AudioClock") -> None:
+        """
+        Collect the final transcripts into turns, ending a turn on the service's endpointing.
+        """
+        texts: list[str] = []
+        spoken = None
+        async for event in session:
+            if self.barge_in and event.text.strip() and event.type in (STTStreamEventType.INTERIM,
+                                                                       STTStreamEventType.FINAL):
+                self.interrupt()
+            if event.type is STTStreamEventType.FINAL:
+                if event.text:
+                    texts.append(event.text)
+                    spoken = _speech_end(event)
+                if not event.speech_final:
+                    continue
+            elif event.type is STTStreamEventType.UTTERANCE_END:
+                spoken = event.end if event.end is not None else spoken
+            else:
+                continue
+            if texts:
+                await turns.put(self._new_turn(" ".join(texts), clock.time_of(spoken)))
+                texts, spoken = [], None
+        # Speech cut off by the end of the audio still gets its reply
+        if texts:
+            await turns.put(self._new_turn(" ".join(texts), clock.time_of(spoken)))
+        await turns.put(_END)
+
+    def _new_turn(self, text: str, speech_end: Optional[float]) -> TurnLatency:
+        turn = TurnLatency(index=len(self.turns), text=text, detected=time.monotonic(), speech_end=speech_end)
+        self.turns.append(turn)
+        return turn
+
+    async def _respond(self, turns: asyncio.Queue, output: asyncio.Queue) -> None:
+        pipeline = SentencePipeline(self.tts, max_concurrency=self.tts_concurrency, **self.tts_kwargs)
+        while True:
+            turn = await turns.get()
+            if turn is _END:
+                break
+            # The reply runs as a task of its own, so that a barge-in can cancel it
+            task = asyncio.create_task(self._reply(turn, pipeline, output))
+            self._reply_turn, self._reply_task = turn, task
+            try:
+                await asyncio.wait([task])
+            finally:
+                if not task.done():
+                    task.cancel()
+                    await asyncio.gather(task, return_exceptions=True)
+            if turn.interrupted is not None:
+                turn.stopped = time.monotonic()
+                if not turn.reply:
+                    # Cut off before the LLM said anything; the caller's words still belong to the history
+                    self.conversation.add_message("user", turn.text)
+            if self.on_turn is not None:
+                self.on_turn(turn)
+        await output.put(_END)
+
+    async def _reply(self, turn: TurnLatency, pipeline: SentencePipeline, output: asyncio.Queue) -> None:
+        """
+        Generate and synthesize the reply of a turn, recording its timeline and any failure.
+        """
+        reply = []
+
+        async def text() -> AsyncIterator[str]:
+            stream = self.llm.achat_stream(turn.text, conversation=self.conversation, **self.llm_kwargs)
+            try:
+                async for delta in stream:
+                    if turn.first_token is None:
+                        turn.first_token = time.monotonic()
+                    reply.append(delta)
+                    yield delta
+            finally:
+                await stream.aclose()
+
+        turn.started = time.monotonic()
+        audio = pipeline.run(text())
+        try:
+            # The pipeline is held back by the playback, so neither it nor its requests can be
+            # given a deadline covering the whole reply; only the wait for the first audio is bounded
+            try:
+                chunk = await asyncio.wait_for(anext(audio, _END), self.turn_timeout)
+                while chunk is not _END:
+                    if turn.first_audio is None:
+                        turn.first_audio = time.monotonic()
+                    await output.put(chunk)
+                    chunk = await anext(audio, _END)
+            finally:
+                # Closed right away rather than when collected, so that a barge-in stops the requests now
+                await audio.aclose()
+            turn.completed = time.monotonic()
+        except ProviderTimeoutError as e:
+            turn.error = e
+        except asyncio.TimeoutError:
+            turn.error = ProviderTimeoutError("deadline", self.turn_timeout)
+        except Exception as e:
+            turn.error = e
+        finally:
+            turn.reply = "".join(reply)
+
+
+class _AudioClock:
+    """
+    Maps positions in the inbound audio to the time they were sent to the STT service.
+    """
+
+    def __init__(self, bytes_per_second: Optional[int], history: int = 4096):
+        self.bytes_per_second = bytes_per_second
+        self._sent = 0
+        # (seconds of audio sent so far, time.monotonic() it was sent) per frame
+        self._times: deque[tuple[float, float]] = deque(maxlen=history)
+
+    def sent(self, size: int) -> None:
+        if not self.bytes_per_second:
+            return
+        self._sent += size
+        self._times.append((self._sent / self.bytes_per_second, time.monotonic()))
+
+    def time_of(self, offset: Optional[float]) -> Optional[float]:
+        """
+        Return when the audio at `offset` seconds was sent, None if unknown.
+        """
+        if offset is None or not self.bytes_per_second:
+            return None
+        # Positions are looked up in increasing order, so earlier frames are no longer needed
+        while len(self._times) > 1 and self._times[1][0] <= offset:
+            self._times.popleft()
+        for position, sent in self._times:
+            if position >= offset:
+                return sent
+        return None
+
+
+def _speech_end(event: STTStreamEvent) -> Optional[float]:
+    if event.end is not None:
+        return event.end
+    if event.start is not None and event.duration is not None:
+        return event.start + event.duration
+    return None
+
+
+def _elapsed(start: Optional[float], end: Optional[float]) -> Optional[float]:
+    if start is None or end is None:
+        return None
+    return end - start
@@ -0,0 +1,142 @@
+import asyncio
+from typing import AsyncIterable, AsyncIterator, Union
+
+from aiphonecall.interfaces.tts_provider_interface import TTSProvider
+from aiphonecall.utils.text import SentenceSegmenter
+
+_END = object()
+
+
+class SentencePipeline:
+    """
+    Pipelines LLM output into a TTS provider sentence by sentence.
+
+    The text stream (typically `LLMProvider.achat_stream`) is cut at sentence and
+    clause boundaries while it is still being generated, and every segment is
+    sent to `TTSProvider.atranscribe_stream` as soon as it is complete, with at
+    most `max_concurrency` segments being synthesized at a time. Audio is
+    emitted strictly in segment order and the first segment is streamed as it
+    arrives, so the time to first audio is roughly the time to the first
+    sentence of the LLM plus the time to first byte of its synthesis.
+
+    A segment keeps its synthesis slot until its audio has been consumed, and
+    at most `max_buffered_chunks` chunks of it wait to be consumed, so a slow
+    consumer holds the synthesis back instead of letting buffers grow.
+
+    Attributes:
+        tts (TTSProvider): The provider used to synthesize the segments.
+        max_concurrency (int): Maximum number of segments synthesized or waiting to be
+            consumed at a time.
+        max_buffered_chunks (int): Maximum number of chunks buffered per segment.
+        tts_kwargs (dict): Parameters passed to every synthesis call (voice, model, ...).
+    """
+
+    def __init__(self,
+                 tts: TTSProvider,
+                 max_concurrency: int = 3,
+                 min_chars: int = 1,
+                 max_chars: int = 250,
+                 max_buffered_chunks: int = 32,
+                 **tts_kwargs):
+        """
+        Initialize the pipeline.
+
+        Args:
+            tts (TTSProvider): The provider used to synthesize the segments.
+            max_concurrency (int): Maximum number of segments synthesized or waiting to be
+                consumed at a time, defaults to 3.
+            min_chars (int): Segments shorter than this are merged with the following text,
+                defaults to 1.
+            max_chars (int): Length after which a segment is cut at a clause boundary,
+                defaults to 250.
+            max_buffered_chunks (int): Maximum number of chunks of a segment buffered
+                ahead of the consumer, defaults to 32.
+            **tts_kwargs: Parameters passed to every synthesis call, e.g. voice and model.
+        """
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        self.tts = tts
+        self.max_concurrency = max_concurrency
+        self.max_buffered_chunks = max_buffered_chunks
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self.tts_kwargs = tts_kwargs
+
+    async def run(self, text: Union[str, AsyncIterable[str]]) -> AsyncIterator[bytes]:
+        """
+        Synthesize the text, yielding the audio in order as it becomes available.
+
+        Args:
+            text (Union[str, AsyncIterable[str]]): The complete text, or a stream of
+                text deltas such as `LLMProvider.achat_stream(...)`. The stream is closed
+                when the pipeline stops, even if it is stopped early.
+
+        Yields:
+            bytes: Chunks of the generated audio, in segment order.
+
+        Raises:
+            HTTPError: If a synthesis request fails.
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        # Queue of per segment chunk queues, in segment order
+        segments: asyncio.Queue = asyncio.Queue()
+        tasks: set[asyncio.Task] = set()
+
+        async def synthesize(segment: str, chunks: asyncio.Queue) -> None:
+            # The slot is released by the consumer once it has drained the segment
+            try:
+                async for chunk in self.tts.atranscribe_stream(segment, **self.tts_kwargs):
+                    await chunks.put(chunk)
+                await chunks.put(_END)
+            except Exception as e:
+                await chunks.put(e)
+
+        async def start(segment: str) -> None:
+            await semaphore.acquire()
+            chunks = asyncio.Queue(self.max_buffered_chunks)
+            task = asyncio.create_task(synthesize(segment, chunks))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            segments.put_nowait(chunks)
+
+        async def produce() -> None:
+            segmenter = SentenceSegmenter(min_chars=self.min_chars, max_chars=self.max_chars)
+            try:
+                if isinstance(text, str):
+                    for segment in segmenter.feed(text):
+                        await start(segment)
+                else:
+                    async for delta in text:
+                        for segment in segmenter.feed(delta):
+                            await start(segment)
+                for segment in segmenter.flush():
+                    await start(segment)
+                segments.put_nowait(_END)
+            except Exception as e:
+                segments.put_nowait(e)
+            finally:
+                # A pipeline stopped early stops the LLM request behind the text too
+                if hasattr(text, "aclose"):
+                    await text.aclose()
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                chunks = await segments.get()
+                if chunks is _END:
+                    break
+                if isinstance(chunks, Exception):
+                    raise chunks
+                while True:
+                    chunk = await chunks.get()
+                    if chunk is _END:
+                        semaphore.release()
+                        break
+                    if isinstance(chunk, Exception):
+                        raise chunk
+                    yield chunk
+        finally:
+            producer.cancel()
+            for task in list(tasks):
+                task.cancel()
+            await asyncio.gather(producer, *tasks, return_exceptions=True)
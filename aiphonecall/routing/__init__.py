@@ -0,0 +1,5 @@
+from .health import BackendHealth, CircuitState, NoHealthyBackendError
+from .backend_pool import Backend, BackendPool
+from .llm_router import LLMRouter
+from .stt_router import RoutedSTTStreamSession, STTRouter
+from .tts_router import TTSRouter
@@ -0,0 +1,368 @@
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+import aiohttp
+import requests
+
+from aiphonecall.interfaces.base_provider import BaseProvider
+from aiphonecall.utils.deadline import ProviderTimeoutError
+from aiphonecall.routing.health import BackendHealth, CircuitState, NoHealthyBackendError
+
+
+@dataclass
+class Backend:
+    """
+    A provider a router can send requests to.
+
+    Attributes:
+        provider (BaseProvider): The provider.
+        options (dict): Parameters overriding those of every request routed to the provider,
+            typically its model and voice, since those differ between vendors.
+        name (str): Name used in logs and stats, defaults to the provider's class name.
+        health (BackendHealth): Latency, error rate and circuit breaker of the backend.
+    """
+    provider: BaseProvider
+    options: dict = field(default_factory=dict)
+    name: str = ""
+    health: BackendHealth = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if not self.name:
+            self.name = type(self.provider).__name__
+
+    def params(self, kwargs: dict) -> dict:
+        """
+        Return the parameters of a request routed to this backend.
+
+        Args:
+            kwargs (dict): The parameters of the request.
+
+        Returns:
+            dict: The parameters with the backend's options applied. Parameters that
+            are None are left out, so the provider's own defaults apply.
+        """
+        params = {key: value for key, value in kwargs.items() if value is not None}
+        return {**params, **self.options}
+
+
+class BackendPool:
+    """
+    Backend selection, health tracking and failover shared by the routers.
+
+    Requests go to the available backend with the lowest expected latency and
+    fail over to the next one when a backend fails before delivering anything.
+    Failures that are the caller's fault (invalid parameters, 4xx other than
+    408 and 429, running out of the caller's deadline or of the local rate
+    limits) are raised right away and don't count against the backend.
+
+    When a circuit opens, the backend is probed on a background thread once
+    its timeout has passed; a successful probe closes the circuit. Without a
+    probe, a single live request is let through as a trial instead.
+
+    Attributes:
+        backends (list[Backend]): The backends, in order of preference for ties.
+        probe (Optional[Callable[[Backend], Any]]): Cheap request checking whether a
+            backend is back, None to use trial requests.
+    """
+
+    def __init__(self,
+                 backends: list[Backend],
+                 probe: Optional[Callable[[Backend], Any]] = None,
+                 **health_kwargs):
+        """
+        Initialize the pool.
+
+        Args:
+            backends (list[Backend]): The backends, at least one.
+            probe (Optional[Callable[[Backend], Any]]): Sync function sending a cheap
+                request to a backend and raising if it fails, defaults to None.
+            **health_kwargs: Arguments of `BackendHealth`, shared by all backends.
+
+        Raises:
+            ValueError: If no backend is given.
+        """
+        if not backends:
+            raise ValueError("At least one backend is required")
+        self.backends = backends
+        self.probe = probe
+        for backend in backends:
+            backend.health = BackendHealth(**health_kwargs)
+        self._timers: dict[int, threading.Timer] = {}
+        self._lock = threading.Lock()
+
+    def candidates(self, kind: str = "response") -> list[Backend]:
+        """
+        Return the backends to try for a request, best first.
+
+        Args:
+            kind (str): The kind of request, whose latencies are compared: "response",
+                "first_chunk" or "connect". Defaults to "response".
+
+        Returns:
+            list[Backend]: Closed circuits by expected latency; a half-open backend
+            due for a trial request goes first. At most one trial is taken per call,
+            since only the first backend is sure to be sent the request.
+
+        Raises:
+            NoHealthyBackendError: If every circuit is open.
+        """
+        healthy = [b for b in self.backends if b.health.state is CircuitState.CLOSED]
+        healthy.sort(key=lambda b: b.health.score(kind))
+        if self.probe is None:
+            for backend in self.backends:
+                if backend.health.state is not CircuitState.CLOSED and backend.health.allow_trial():
+                    healthy = [backend] + healthy
+                    break
+        if not healthy:
+            raise NoHealthyBackendError(
+                f"All backends are unavailable: {', '.join(b.name for b in self.backends)}")
+        return healthy
+
+    def succeeded(self, backend: Backend, latency: float, kind: str = "response") -> None:
+        """
+        Record a successful request.
+
+        Args:
+            backend (Backend): The backend that served it.
+            latency (float): Seconds the request took.
+            kind (str): What was timed: "response", "first_chunk" or "connect".
+        """
+        backend.health.record_success(latency, kind)
+
+    def failed(self, backend: Backend, error: BaseException) -> bool:
+        """
+        Record a failed request, if the backend is to blame.
+
+        Errors of the request itself are not held against the backend, but still
+        end a trial request, so that a half-open circuit admits the next one.
+
+        Args:
+            backend (Backend): The backend that failed.
+            error (BaseException): The error it failed with.
+
+        Returns:
+            bool: Whether the request should fail over to another backend.
+        """
+        if not _is_backend_failure(error):
+            backend.health.record_neutral()
+            return False
+        if backend.health.record_failure():
+            self._schedule_probe(backend)
+        return True
+
+    def cancelled(self, backend: Backend) -> None:
+        """
+        Record a request the caller cancelled (e.g. on barge-in); it is not held
+        against the backend.
+
+        Args:
+            backend (Backend): The backend the request was sent to.
+        """
+        backend.health.record_cancelled()
+
+    def call(self, method: str, **kwargs) -> Any:
+        """
+        Call a sync method on the best backend, failing over on errors.
+
+        Args:
+            method (str): Name of the provider method.
+            **kwargs: Its parameters.
+
+        Returns:
+            Any: The result of the first backend that succeeded.
+        """
+        error: Optional[BaseException] = None
+        for backend in self.candidates():
+            start = time.monotonic()
+            try:
+                result = getattr(backend.provider, method)(**backend.params(kwargs))
+            except Exception as e:
+                if not self.failed(backend, e):
+                    raise
+                error = e
+                continue
+            self.succeeded(backend, time.monotonic() - start)
+            return result
+        raise error
+
+    async def acall(self, method: str, **kwargs) -> Any:
+        """
+        Call an async method on the best backend, failing over on errors.
+
+        Args:
+            method (str): Name of the provider method.
+            **kwargs: Its parameters.
+
+        Returns:
+            Any: The result of the first backend that succeeded.
+        """
+        error: Optional[BaseException] = None
+        for backend in self.candidates():
+            start = time.monotonic()
+            try:
+                result = await getattr(backend.provider, method)(**backend.params(kwargs))
+            except asyncio.CancelledError:
+                self.cancelled(backend)
+                raise
+            except Exception as e:
+                if not self.failed(backend, e):
+                    raise
+                error = e
+                continue
+            self.succeeded(backend, time.monotonic() - start)
+            return result
+        raise error
+
+    def stream(self, method: str, **kwargs) -> Iterator:
+        """
+        Iterate over a sync streaming method of the best backend.
+
+        Fails over as long as nothing was yielded; an error after the first item
+        is raised, since the stream can't be resumed on another backend.
+
+        Args:
+            method (str): Name of the provider method.
+            **kwargs: Its parameters.
+
+        Yields:
+            The items of the first backend that delivered any.
+        """
+        error: Optional[BaseException] = None
+        for backend in self.candidates("first_chunk"):
+            start = time.monotonic()
+            iterator = getattr(backend.provider, method)(**backend.params(kwargs))
+            try:
+                first = next(iterator)
+            except StopIteration:
+                self.succeeded(backend, time.monotonic() - start, "first_chunk")
+                return
+            except Exception as e:
+                if not self.failed(backend, e):
+                    raise
+                error = e
+                continue
+            self.succeeded(backend, time.monotonic() - start, "first_chunk")
+            try:
+                yield first
+                for item in iterator:
+                    yield item
+            except Exception as e:
+                self.failed(backend, e)
+                raise
+            finally:
+                iterator.close()
+            return
+        raise error
+
+    async def astream(self, method: str, **kwargs) -> AsyncIterator:
+        """
+        Iterate over an async streaming method of the best backend.
+
+        Fails over as long as nothing was yielded; an error after the first item
+        is raised, since the stream can't be resumed on another backend.
+
+        Args:
+            method (str): Name of the provider method.
+            **kwargs: Its parameters.
+
+        Yields:
+            The items of the first backend that delivered any.
+        """
+        error: Optional[BaseException] = None
+        for backend in self.candidates("first_chunk"):
+            start = time.monotonic()
+            iterator = getattr(backend.provider, method)(**backend.params(kwargs))
+            try:
+                first = await iterator.__anext__()
+            except StopAsyncIteration:
+                self.succeeded(backend, time.monotonic() - start, "first_chunk")
+                return
+            except asyncio.CancelledError:
+                self.cancelled(backend)
+                raise
+            except Exception as e:
+                await iterator.aclose()
+                if not self.failed(backend, e):
+                    raise
+                error = e
+                continue
+            self.succeeded(backend, time.monotonic() - start, "first_chunk")
+            try:
+                yield first
+                async for item in iterator:
+                    yield item
+            except Exception as e:
+                self.failed(backend, e)
+                raise
+            finally:
+                await iterator.aclose()
+            return
+        raise error
+
+    def close(self) -> None:
+        """
+        Cancel the background probes and close the sync connections of all backends.
+        """
+        self.cancel_probes()
+        for backend in self.backends:
+            backend.provider.close()
+
+    async def aclose(self) -> None:
+        """
+        Cancel the background probes and close all connections of all backends.
+        """
+        self.cancel_probes()
+        for backend in self.backends:
+            await backend.provider.aclose()
+
+    def cancel_probes(self) -> None:
+        """
+        Cancel the scheduled background probes.
+        """
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+
+    def _schedule_probe(self, backend: Backend) -> None:
+        if self.probe is None:
+            return
+        delay = max(0.0, backend.health.retry_at - time.monotonic())
+        timer = threading.Timer(delay, self._run_probe, args=(backend,))
+        timer.daemon = True
+        with self._lock:
+            previous = self._timers.pop(id(backend), None)
+            if previous is not None:
+                previous.cancel()
+            self._timers[id(backend)] = timer
+        timer.start()
+
+    def _run_probe(self, backend: Backend) -> None:
+        with self._lock:
+            self._timers.pop(id(backend), None)
+        backend.health.half_open()
+        start = time.monotonic()
+        try:
+            self.probe(backend)
+        except Exception:
+            if backend.health.record_failure():
+                self._schedule_probe(backend)
+            return
+        backend.health.record_success(time.monotonic() - start)
+
+
+def _is_backend_failure(error: BaseException) -> bool:
+    """
+    Tell whether an error is the backend's fault rather than the request's.
+    """
+    if isinstance(error, ProviderTimeoutError) and error.phase in ("deadline", "rate_limit"):
+        # The caller's budget or the local limiter ran out, not the backend
+        return False
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500 or error.status in (408, 429)
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        return error.response.status_code >= 500 or error.response.status_code in (408, 429)
+    return not isinstance(error, (ValueError, TypeError, NotImplementedError))
@@ -0,0 +1,197 @@
+import math
+import threading
+import time
+from enum import Enum
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class NoHealthyBackendError(RuntimeError):
+    """
+    Raised when every backend of a router has an open circuit or failed the request.
+    """
+
+
+class BackendHealth:
+    """
+    Latency, error rate and circuit breaker of one backend of a router.
+
+    Latency and error rate are exponentially weighted moving averages, so they
+    follow the backend's current state rather than its history. Latency is
+    tracked per kind of request, since the times to a whole response, to the
+    first chunk of a stream and to an open connection aren't comparable. The
+    circuit opens after `failure_threshold` consecutive failures, or when the error rate
+    exceeds `error_rate_threshold` once `min_samples` requests were seen, and
+    makes the router skip the backend. After `reset_timeout` it turns half-open:
+    a probe (or a single trial request) decides whether it closes again or
+    re-opens with a doubled timeout, up to `max_reset_timeout`.
+
+    Attributes:
+        latencies (dict[str, float]): EWMA of the seconds taken by successful requests, per
+            kind: "response" for whole responses, "first_chunk" for the first chunk of
+            streams, "connect" for live sessions. A kind is missing before its first success.
+        error_rate (float): EWMA of the share of failed requests.
+        consecutive_failures (int): Failures since the last success.
+        state (CircuitState): State of the circuit breaker.
+        successes (int): Number of successful requests.
+        failures (int): Number of failed requests.
+    """
+
+    def __init__(self,
+                 alpha: float = 0.2,
+                 failure_threshold: int = 5,
+                 error_rate_threshold: float = 0.5,
+                 min_samples: int = 10,
+                 reset_timeout: float = 10.0,
+                 max_reset_timeout: float = 300.0):
+        """
+        Initialize the health of a backend without any requests seen.
+
+        Args:
+            alpha (float): Weight of a new sample in the moving averages, defaults to 0.2.
+            failure_threshold (int): Consecutive failures that open the circuit, defaults to 5.
+            error_rate_threshold (float): Error rate that opens the circuit, defaults to 0.5.
+            min_samples (int): Requests needed before the error rate can open the circuit,
+                defaults to 10.
+            reset_timeout (float): Seconds an opened circuit stays open before it is probed,
+                defaults to 10.
+            max_reset_timeout (float): Upper bound of the doubled timeout, defaults to 300.
+        """
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_samples = min_samples
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.latencies: dict[str, float] = {}
+        self.error_rate = 0.0
+        self.consecutive_failures = 0
+        self.state = CircuitState.CLOSED
+        self.successes = 0
+        self.failures = 0
+        self._open_timeout = reset_timeout
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def score(self, kind: str = "response") -> float:
+        """
+        Return the expected seconds to a request of a kind, counting the failed attempts.
+
+        A backend without latency for the kind scores 0 while it isn't failing, so the
+        next request measures it, and infinity once it fails, so a backend that only
+        failed never wins over one that works.
+
+        Args:
+            kind (str): The kind of request, as passed to `record_success`.
+
+        Returns:
+            float: The score; lower is better.
+        """
+        latency = self.latencies.get(kind)
+        if latency is None:
+            return math.inf if self.consecutive_failures else 0.0
+        return latency / max(0.1, 1.0 - self.error_rate)
+
+    @property
+    def retry_at(self) -> float:
+        """
+        float: `time.monotonic()` at which an open circuit turns half-open.
+        """
+        return self._opened_at + self._open_timeout
+
+    def record_success(self, latency: float, kind: str = "response") -> None:
+        """
+        Record a successful request, closing a half-open circuit.
+
+        Args:
+            latency (float): Seconds the request took.
+            kind (str): What was timed: "response" for the whole response, "first_chunk"
+                for the first chunk of a stream, "connect" for a live session.
+        """
+        with self._lock:
+            self.successes += 1
+            average = self.latencies.get(kind)
+            self.latencies[kind] = latency if average is None else average + self.alpha * (latency - average)
+            self.error_rate -= self.alpha * self.error_rate
+            self.consecutive_failures = 0
+            if self.state is not CircuitState.CLOSED:
+                self.state = CircuitState.CLOSED
+                self.error_rate = 0.0
+                self._open_timeout = self.reset_timeout
+            self._trial = False
+
+    def record_failure(self) -> bool:
+        """
+        Record a failed request, opening the circuit if the backend looks down.
+
+        Returns:
+            bool: Whether this failure opened the circuit.
+        """
+        with self._lock:
+            self.failures += 1
+            self.error_rate += self.alpha * (1.0 - self.error_rate)
+            self.consecutive_failures += 1
+            self._trial = False
+            if self.state is CircuitState.HALF_OPEN:
+                # The backend is still down; wait longer before the next probe
+                self._open_timeout = min(self.max_reset_timeout, self._open_timeout * 2)
+                return self._open()
+            if self.state is CircuitState.CLOSED and (
+                    self.consecutive_failures >= self.failure_threshold
+                    or (self.successes + self.failures >= self.min_samples
+                        and self.error_rate >= self.error_rate_threshold)):
+                return self._open()
+            return False
+
+    def record_neutral(self) -> None:
+        """
+        Record a request that failed through no fault of the backend, e.g. on an
+        invalid parameter.
+
+        It says nothing about the backend; it only frees the trial of a half-open
+        circuit for the next request.
+        """
+        with self._lock:
+            self._trial = False
+
+    def record_cancelled(self) -> None:
+        """
+        Record a request the caller cancelled before it completed. Like any other
+        neutral outcome, it only frees the trial of a half-open circuit.
+        """
+        self.record_neutral()
+
+    def half_open(self) -> None:
+        """
+        Turn an open circuit half-open, e.g. before probing the backend.
+        """
+        with self._lock:
+            if self.state is CircuitState.OPEN:
+                self.state = CircuitState.HALF_OPEN
+
+    def allow_trial(self) -> bool:
+        """
+        Admit a single trial request to a circuit whose open timeout has passed.
+
+        Used when the backend is not probed in the background.
+
+        Returns:
+            bool: Whether the caller may send the trial request.
+        """
+        with self._lock:
+            if self.state is CircuitState.OPEN and time.monotonic() >= self.retry_at:
+                self.state = CircuitState.HALF_OPEN
+            if self.state is CircuitState.HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def _open(self) -> bool:
+        self.state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        return True
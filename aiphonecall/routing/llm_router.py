@@ -0,0 +1,140 @@
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Iterator, Optional, Union
+
+from aiphonecall.interfaces.llm_provider_interface import LLMProvider
+from aiphonecall.routing.backend_pool import Backend, BackendPool
+
+
+class LLMRouter(LLMProvider):
+    """
+    LLMProvider routing every request to the fastest healthy of several LLM backends.
+
+    Tracks the latency (of whole replies and, separately, of the first delta of
+    streams) and error rate of every backend, sends each request to the one
+    expected to answer first, and fails over to the next when it fails before
+    answering. Backends that keep failing are skipped by a circuit breaker and
+    probed in the background until they answer again. See `BackendPool` for the details.
+
+    Attributes:
+        pool (BackendPool): The backends with their health.
+    """
+
+    def __init__(self,
+                 backends: list[Union[Backend, LLMProvider]],
+                 probe: Optional[Callable[[Backend], Any]] = None,
+                 background_probes: bool = True,
+                 **health_kwargs):
+        """
+        Initialize the router.
+
+        Args:
+            backends (list[Union[Backend, LLMProvider]]): The backends, in order of preference
+                for ties. Wrap a provider in a Backend to give it its own model.
+            probe (Optional[Callable[[Backend], Any]]): Function checking whether a backend
+                with an open circuit is back, defaults to a one-word chat.
+            background_probes (bool): Whether to probe backends in the background, defaults to
+                True. Otherwise a single live request is let through as a trial.
+            **health_kwargs: Arguments of `BackendHealth`, e.g. failure_threshold.
+        """
+        backends = [b if isinstance(b, Backend) else Backend(provider=b) for b in backends]
+        self.pool = BackendPool(backends, (probe or _probe) if background_probes else None, **health_kwargs)
+        primary = backends[0].provider
+        super().__init__(primary.api_key, primary.transport, primary.limiter)
+
+    def _create_payload(self, **kwargs) -> tuple[str, dict, dict]:
+        # Always the primary backend's payload, so that cache keys don't depend on the health of
+        # the backends and building one doesn't take the trial of a half-open circuit
+        backend = self.pool.backends[0]
+        return backend.provider._create_payload(**backend.params(kwargs))
+
+    def chat(self, text: Optional[str] = None, model: Union[str, Enum, None] = None, **kwargs) -> str:
+        """
+        Synchronously chat with the best available backend.
+
+        Args:
+            text (Optional[str]): Your message to chat with the LLM.
+            model (Union[str, Enum, None]): The model, unless the backend sets its own.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            str: Returns the output text from the LLM.
+
+        Raises:
+            HTTPError: If the request fails on every available backend.
+            NoHealthyBackendError: If every backend's circuit is open.
+            ValueError: If invalid parameters are provided.
+        """
+        return self.pool.call("chat", text=text, model=model, **kwargs)
+
+    async def achat(self, text: Optional[str] = None, model: Union[str, Enum, None] = None, **kwargs) -> str:
+        """
+        Asynchronously chat with the best available backend.
+
+        Args:
+            text (Optional[str]): Your message to chat with the LLM.
+            model (Union[str, Enum, None]): The model, unless the backend sets its own.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            str: Returns the output text from the LLM.
+
+        Raises:
+            HTTPError: If the request fails on every available backend.
+            NoHealthyBackendError: If every backend's circuit is open.
+            ValueError: If invalid parameters are provided.
+        """
+        return await self.pool.acall("achat", text=text, model=model, **kwargs)
+
+    def chat_stream(self, text: Optional[str] = None, model: Union[str, Enum, None] = None,
+                    **kwargs) -> Iterator[str]:
+        """
+        Synchronously chat with the best available backend, yielding the reply as it is generated.
+
+        Args:
+            text (Optional[str]): Your message to chat with the LLM.
+            model (Union[str, Enum, None]): The model, unless the backend sets its own.
+            **kwargs: Additional provider-specific parameters.
+
+        Yields:
+            str: Text deltas of the reply, in order.
+
+        Raises:
+            HTTPError: If the request fails on every available backend, or after the
+                first delta.
+            NoHealthyBackendError: If every backend's circuit is open.
+            ValueError: If invalid parameters are provided.
+        """
+        return self.pool.stream("chat_stream", text=text, model=model, **kwargs)
+
+    def achat_stream(self, text: Optional[str] = None, model: Union[str, Enum, None] = None,
+                     **kwargs) -> AsyncIterator[str]:
+        """
+        Asynchronously chat with the best available backend, yielding the reply as it is generated.
+
+        Args:
+            text (Optional[str]): Your message to chat with the LLM.
+            model (Union[str, Enum, None]): The model, unless the backend sets its own.
+            **kwargs: Additional provider-specific parameters.
+
+        Yields:
+            str: Text deltas of the reply, in order.
+
+        Raises:
+            HTTPError: If the request fails on every available backend, or after the
+                first delta.
+            NoHealthyBackendError: If every backend's circuit is open.
+            ValueError: If invalid parameters are provided.
+        """
+        return self.pool.astream("achat_stream", text=text, model=model, **kwargs)
+
+    def close(self) -> None:
+        super().close()
+        self.pool.close()
+
+    async def aclose(self) -> None:
+        await super().aclose()
+        await self.pool.aclose()
+
+
+def _probe(backend: Backend) -> None:
+    backend.provider.chat(**backend.params({"text": "Reply with OK.", "temperature": 0}))
@@ -0,0 +1,187 @@
+import asyncio
+import time
+from enum import Enum
+from typing import Any, AsyncIterator, Callable, Optional, Union
+
+import numpy as np
+
+from aiphonecall.audio.pcm import write_wav
+from aiphonecall.interfaces.stt_provider_interface import STTProvider
+from aiphonecall.interfaces.stt_stream_session_interface import STTStreamEvent, STTStreamSession
+from aiphonecall.routing.backend_pool import Backend, BackendPool
+from aiphonecall.utils.audio_source import AudioSource, aread_audio, read_audio
+
+# Half a second of silence, transcribed by the default probe
+_PROBE_AUDIO = write_wav(np.zeros(8000, dtype=np.int16), 16000)
+
+
+class STTRouter(STTProvider):
+    """
+    STTProvider routing every request to the fastest healthy of several STT backends.
+
+    Tracks the latency and error rate of every backend, sends each request to
+    the one expected to answer first, and fails over to the next when it fails.
+    Backends that keep failing are skipped by a circuit breaker and probed in
+    the background until they answer again. See `BackendPool` for the details.
+    Live sessions are routed when they connect.
+
+    Audio that can only be read once (file objects, async iterators) is read
+    into memory first when there are several backends, so it can be sent again.
+
+    Attributes:
+        pool (BackendPool): The backends with their health.
+    """
+
+    def __init__(self,
+                 backends: list[Union[Backend, STTProvider]],
+                 probe: Optional[Callable[[Backend], Any]] = None,
+                 background_probes: bool = True,
+                 **health_kwargs):
+        """
+        Initialize the router.
+
+        Args:
+            backends (list[Union[Backend, STTProvider]]): The backends, in order of preference
+                for ties. Wrap a provider in a Backend to give it its own model.
+            probe (Optional[Callable[[Backend], Any]]): Function checking whether a backend
+                with an open circuit is back, defaults to transcribing half a second of silence.
+            background_probes (bool): Whether to probe backends in the background, defaults to
+                True. Otherwise a single live request is let through as a trial.
+            **health_kwargs: Arguments of `BackendHealth`, e.g. failure_threshold.
+        """
+        backends = [b if isinstance(b, Backend) else Backend(provider=b) for b in backends]
+        self.pool = BackendPool(backends, (probe or _probe) if background_probes else None, **health_kwargs)
+        primary = backends[0].provider
+        super().__init__(primary.api_key, primary.transport, primary.limiter)
+
+    def _create_payload(self, **kwargs) -> tuple[str, dict, AudioSource]:
+        # Always the primary backend's payload, so that cache keys don't depend on the health of
+        # the backends and building one doesn't take the trial of a half-open circuit
+        backend = self.pool.backends[0]
+        return backend.provider._create_payload(**backend.params(kwargs))
+
+    def speech2text(self, audio: AudioSource, model: Union[str, Enum, None] = None, **kwargs) -> str:
+        """
+        Synchronously convert speech to text with the best available backend.
+
+        Args:
+            audio (AudioSource): The audio that needs conversion.
+            model (Union[str, Enum, None]): The model, unless the backend sets its own.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            str: Returns the output text from the speech.
+
+        Raises:
+            HTTPError: If the request fails on every available backend.
+            NoHealthyBackendError: If every backend's circuit is open.
+            ValueError: If invalid parameters are provided.
+        """
+        if len(self.pool.backends) > 1 and hasattr(audio, "read"):
+            audio = read_audio(audio)
+        return self.pool.call("speech2text", audio=audio, model=model, **kwargs)
+
+    async def aspeech2text(self, audio: AudioSource, model: Union[str, Enum, None] = None, **kwargs) -> str:
+        """
+        Asynchronously convert speech to text with the best available backend.
+
+        Args:
+            audio (AudioSource): The audio that needs conversion.
+            model (Union[str, Enum, None]): The model, unless the backend sets its own.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            str: Returns the output text from the speech.
+
+        Raises:
+            HTTPError: If the request fails on every available backend.
+            NoHealthyBackendError: If every backend's circuit is open.
+            ValueError: If invalid parameters are provided.
+        """
+        if len(self.pool.backends) > 1 and (hasattr(audio, "read") or hasattr(audio, "__aiter__")):
+            audio = await aread_audio(audio)
+        return await self.pool.acall("aspeech2text", audio=audio, model=model, **kwargs)
+
+    def aspeech2text_stream(self, model: Union[str, Enum, None] = None, **kwargs) -> STTStreamSession:
+        """
+        Open a live speech-to-text session on the best available backend.
+
+        Args:
+            model (Union[str, Enum, None]): The model, unless the backend sets its own.
+            **kwargs: Additional provider-specific parameters (e.g. encoding, sample rate).
+
+        Returns:
+            STTStreamSession: The session. It connects to the first backend that accepts
+            the connection when entered as an async context manager.
+        """
+        return RoutedSTTStreamSession(self.pool, dict(model=model, **kwargs))
+
+    def close(self) -> None:
+        super().close()
+        self.pool.close()
+
+    async def aclose(self) -> None:
+        await super().aclose()
+        await self.pool.aclose()
+
+
+class RoutedSTTStreamSession(STTStreamSession):
+    """
+    Live session opened on the first backend of a router that accepts the connection.
+
+    The connection time counts as the backend's "connect" latency, which is
+    only compared with that of other live sessions. Once connected, the
+    session stays on its backend; failures after that are raised.
+    """
+
+    def __init__(self, pool: BackendPool, params: dict):
+        """
+        Initialize the session. The connection is opened by `connect`.
+
+        Args:
+            pool (BackendPool): The backends of the router.
+            params (dict): Parameters of the session.
+        """
+        self.pool = pool
+        self.params = params
+        self.backend: Optional[Backend] = None
+        self._session: Optional[STTStreamSession] = None
+
+    async def connect(self) -> None:
+        error: Optional[BaseException] = None
+        for backend in self.pool.candidates("connect"):
+            session = backend.provider.aspeech2text_stream(**backend.params(self.params))
+            start = time.monotonic()
+            try:
+                await session.connect()
+            except asyncio.CancelledError:
+                self.pool.cancelled(backend)
+                await session.aclose()
+                raise
+            except Exception as e:
+                await session.aclose()
+                if not self.pool.failed(backend, e):
+                    raise
+                error = e
+                continue
+            self.pool.succeeded(backend, time.monotonic() - start, "connect")
+            self.backend, self._session = backend, session
+            return
+        raise error
+
+    async def send(self, audio: bytes) -> None:
+        await self._session.send(audio)
+
+    async def finish(self) -> None:
+        await self._session.finish()
+
+    def __aiter__(self) -> AsyncIterator[STTStreamEvent]:
+        return self._session.__aiter__()
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            await self._session.aclose()
+
+
+def _probe(backend: Backend) -> None:
+    backend.provider.speech2text(**backend.params({"audio": _PROBE_AUDIO}))
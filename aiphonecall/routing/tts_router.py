@@ -0,0 +1,148 @@
+from enum import Enum
+from typing import IO, Any, AsyncIterator, Callable, Optional, Union
+
+from aiphonecall.interfaces.tts_provider_interface import TTSProvider
+from aiphonecall.routing.backend_pool import Backend, BackendPool
+
+
+class TTSRouter(TTSProvider):
+    """
+    TTSProvider routing every request to the fastest healthy of several TTS backends.
+
+    Tracks the latency (of whole syntheses and, separately, of the first chunk
+    of streams) and error rate of every backend, sends each request to the one
+    expected to answer first, and fails over to the next when it fails before
+    delivering audio. Backends that keep failing are skipped by a circuit
+    breaker and probed in the background until they answer again. See `BackendPool` for the details.
+
+    Voices and output formats are vendor-specific, so give every backend the
+    ones to use through its options.
+
+    Attributes:
+        pool (BackendPool): The backends with their health.
+    """
+
+    def __init__(self,
+                 backends: list[Union[Backend, TTSProvider]],
+                 probe: Optional[Callable[[Backend], Any]] = None,
+                 background_probes: bool = True,
+                 **health_kwargs):
+        """
+        Initialize the router.
+
+        Args:
+            backends (list[Union[Backend, TTSProvider]]): The backends, in order of preference
+                for ties. Wrap a provider in a Backend to give it its own voice and model.
+            probe (Optional[Callable[[Backend], Any]]): Function checking whether a backend
+                with an open circuit is back, defaults to synthesizing "OK.".
+            background_probes (bool): Whether to probe backends in the background, defaults to
+                True. Otherwise a single live request is let through as a trial.
+            **health_kwargs: Arguments of `BackendHealth`, e.g. failure_threshold.
+        """
+        backends = [b if isinstance(b, Backend) else Backend(provider=b) for b in backends]
+        self.pool = BackendPool(backends, (probe or _probe) if background_probes else None, **health_kwargs)
+        primary = backends[0].provider
+        super().__init__(primary.api_key, primary.transport, primary.limiter)
+
+    def _create_payload(self, **kwargs) -> tuple[str, dict, dict]:
+        # Always the primary backend's payload, so that cache keys don't depend on the health of
+        # the backends and building one doesn't take the trial of a half-open circuit
+        backend = self.pool.backends[0]
+        return backend.provider._create_payload(**backend.params(kwargs))
+
+    def transcribe(self,
+                   text: str,
+                   voice: Union[str, Enum, None] = None,
+                   model: Union[str, Enum, None] = None,
+                   output_format: Union[str, Enum, None] = None,
+                   **kwargs) -> IO[bytes]:
+        """
+        Synchronously convert text to speech with the best available backend.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice (Union[str, Enum, None]): The voice, unless the backend sets its own.
+            model (Union[str, Enum, None]): The model, unless the backend sets its own.
+            output_format (Union[str, Enum, None]): The output format, unless the backend
+                sets its own.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            IO[bytes]: A binary stream containing the generated audio.
+
+        Raises:
+            HTTPError: If the request fails on every available backend.
+            NoHealthyBackendError: If every backend's circuit is open.
+            ValueError: If invalid parameters are provided.
+        """
+        return self.pool.call("transcribe", text=text, voice=voice, model=model, output_format=output_format,
+                              **kwargs)
+
+    async def atranscribe(self,
+                          text: str,
+                          voice: Union[str, Enum, None] = None,
+                          model: Union[str, Enum, None] = None,
+                          output_format: Union[str, Enum, None] = None,
+                          **kwargs) -> IO[bytes]:
+        """
+        Asynchronously convert text to speech with the best available backend.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice (Union[str, Enum, None]): The voice, unless the backend sets its own.
+            model (Union[str, Enum, None]): The model, unless the backend sets its own.
+            output_format (Union[str, Enum, None]): The output format, unless the backend
+                sets its own.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            IO[bytes]: A binary stream containing the generated audio.
+
+        Raises:
+            HTTPError: If the request fails on every available backend.
+            NoHealthyBackendError: If every backend's circuit is open.
+            ValueError: If invalid parameters are provided.
+        """
+        return await self.pool.acall("atranscribe", text=text, voice=voice, model=model,
+                                     output_format=output_format, **kwargs)
+
+    def atranscribe_stream(self,
+                           text: str,
+                           voice: Union[str, Enum, None] = None,
+                           model: Union[str, Enum, None] = None,
+                           output_format: Union[str, Enum, None] = None,
+                           **kwargs) -> AsyncIterator[bytes]:
+        """
+        Asynchronously convert text to speech with the best available backend, yielding the audio as it arrives.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice (Union[str, Enum, None]): The voice, unless the backend sets its own.
+            model (Union[str, Enum, None]): The model, unless the backend sets its own.
+            output_format (Union[str, Enum, None]): The output format, unless the backend
+                sets its own.
+            **kwargs: Additional provider-specific parameters.
+
+        Yields:
+            bytes: Chunks of the generated audio, in order.
+
+        Raises:
+            HTTPError: If the request fails on every available backend, or after the
+                first chunk.
+            NoHealthyBackendError: If every backend's circuit is open.
+            ValueError: If invalid parameters are provided.
+        """
+        return self.pool.astream("atranscribe_stream", text=text, voice=voice, model=model,
+                                 output_format=output_format, **kwargs)
+
+    def close(self) -> None:
+        super().close()
+        self.pool.close()
+
+    async def aclose(self) -> None:
+        await super().aclose()
+        await self.pool.aclose()
+
+
+def _probe(backend: Backend) -> None:
+    backend.provider.transcribe(**backend.params({"text": "OK."})).read()
@@ -1,2 +1,3 @@
 from .deepgram_sst.deepgram_stt import DeepgramSTTProvider
-from .deepgram_sst.deepgram_stt_schema import DeepgramSTTModels
\ No newline at end of file
+from .deepgram_sst.deepgram_stt_schema import DeepgramSTTEncodings, DeepgramSTTModels
+from .deepgram_sst.deepgram_stt_live import DeepgramLiveSession
@@ -1,35 +1,48 @@
-import requests
-from typing import IO, Tuple, Dict, BinaryIO
-from io import BytesIO
-import aiohttp
-from .deepgram_stt_schema import DeepgramSTTModels
+from typing import Optional
+from urllib.parse import urlencode
+from aiphonecall.audio.vad import SilenceTrimmer
+from .deepgram_stt_live import DeepgramLiveSession
+from .deepgram_stt_schema import DeepgramSTTEncodings, DeepgramSTTModels
 from aiphonecall.interfaces.stt_provider_interface import STTProvider
+from aiphonecall.utils.audio_source import AudioSource, open_audio
+from aiphonecall.utils.deadline import Timeouts
+from aiphonecall.utils.rate_limit import RateLimiter
+from aiphonecall.utils.transport import HTTPTransport
 from aiphonecall.utils.util import validate_str_value
-import os
 
 
 class DeepgramSTTProvider(STTProvider):
     """
     Deepgram implementation of the STTProvider interface.
 
-    Provides speech-to-text conversion using the Deepgram API, using various models.
+    Provides speech-to-text conversion using the Deepgram API, using various models,
+    both for prerecorded audio and for live audio streamed over a WebSocket.
+
+    Attributes:
+        live_url (str): Endpoint of the live WebSocket API. Point it at a local
+            WebSocket stand-in to test live sessions without the real service.
     """
 
-    def __init__(self, api_key):
-        super().__init__(api_key)
+    live_url = "wss://api.deepgram.com/v1/listen"
+
+    def __init__(self,
+                 api_key: str,
+                 transport: Optional[HTTPTransport] = None,
+                 limiter: Optional[RateLimiter] = None):
+        super().__init__(api_key, transport, limiter)
 
-    def _create_payload(self, **kwargs) -> tuple[str, dict, BinaryIO]:
+    def _create_payload(self, **kwargs) -> tuple[str, dict, AudioSource]:
         """
         Create the API request payload for Deepgram STT service.
 
         Args:
-            **kwargs: Must include 'filepath' and  'model'
+            **kwargs: Must include 'audio' and  'model'
 
         Returns:
-            tuple[str, dict, BinaryIO]: URL, headers, and data payload for the API request
+            tuple[str, dict, AudioSource]: URL, headers, and audio source for the API request
 
         """
-        filepath = kwargs.get("filepath")
+        audio = kwargs.get("audio")
         # Use the utility validation method to ensure the voice and model are valid and
         # convert them to enums if they are strings
         model = validate_str_value(DeepgramSTTModels, kwargs.get("model"))
@@ -37,64 +50,169 @@ class DeepgramSTTProvider(STTProvider):
         url = f"https://api.deepgram.com/v1/listen?model={model.value}&smart_format=true"
         headers = {"Authorization": f"Token {self.api_key}",
                    "Content-Type": "audio/*"}
-        if not os.path.exists(filepath):
-            raise FileNotFoundError(f"File not found at {filepath}")
-        data = open(filepath, "rb")
-        return url, headers, data
+        return url, headers, audio
+
+    def _create_stream_payload(self, **kwargs) -> tuple[str, dict]:
+        """
+        Create the WebSocket URL and handshake headers of a live Deepgram STT session.
+
+        Args:
+            **kwargs: Must include 'model', 'encoding', 'sample_rate', 'channels',
+                     'interim_results', 'endpointing' and 'utterance_end_ms'.
+
+        Returns:
+            tuple[str, dict]: URL and headers for the WebSocket connection
+
+        """
+        model = validate_str_value(DeepgramSTTModels, kwargs.get("model"))
+        encoding = validate_str_value(DeepgramSTTEncodings, kwargs.get("encoding"))
+        interim_results = kwargs.get("interim_results")
+        endpointing = kwargs.get("endpointing")
+        utterance_end_ms = kwargs.get("utterance_end_ms")
+
+        params = {
+            "model": model.value,
+            "encoding": encoding.value,
+            "sample_rate": kwargs.get("sample_rate"),
+            "channels": kwargs.get("channels"),
+            "smart_format": "true",
+            "interim_results": "true" if interim_results else "false",
+            "endpointing": "false" if endpointing is None else endpointing,
+            "vad_events": "true",
+        }
+        # Deepgram only sends UtteranceEnd messages along with interim results
+        if utterance_end_ms is not None and interim_results:
+            params["utterance_end_ms"] = utterance_end_ms
+        url = f"{self.live_url}?{urlencode(params)}"
+        headers = {"Authorization": f"Token {self.api_key}"}
+        return url, headers
 
     def speech2text(self,
-                    filepath: str,
+                    audio: AudioSource,
                     model: DeepgramSTTModels | str = DeepgramSTTModels.NOVA_2,
+                    trim_silence: Optional[SilenceTrimmer] = None,
+                    timeout: float | Timeouts | None = None,
                     **Kwargs) -> str:
         """
         Synchronously convert speech to text.
 
         Args:
-            filepath (str): The path of the file that needs conversion.
+            audio (AudioSource): The audio that needs conversion: a file path, bytes,
+                memoryview, BytesIO or binary file object. It is streamed in chunks, and
+                files opened from a path are closed once the request is done.
             model (DeepgramSTTModels[str, Enum]): The model to use, defaults to NOVA_2.
-
-
+            trim_silence (Optional[SilenceTrimmer]): If given, leading and trailing silence
+                is cut and long pauses are shortened before the upload (16-bit PCM WAV
+                only, other formats are streamed untouched); the trimmer accumulates the
+                seconds removed. Audio without speech
+                is not uploaded at all.
+            timeout (Union[float, Timeouts, None]): Time budget of the request, either the total
+                seconds or connect, first byte and total timeouts. Defaults to the provider's
+                `timeouts`, and is shortened to the deadline of the context if any.
 
         Returns:
             str: Returns the output text from the speech.
 
         Raises:
             HTTPError: If the API request fails.
+            ProviderTimeoutError: If the request runs out of time.
             ValueError: If invalid parameters are provided.
         """
-        url, headers, data = self._create_payload(filepath=filepath, model=model)
-
-        response = requests.post(url, headers=headers, data=data)
-        if not response.ok:
-            print(response.text)
-            response.raise_for_status()
-        text = response.json()['results']["channels"][0]["alternatives"][0]["transcript"]
+        url, headers, audio = self._create_payload(audio=audio, model=model)
+        if trim_silence is not None:
+            audio, has_speech = self._trim_silence(audio, trim_silence)
+            if not has_speech:
+                return ""
+
+        with open_audio(audio) as data, self._post(url, timeout=timeout, headers=headers, data=data) as response:
+            if not response.ok:
+                print(response.text)
+                response.raise_for_status()
+            text = response.json()['results']["channels"][0]["alternatives"][0]["transcript"]
         return text
 
     async def aspeech2text(self,
-                           filepath: str,
+                           audio: AudioSource,
                            model: DeepgramSTTModels | str = DeepgramSTTModels.NOVA_2,
+                           trim_silence: Optional[SilenceTrimmer] = None,
+                           timeout: float | Timeouts | None = None,
                            **kwargs) -> str:
         """
         Asynchronously convert speech to text.
 
         Args:
-            filepath (str): The path of the file that needs conversion.
+            audio (AudioSource): The audio that needs conversion: a file path, bytes,
+                memoryview, BytesIO, binary file object or async iterator of bytes. It is
+                streamed in chunks, and files opened from a path are closed once the
+                request is done.
             model (DeepgramSTTModels[str, Enum]): The model to use, defaults to NOVA_2.
+            trim_silence (Optional[SilenceTrimmer]): If given, leading and trailing silence
+                is cut and long pauses are shortened before the upload (16-bit PCM WAV
+                only, other formats are streamed untouched); the trimmer accumulates the
+                seconds removed. Audio without speech
+                is not uploaded at all.
+            timeout (Union[float, Timeouts, None]): Time budget of the request, either the total
+                seconds or connect, first byte and total timeouts. Defaults to the provider's
+                `timeouts`, and is shortened to the deadline of the context if any.
 
         Returns:
             str: Returns the output text from the speech.
 
         Raises:
             HTTPError: If the API request fails.
+            ProviderTimeoutError: If the request runs out of time.
             ValueError: If invalid parameters are provided.
         """
-        url, headers, data = self._create_payload(filepath=filepath, model=model)
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, data=data) as response:
+        url, headers, audio = self._create_payload(audio=audio, model=model)
+        if trim_silence is not None:
+            audio, has_speech = await self._atrim_silence(audio, trim_silence)
+            if not has_speech:
+                return ""
+        with open_audio(audio, asynchronous=True) as data:
+            async with self._apost(url, timeout=timeout, headers=headers, data=data) as response:
                 if not response.ok:
-                    print(response.text)
+                    print(await response.text())
                     response.raise_for_status()  # Check if the request was successful
                 response = await response.json()
                 text = response['results']["channels"][0]["alternatives"][0]["transcript"]
                 return text
+
+    def aspeech2text_stream(self,
+                            model: DeepgramSTTModels | str = DeepgramSTTModels.NOVA_2,
+                            encoding: DeepgramSTTEncodings | str = DeepgramSTTEncodings.LINEAR16,
+                            sample_rate: int = 8000,
+                            channels: int = 1,
+                            interim_results: bool = True,
+                            endpointing: Optional[int] = 300,
+                            utterance_end_ms: Optional[int] = 1000,
+                            **kwargs) -> DeepgramLiveSession:
+        """
+        Open a live speech-to-text session over Deepgram's WebSocket API.
+
+        The session connects when entered as an async context manager (or on
+        `connect()`); push raw audio frames with `send` and iterate over it for
+        interim and final transcripts and endpointing events. The handshake is
+        bounded by the provider's connect timeout and the deadline of the context.
+
+        Args:
+            model (DeepgramSTTModels[str, Enum]): The model to use, defaults to NOVA_2.
+            encoding (DeepgramSTTEncodings[str, Enum]): Encoding of the raw audio frames,
+                defaults to LINEAR16.
+            sample_rate (int): Sample rate of the audio in Hz, defaults to 8000.
+            channels (int): Number of audio channels, defaults to 1.
+            interim_results (bool): Whether interim transcripts are sent, defaults to True.
+            endpointing (Optional[int]): Milliseconds of silence after which a transcript
+                is marked speech_final, defaults to 300. None disables endpointing.
+            utterance_end_ms (Optional[int]): Milliseconds of silence between words after
+                which an UTTERANCE_END event is sent, defaults to 1000. None disables it.
+
+        Returns:
+            DeepgramLiveSession: The (not yet connected) live session.
+
+        Raises:
+            ValueError: If invalid parameters are provided.
+        """
+        url, headers = self._create_stream_payload(model=model, encoding=encoding, sample_rate=sample_rate,
+                                                   channels=channels, interim_results=interim_results,
+                                                   endpointing=endpointing, utterance_end_ms=utterance_end_ms)
+        return DeepgramLiveSession(url, headers, self.transport, timeouts=self.timeouts)
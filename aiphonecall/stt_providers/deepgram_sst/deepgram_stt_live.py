@@ -0,0 +1,148 @@
+import asyncio
+import json
+import time
+from typing import AsyncIterator, Optional
+
+import aiohttp
+
+from aiphonecall.interfaces.stt_stream_session_interface import STTStreamEvent, STTStreamEventType, STTStreamSession
+from aiphonecall.utils.deadline import RequestBudget, Timeouts
+from aiphonecall.utils.transport import HTTPTransport
+
+
+class DeepgramLiveSession(STTStreamSession):
+    """
+    Deepgram implementation of the STTStreamSession interface.
+
+    Streams raw audio over Deepgram's live WebSocket API and turns its
+    'Results', 'SpeechStarted' and 'UtteranceEnd' messages into
+    STTStreamEvents. A KeepAlive message is sent whenever no audio was pushed
+    for `keepalive_interval` seconds, so pauses in the call don't make Deepgram
+    close the connection.
+
+    The handshake is bounded by the connect timeout and the deadline of the
+    context, if any. The connection itself may stay open for the whole call.
+    If the service closes it abnormally, or before `finish` was called, the
+    iteration raises instead of ending as if the audio was complete.
+    """
+
+    def __init__(self,
+                 url: str,
+                 headers: dict,
+                 transport: HTTPTransport,
+                 keepalive_interval: float = 5.0,
+                 timeouts: Optional[Timeouts] = None):
+        """
+        Initialize the session. The connection is opened by `connect`.
+
+        Args:
+            url (str): The WebSocket URL including the query parameters.
+            headers (dict): Headers of the WebSocket handshake.
+            transport (HTTPTransport): Transport whose pooled session opens the connection.
+            keepalive_interval (float): Seconds without audio after which a KeepAlive is sent,
+                defaults to 5.
+            timeouts (Optional[Timeouts]): Time budget of the handshake; only `connect` applies.
+                Defaults to a 10 second connect timeout.
+        """
+        self.url = url
+        self.headers = headers
+        self.transport = transport
+        self.keepalive_interval = keepalive_interval
+        self.timeouts = timeouts if timeouts is not None else Timeouts(connect=10.0)
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._keepalive: Optional[asyncio.Task] = None
+        self._last_sent = 0.0
+        self._finished = False
+        self._closed = False
+
+    async def connect(self) -> None:
+        # The session lasts as long as the call, so only the handshake is bounded
+        budget = RequestBudget(Timeouts(connect=self.timeouts.connect), time.monotonic())
+        session = await self.transport.asession()
+        try:
+            self._ws = await asyncio.wait_for(session.ws_connect(self.url, headers=self.headers), budget.connect)
+        except asyncio.TimeoutError as e:
+            raise budget.error("connect") from e
+        self._last_sent = time.monotonic()
+        self._keepalive = asyncio.create_task(self._keep_alive())
+
+    async def send(self, audio: bytes) -> None:
+        self._last_sent = time.monotonic()
+        await self._ws.send_bytes(audio)
+
+    async def finish(self) -> None:
+        self._finished = True
+        if self._ws is not None and not self._ws.closed:
+            await self._ws.send_str(json.dumps({"type": "CloseStream"}))
+
+    def __aiter__(self) -> AsyncIterator[STTStreamEvent]:
+        return self._events()
+
+    async def aclose(self) -> None:
+        self._closed = True
+        if self._keepalive is not None:
+            self._keepalive.cancel()
+            await asyncio.gather(self._keepalive, return_exceptions=True)
+            self._keepalive = None
+        if self._ws is not None:
+            await self._ws.close()
+
+    async def _events(self) -> AsyncIterator[STTStreamEvent]:
+        async for message in self._ws:
+            if message.type == aiohttp.WSMsgType.ERROR:
+                raise self._ws.exception()
+            if message.type != aiohttp.WSMsgType.TEXT:
+                continue
+            event = self._parse_event(json.loads(message.data))
+            if event is not None:
+                yield event
+        if self._closed:
+            return
+        code = self._ws.close_code
+        if code != aiohttp.WSCloseCode.OK or not self._finished:
+            raise aiohttp.WebSocketError(code or aiohttp.WSCloseCode.ABNORMAL_CLOSURE,
+                                         f"Deepgram closed the live session unexpectedly (code {code})")
+
+    async def _keep_alive(self) -> None:
+        while not self._ws.closed:
+            idle = time.monotonic() - self._last_sent
+            if idle >= self.keepalive_interval:
+                try:
+                    await self._ws.send_str(json.dumps({"type": "KeepAlive"}))
+                except ConnectionError:
+                    # Closed while sleeping; the reader reports how and why
+                    return
+                self._last_sent = time.monotonic()
+                idle = 0.0
+            await asyncio.sleep(self.keepalive_interval - idle)
+
+    @staticmethod
+    def _parse_event(message: dict) -> Optional[STTStreamEvent]:
+        """
+        Convert a Deepgram live message to an event.
+
+        Args:
+            message (dict): The decoded JSON message.
+
+        Returns:
+            Optional[STTStreamEvent]: The event, or None for messages that carry none
+            (e.g. Metadata).
+        """
+        kind = message.get("type")
+        if kind == "Results":
+            alternatives = message.get("channel", {}).get("alternatives") or [{}]
+            is_final = message.get("is_final", False)
+            words = alternatives[0].get("words") or [{}]
+            return STTStreamEvent(type=STTStreamEventType.FINAL if is_final else STTStreamEventType.INTERIM,
+                                  text=alternatives[0].get("transcript", ""),
+                                  speech_final=message.get("speech_final", False),
+                                  start=message.get("start"),
+                                  duration=message.get("duration"),
+                                  end=words[-1].get("end"),
+                                  raw=message)
+        if kind == "SpeechStarted":
+            return STTStreamEvent(type=STTStreamEventType.SPEECH_STARTED, start=message.get("timestamp"), raw=message)
+        if kind == "UtteranceEnd":
+            return STTStreamEvent(type=STTStreamEventType.UTTERANCE_END, start=message.get("last_word_end"),
+                                  end=message.get("last_word_end"), raw=message)
+        return None
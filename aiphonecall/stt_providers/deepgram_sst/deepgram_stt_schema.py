@@ -8,3 +8,15 @@ class DeepgramSTTModels(Enum):
     NOVA_2 = "nova-2"
     BASE = "base"
     ENHANCED = "enhanced"
+
+@dataclass
+class DeepgramSTTEncodings(Enum):
+    LINEAR16 = "linear16"
+    MULAW = "mulaw"
+    ALAW = "alaw"
+    FLAC = "flac"
+    OPUS = "opus"
+    SPEEX = "speex"
+    AMR_NB = "amr-nb"
+    AMR_WB = "amr-wb"
+    G729 = "g729"
@@ -1,6 +1,7 @@
-from .deepgram_tts.deepgram_tts_schema import DeepgramTTSModels, DeepgramTTSVoices
+from .deepgram_tts.deepgram_tts_schema import DeepgramTTSModels, DeepgramTTSVoices, DeepgramTTSOutputFormats
 from .deepgram_tts.deepgram_tts import DeepgramTTSProvider
 from .elevenlabs_tts.elevenlabs_tts import ElevenLabsTTSProvider
-from .elevenlabs_tts.elevenlabs_tts_schema import ElevenLabsTTSModels, ElevenLabTTSVoices
+from .elevenlabs_tts.elevenlabs_tts_schema import ElevenLabsTTSModels, ElevenLabTTSVoices, ElevenLabsTTSOutputFormats
 from .openai_tts.openai_tts import OpenAITTSProvider
-from .openai_tts.openai_tts_schema import OpenAITTSModels, OpenAITTSVoices
+from .openai_tts.openai_tts_schema import OpenAITTSModels, OpenAITTSVoices, OpenAITTSOutputFormats
+from .hedged_tts.hedged_tts import HedgedTTSProvider, HedgeTarget
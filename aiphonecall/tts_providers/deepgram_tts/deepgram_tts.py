@@ -1,9 +1,10 @@
-import requests
-from typing import IO
+from typing import IO, AsyncIterator, Optional
 from io import BytesIO
-from .deepgram_tts_schema import DeepgramTTSModels, DeepgramTTSVoices
+from .deepgram_tts_schema import DeepgramTTSModels, DeepgramTTSVoices, DeepgramTTSOutputFormats
 from aiphonecall.interfaces.tts_provider_interface import TTSProvider
-import aiohttp
+from aiphonecall.utils.deadline import Timeouts
+from aiphonecall.utils.rate_limit import RateLimiter
+from aiphonecall.utils.transport import HTTPTransport
 from aiphonecall.utils.util import validate_str_value
 
 
@@ -14,15 +15,18 @@ class DeepgramTTSProvider(TTSProvider):
     Provides text-to-speech conversion using the Deepgram API, using various models and voices
     """
 
-    def __init__(self, api_key):
-        super().__init__(api_key)
+    def __init__(self,
+                 api_key: str,
+                 transport: Optional[HTTPTransport] = None,
+                 limiter: Optional[RateLimiter] = None):
+        super().__init__(api_key, transport, limiter)
 
     def _create_payload(self, **kwargs) -> tuple[str, dict, dict]:
         """
         Create the API request payload for Deepgram TTS service.
 
         Args:
-            **kwargs: Must include 'text', 'voice' and  'model'
+            **kwargs: Must include 'text', 'voice' and  'model', and optionally 'output_format'
 
         Returns:
             tuple[str, dict, dict]: URL, headers, and data payload for the API request
@@ -35,6 +39,13 @@ class DeepgramTTSProvider(TTSProvider):
         model = validate_str_value(DeepgramTTSModels, kwargs.get("model"))
 
         url = f"https://api.deepgram.com/v1/speak?model={model.value}-{voice.value}-en"
+        if kwargs.get("output_format") is not None:
+            output_format = validate_str_value(DeepgramTTSOutputFormats, kwargs.get("output_format"))
+            encoding, _, sample_rate = output_format.value.partition("_")
+            url += f"&encoding={encoding}"
+            if sample_rate:
+                # Raw telephony audio, without a WAV header in front of it
+                url += f"&sample_rate={sample_rate}&container=none"
         headers = {"Authorization": f"Token {self.api_key}"}
         data = {
             "text": text,
@@ -45,6 +56,8 @@ class DeepgramTTSProvider(TTSProvider):
                    text: str,
                    voice: DeepgramTTSVoices | str = DeepgramTTSVoices.ARCAS,
                    model: DeepgramTTSModels | str = DeepgramTTSModels.AURA,
+                   output_format: DeepgramTTSOutputFormats | str | None = None,
+                   timeout: float | Timeouts | None = None,
                    **kwargs) -> IO[bytes]:
         """
         Synchronously convert text to speech using Deepgram API.
@@ -53,23 +66,35 @@ class DeepgramTTSProvider(TTSProvider):
             text (str): The text to convert to speech.
             voice (Union[str, DeepgramTTSVoices]): The voice to use, defaults to ARCAS.
             model (Union[str, DeepgramTTSModels]): The model to use, defaults to AURA.
+            output_format (Union[str, DeepgramTTSOutputFormats, None]): Encoding and sample
+                rate of the audio, e.g. MULAW_8000 for the telephony leg. Defaults to the API's
+                default (MP3).
+            timeout (Union[float, Timeouts, None]): Time budget of the request, either the total
+                seconds or connect, first byte and total timeouts. Defaults to the provider's
+                `timeouts`, and is shortened to the deadline of the context if any.
 
         Returns:
             IO[bytes]: A binary stream containing the generated audio.
 
         Raises:
             HTTPError: If the API request fails.
+            ProviderTimeoutError: If the request runs out of time.
             ValueError: If invalid parameters are provided.
         """
-        url, headers, data = self._create_payload(text=text, voice=voice, model=model)
+        stored = self._stored_phrase(text, voice=voice, model=model, output_format=output_format)
+        if stored is not None:
+            return BytesIO(stored)
 
-        response = requests.post(url, headers=headers, json=data, stream=True)
-        if not response.ok:
-            print(response.text)
-            response.raise_for_status()
+        url, headers, data = self._create_payload(text=text, voice=voice, model=model,
+                                                  output_format=output_format)
 
-        # Convert the response content to a BytesIO stream
-        audio_stream = BytesIO(response.content)
+        with self._post(url, units=len(text), timeout=timeout, headers=headers, json=data,
+                        stream=True) as response:
+            if not response.ok:
+                print(response.text)
+                response.raise_for_status()
+            # Convert the response content to a BytesIO stream
+            audio_stream = BytesIO(response.content)
 
         return audio_stream
 
@@ -77,6 +102,8 @@ class DeepgramTTSProvider(TTSProvider):
                           text: str,
                           voice: DeepgramTTSVoices | str = DeepgramTTSVoices.ARCAS,
                           model: DeepgramTTSModels | str = DeepgramTTSModels.AURA,
+                          output_format: DeepgramTTSOutputFormats | str | None = None,
+                          timeout: float | Timeouts | None = None,
                           **kwargs) -> IO[bytes]:
         """
         Asynchronously convert text to speech using Deepgram API.
@@ -85,18 +112,70 @@ class DeepgramTTSProvider(TTSProvider):
             text (str): The text to convert to speech.
             voice (Union[str, DeepgramTTSVoices]): The voice to use, defaults to ARCAS.
             model (Union[str, DeepgramTTSModels]): The model to use, defaults to AURA.
+            output_format (Union[str, DeepgramTTSOutputFormats, None]): Encoding and sample
+                rate of the audio, e.g. MULAW_8000 for the telephony leg. Defaults to the API's
+                default (MP3).
+            timeout (Union[float, Timeouts, None]): Time budget of the request, either the total
+                seconds or connect, first byte and total timeouts. Defaults to the provider's
+                `timeouts`, and is shortened to the deadline of the context if any.
 
         Returns:
             IO[bytes]: A binary stream containing the generated audio.
 
         Raises:
             HTTPError: If the API request fails.
+            ProviderTimeoutError: If the request runs out of time.
             ValueError: If invalid parameters are provided.
         """
-        url, headers, data = self._create_payload(text=text, voice=voice, model=model)
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=data) as response:
-                response.raise_for_status()  # Check if the request was successful
+        audio_stream = BytesIO()
+        async for chunk in self.atranscribe_stream(text, voice=voice, model=model,
+                                                   output_format=output_format, timeout=timeout):
+            audio_stream.write(chunk)
+        audio_stream.seek(0)
+        return audio_stream
+
+    async def atranscribe_stream(self,
+                                 text: str,
+                                 voice: DeepgramTTSVoices | str = DeepgramTTSVoices.ARCAS,
+                                 model: DeepgramTTSModels | str = DeepgramTTSModels.AURA,
+                                 output_format: DeepgramTTSOutputFormats | str | None = None,
+                                 timeout: float | Timeouts | None = None,
+                                 **kwargs) -> AsyncIterator[bytes]:
+        """
+        Asynchronously convert text to speech using Deepgram API, yielding the audio as it arrives.
+
+        Chunks are yielded as soon as they come off the socket, so playback can start
+        while the synthesis is still running.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice (Union[str, DeepgramTTSVoices]): The voice to use, defaults to ARCAS.
+            model (Union[str, DeepgramTTSModels]): The model to use, defaults to AURA.
+            output_format (Union[str, DeepgramTTSOutputFormats, None]): Encoding and sample
+                rate of the audio, e.g. MULAW_8000 for the telephony leg. Defaults to the API's
+                default (MP3).
+            timeout (Union[float, Timeouts, None]): Time budget of the request, either the total
+                seconds or connect, first byte and total timeouts. Defaults to the provider's
+                `timeouts`, and is shortened to the deadline of the context if any.
 
-                audio_stream = BytesIO(await response.content.read())
-                return audio_stream
+        Yields:
+            bytes: Chunks of the generated audio, in order.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ProviderTimeoutError: If the request runs out of time.
+            ValueError: If invalid parameters are provided.
+        """
+        stored = self._stored_phrase(text, voice=voice, model=model, output_format=output_format)
+        if stored is not None:
+            yield stored
+            return
+
+        url, headers, data = self._create_payload(text=text, voice=voice, model=model,
+                                                  output_format=output_format)
+        async with self._apost(url, units=len(text), timeout=timeout, headers=headers, json=data) as response:
+            if not response.ok:
+                print(await response.text())
+                response.raise_for_status()
+            async for chunk in response.content.iter_any():
+                yield chunk
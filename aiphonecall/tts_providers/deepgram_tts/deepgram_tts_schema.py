@@ -20,3 +20,17 @@ class DeepgramTTSVoices(Enum):
 class DeepgramTTSModels(Enum):
     AURA = "aura"
 
+@dataclass
+class DeepgramTTSOutputFormats(Enum):
+    # Values are "<encoding>" or "<encoding>_<sample rate>"; raw encodings are sent without container
+    MP3 = "mp3"
+    OPUS = "opus"
+    FLAC = "flac"
+    AAC = "aac"
+    MULAW_8000 = "mulaw_8000"
+    ALAW_8000 = "alaw_8000"
+    LINEAR16_8000 = "linear16_8000"
+    LINEAR16_16000 = "linear16_16000"
+    LINEAR16_24000 = "linear16_24000"
+    LINEAR16_48000 = "linear16_48000"
+
@@ -1,9 +1,10 @@
-import requests
-from typing import IO
+from typing import IO, AsyncIterator, Optional
 from io import BytesIO
-from .elevenlabs_tts_schema import ElevenLabTTSVoices, ElevenLabsTTSModels
+from .elevenlabs_tts_schema import ElevenLabTTSVoices, ElevenLabsTTSModels, ElevenLabsTTSOutputFormats
 from aiphonecall.interfaces.tts_provider_interface import TTSProvider
-import aiohttp
+from aiphonecall.utils.deadline import Timeouts
+from aiphonecall.utils.rate_limit import RateLimiter
+from aiphonecall.utils.transport import HTTPTransport
 from aiphonecall.utils.util import validate_str_value
 
 
@@ -15,8 +16,11 @@ class ElevenLabsTTSProvider(TTSProvider):
     and voice settings like stability and similarity.
     """
 
-    def __init__(self, api_key):
-        super().__init__(api_key)
+    def __init__(self,
+                 api_key: str,
+                 transport: Optional[HTTPTransport] = None,
+                 limiter: Optional[RateLimiter] = None):
+        super().__init__(api_key, transport, limiter)
 
     def _create_payload(self, **kwargs) -> tuple[str, dict, dict]:
         """
@@ -24,7 +28,7 @@ class ElevenLabsTTSProvider(TTSProvider):
 
         Args:
             **kwargs: Must include 'text', 'voice', 'model', and optionally
-                     'stability' and 'similarity' parameters.
+                     'stability', 'similarity' and 'output_format' parameters.
 
         Returns:
             tuple[str, dict, dict]: URL, headers, and data payload for the API request
@@ -39,6 +43,9 @@ class ElevenLabsTTSProvider(TTSProvider):
         model = validate_str_value(ElevenLabsTTSModels, kwargs.get("model"))
 
         url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice.value}/stream"
+        if kwargs.get("output_format") is not None:
+            output_format = validate_str_value(ElevenLabsTTSOutputFormats, kwargs.get("output_format"))
+            url += f"?output_format={output_format.value}"
         headers = {"xi-api-key": self.api_key}
         data = {
             "text": text,
@@ -57,7 +64,9 @@ class ElevenLabsTTSProvider(TTSProvider):
                    voice: ElevenLabTTSVoices | str = "DANIEL",
                    model: ElevenLabsTTSModels | str = "eleven_turbo_v2_5",
                    stability: float = 0.5,
-                   similarity: float = 0.8) -> IO[bytes]:
+                   similarity: float = 0.8,
+                   output_format: ElevenLabsTTSOutputFormats | str | None = None,
+                   timeout: float | Timeouts | None = None) -> IO[bytes]:
         """
         Synchronously convert text to speech using ElevenLabs.
 
@@ -67,26 +76,39 @@ class ElevenLabsTTSProvider(TTSProvider):
             model (Union[str, ElevenLabsModels]): The model to use, defaults to eleven_turbo_v2_5.
             stability (float): Voice stability (0.0-1.0), defaults to 0.5
             similarity (float): Voice similarity boost (0.0-1.0), defaults to 0.8
+            output_format (Union[str, ElevenLabsTTSOutputFormats, None]): Encoding and sample
+                rate of the audio, e.g. ULAW_8000 for the telephony leg. Defaults to the API's
+                default (MP3).
+            timeout (Union[float, Timeouts, None]): Time budget of the request, either the total
+                seconds or connect, first byte and total timeouts. Defaults to the provider's
+                `timeouts`, and is shortened to the deadline of the context if any.
 
         Returns:
             IO[bytes]: A binary stream containing the generated audio.
 
         Raises:
             HTTPError: If the API request fails.
+            ProviderTimeoutError: If the request runs out of time.
             ValueError: If invalid parameters are provided.
         """
+        stored = self._stored_phrase(text, voice=voice, model=model, stability=stability,
+                                     similarity=similarity, output_format=output_format)
+        if stored is not None:
+            return BytesIO(stored)
+
         url, headers, data = self._create_payload(text=text, voice=voice, model=model, stability=stability,
-                                                  similarity=similarity)
+                                                  similarity=similarity, output_format=output_format)
 
-        response = requests.post(url, headers=headers, json=data, stream=True)
-        if not response.ok:
-            print(response.text)
-            response.raise_for_status()
         audio_stream = BytesIO()
-        # Read the response in chunks and write to BytesIO
-        for chunk in response:
-            if chunk:
-                audio_stream.write(chunk)
+        with self._post(url, units=len(text), timeout=timeout, headers=headers, json=data,
+                        stream=True) as response:
+            if not response.ok:
+                print(response.text)
+                response.raise_for_status()
+            # Read the response in chunks and write to BytesIO
+            for chunk in response:
+                if chunk:
+                    audio_stream.write(chunk)
         audio_stream.seek(0)
         return audio_stream
 
@@ -95,7 +117,9 @@ class ElevenLabsTTSProvider(TTSProvider):
                           voice: ElevenLabTTSVoices | str = ElevenLabTTSVoices.DANIEL,
                           model: ElevenLabsTTSModels | str = ElevenLabsTTSModels.ELEVEN_TURBO_V2_5,
                           stability: float = 0.5,
-                          similarity: float = 0.8) -> IO[bytes]:
+                          similarity: float = 0.8,
+                          output_format: ElevenLabsTTSOutputFormats | str | None = None,
+                          timeout: float | Timeouts | None = None) -> IO[bytes]:
 
         """
         Asynchronously convert text to speech using ElevenLabs.
@@ -106,25 +130,75 @@ class ElevenLabsTTSProvider(TTSProvider):
             model (Union[str, ElevenLabsModels]): The model to use, defaults to eleven_turbo_v2_5.
             stability (float): Voice stability (0.0-1.0), defaults to 0.5
             similarity (float): Voice similarity boost (0.0-1.0), defaults to 0.8
+            output_format (Union[str, ElevenLabsTTSOutputFormats, None]): Encoding and sample
+                rate of the audio, e.g. ULAW_8000 for the telephony leg. Defaults to the API's
+                default (MP3).
+            timeout (Union[float, Timeouts, None]): Time budget of the request, either the total
+                seconds or connect, first byte and total timeouts. Defaults to the provider's
+                `timeouts`, and is shortened to the deadline of the context if any.
 
         Returns:
             IO[bytes]: A binary stream containing the generated audio.
 
         Raises:
             HTTPError: If the API request fails.
+            ProviderTimeoutError: If the request runs out of time.
             ValueError: If invalid parameters are provided.
         """
-        url, headers, data = self._create_payload(text=text, voice=voice, model=model, stability=stability,
-                                                  similarity=similarity)
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=data) as response:
-                response.raise_for_status()
+        audio_stream = BytesIO()
+        async for chunk in self.atranscribe_stream(text, voice=voice, model=model, stability=stability,
+                                                   similarity=similarity, output_format=output_format,
+                                                   timeout=timeout):
+            audio_stream.write(chunk)
+        audio_stream.seek(0)
+        return audio_stream
 
-                audio_stream = BytesIO()
-                # Asynchronously read the response in chunks and write to BytesIO
-                async for chunk in response.content.iter_any():
-                    audio_stream.write(chunk)
+    async def atranscribe_stream(self,
+                                 text: str,
+                                 voice: ElevenLabTTSVoices | str = ElevenLabTTSVoices.DANIEL,
+                                 model: ElevenLabsTTSModels | str = ElevenLabsTTSModels.ELEVEN_TURBO_V2_5,
+                                 stability: float = 0.5,
+                                 similarity: float = 0.8,
+                                 output_format: ElevenLabsTTSOutputFormats | str | None = None,
+                                 timeout: float | Timeouts | None = None) -> AsyncIterator[bytes]:
+        """
+        Asynchronously convert text to speech using ElevenLabs, yielding the audio as it arrives.
+
+        Chunks are yielded as soon as they come off the socket, so playback can start
+        while the synthesis is still running.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice (Union[str, ElevenLabTTSVoices]): The voice to use, defaults to DANIEL.
+            model (Union[str, ElevenLabsModels]): The model to use, defaults to eleven_turbo_v2_5.
+            stability (float): Voice stability (0.0-1.0), defaults to 0.5
+            similarity (float): Voice similarity boost (0.0-1.0), defaults to 0.8
+            output_format (Union[str, ElevenLabsTTSOutputFormats, None]): Encoding and sample
+                rate of the audio, e.g. ULAW_8000 for the telephony leg. Defaults to the API's
+                default (MP3).
+            timeout (Union[float, Timeouts, None]): Time budget of the request, either the total
+                seconds or connect, first byte and total timeouts. Defaults to the provider's
+                `timeouts`, and is shortened to the deadline of the context if any.
+
+        Yields:
+            bytes: Chunks of the generated audio, in order.
 
-                # Reset the BytesIO stream position to the beginning
-                audio_stream.seek(0)
-                return audio_stream
+        Raises:
+            HTTPError: If the API request fails.
+            ProviderTimeoutError: If the request runs out of time.
+            ValueError: If invalid parameters are provided.
+        """
+        stored = self._stored_phrase(text, voice=voice, model=model, stability=stability,
+                                     similarity=similarity, output_format=output_format)
+        if stored is not None:
+            yield stored
+            return
+
+        url, headers, data = self._create_payload(text=text, voice=voice, model=model, stability=stability,
+                                                  similarity=similarity, output_format=output_format)
+        async with self._apost(url, units=len(text), timeout=timeout, headers=headers, json=data) as response:
+            if not response.ok:
+                print(await response.text())
+                response.raise_for_status()
+            async for chunk in response.content.iter_any():
+                yield chunk
@@ -33,3 +33,16 @@ class ElevenLabsTTSModels(Enum):
     ELEVEN_MULTILINGUAL_V1 = "eleven_multilingual_v1"
     ELEVEN_MONOLINGUAL_V1 = "eleven_monolingual_v1"
 
+@dataclass
+class ElevenLabsTTSOutputFormats(Enum):
+    MP3_22050_32 = "mp3_22050_32"
+    MP3_44100_64 = "mp3_44100_64"
+    MP3_44100_128 = "mp3_44100_128"
+    PCM_8000 = "pcm_8000"
+    PCM_16000 = "pcm_16000"
+    PCM_22050 = "pcm_22050"
+    PCM_24000 = "pcm_24000"
+    PCM_44100 = "pcm_44100"
+    ULAW_8000 = "ulaw_8000"
+    ALAW_8000 = "alaw_8000"
+
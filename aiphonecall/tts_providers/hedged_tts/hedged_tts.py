@@ -0,0 +1,328 @@
+import asyncio
+import contextvars
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from enum import Enum
+from io import BytesIO
+from typing import IO, AsyncIterator, Optional, Union
+
+from aiphonecall.interfaces.tts_provider_interface import TTSProvider
+
+
+@dataclass
+class HedgeTarget:
+    """
+    A provider taking part in a HedgedTTSProvider, with the mapping of the request to it.
+
+    Requests are given in one vocabulary of voices and output formats (usually
+    the primary provider's); each target translates them to its own through
+    `voices` and `output_formats`, keyed by (upper case) name. Names without a
+    mapping are passed on as they are.
+
+    Closing the provider closes every target.
+
+    Attributes:
+        provider (TTSProvider): The provider.
+        voices (dict[str, Union[str, Enum]]): Voice of this provider for each requested voice name.
+        voice (Union[str, Enum, None]): Voice used for requested voices without a mapping,
+            None to pass those on as they are.
+        model (Union[str, Enum, None]): Model of this provider, None for its default. The
+            model of a request is only passed to the first (primary) target that has none.
+        output_formats (dict[str, Union[str, Enum]]): Output format of this provider for each
+            requested format name.
+        options (dict): Additional provider-specific parameters, e.g. ElevenLabs stability.
+    """
+    provider: TTSProvider
+    voices: dict[str, Union[str, Enum]] = field(default_factory=dict)
+    voice: Union[str, Enum, None] = None
+    model: Union[str, Enum, None] = None
+    output_formats: dict[str, Union[str, Enum]] = field(default_factory=dict)
+    options: dict = field(default_factory=dict)
+
+    def request(self,
+                voice: Union[str, Enum, None],
+                model: Union[str, Enum, None],
+                output_format: Union[str, Enum, None],
+                primary: bool,
+                **kwargs) -> dict:
+        """
+        Translate the parameters of a request to this target.
+
+        Args:
+            voice (Union[str, Enum, None]): The requested voice.
+            model (Union[str, Enum, None]): The requested model.
+            output_format (Union[str, Enum, None]): The requested output format.
+            primary (bool): Whether this is the first target, which gets the requested model.
+            **kwargs: Additional parameters of the request.
+
+        Returns:
+            dict: The keyword arguments for the provider's transcribe methods.
+        """
+        params = {**kwargs, **self.options}
+        if voice is not None:
+            mapped = _lookup(self.voices, voice)
+            params["voice"] = mapped if mapped is not None else (self.voice if self.voice is not None else voice)
+        elif self.voice is not None:
+            params["voice"] = self.voice
+        if self.model is not None:
+            params["model"] = self.model
+        elif model is not None and primary:
+            params["model"] = model
+        if output_format is not None:
+            mapped = _lookup(self.output_formats, output_format)
+            params["output_format"] = mapped if mapped is not None else output_format
+        return params
+
+
+class HedgedTTSProvider(TTSProvider):
+    """
+    TTSProvider sending a request to a backup provider when the primary is slow.
+
+    The request goes to the first target. If no audio has arrived after
+    `hedge_delay` seconds (or the target failed), it is also sent to the next
+    target, and so on. The first target to deliver audio wins; the requests
+    to the others are cancelled, closing their connections. This cuts the
+    tail latency of a single vendor at the cost of a few duplicate requests,
+    which `hedges` counts.
+
+    The async methods race on the first byte of the stream. `transcribe`
+    races on whole responses and can't abort a losing request, which completes
+    in the background.
+
+    Attributes:
+        targets (list[HedgeTarget]): The providers, in order of preference.
+        hedge_delay (float): Seconds without audio after which the next target is tried.
+        hedges (int): Number of requests sent to backup targets.
+        wins (list[int]): Number of requests each target won, by position.
+    """
+
+    def __init__(self, targets: list[Union[HedgeTarget, TTSProvider]], hedge_delay: float = 0.3):
+        """
+        Initialize the provider.
+
+        Args:
+            targets (list[Union[HedgeTarget, TTSProvider]]): The providers in order of preference,
+                at least one. Plain providers get requests without any mapping.
+            hedge_delay (float): Seconds without audio after which the next target is tried,
+                defaults to 0.3. Set it around the primary's p95 time to first byte.
+
+        Raises:
+            ValueError: If no target is given.
+        """
+        if not targets:
+            raise ValueError("At least one target is required")
+        self.targets = [t if isinstance(t, HedgeTarget) else HedgeTarget(provider=t) for t in targets]
+        primary = self.targets[0].provider
+        super().__init__(primary.api_key, primary.transport, primary.limiter)
+        self.hedge_delay = hedge_delay
+        self.hedges = 0
+        self.wins = [0] * len(self.targets)
+        self._lock = threading.Lock()
+
+    def _create_payload(self, **kwargs) -> tuple[str, dict, dict]:
+        return self.targets[0].provider._create_payload(**kwargs)
+
+    def close(self) -> None:
+        super().close()
+        for target in self.targets:
+            target.provider.close()
+
+    async def aclose(self) -> None:
+        await super().aclose()
+        for target in self.targets:
+            await target.provider.aclose()
+
+    def transcribe(self,
+                   text: str,
+                   voice: Union[str, Enum, None] = None,
+                   model: Union[str, Enum, None] = None,
+                   output_format: Union[str, Enum, None] = None,
+                   **kwargs) -> IO[bytes]:
+        """
+        Synchronously convert text to speech with the first target to respond.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice (Union[str, Enum, None]): The voice, mapped to each target's voices.
+            model (Union[str, Enum, None]): The model of the primary target.
+            output_format (Union[str, Enum, None]): Encoding and sample rate of the audio,
+                mapped to each target's formats.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            IO[bytes]: A binary stream containing the generated audio.
+
+        Raises:
+            HTTPError: If the requests to all targets fail; the error of the last one.
+            ValueError: If invalid parameters are provided.
+        """
+        executor = ThreadPoolExecutor(max_workers=len(self.targets))
+        pending: dict[Future, int] = {}
+        error: Optional[Exception] = None
+        try:
+            for index, target in enumerate(self.targets):
+                params = target.request(voice, model, output_format, index == 0, **kwargs)
+                # Run in a copy of this context, so that a `deadline` applies to the request too
+                context = contextvars.copy_context()
+                pending[executor.submit(context.run, target.provider.transcribe, text, **params)] = index
+                if index:
+                    self._count_hedge()
+                last = index == len(self.targets) - 1
+                # Wait for a winner, or until it's time to hedge with the next target
+                while pending:
+                    done, _ = wait(pending, timeout=None if last else self.hedge_delay,
+                                   return_when=FIRST_COMPLETED)
+                    if not done:
+                        break
+                    for future in done:
+                        finished = pending.pop(future)
+                        if future.exception() is None:
+                            self._count_win(finished)
+                            return future.result()
+                        error = future.exception()
+                    if not last:
+                        # A failure doesn't wait for the delay
+                        break
+        finally:
+            # Losers can't be aborted mid-request; they finish in the background
+            executor.shutdown(wait=False, cancel_futures=True)
+        raise error
+
+    async def atranscribe(self,
+                          text: str,
+                          voice: Union[str, Enum, None] = None,
+                          model: Union[str, Enum, None] = None,
+                          output_format: Union[str, Enum, None] = None,
+                          **kwargs) -> IO[bytes]:
+        """
+        Asynchronously convert text to speech with the first target to respond.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice (Union[str, Enum, None]): The voice, mapped to each target's voices.
+            model (Union[str, Enum, None]): The model of the primary target.
+            output_format (Union[str, Enum, None]): Encoding and sample rate of the audio,
+                mapped to each target's formats.
+            **kwargs: Additional provider-specific parameters.
+
+        Returns:
+            IO[bytes]: A binary stream containing the generated audio.
+
+        Raises:
+            HTTPError: If the requests to all targets fail; the error of the last one.
+            ValueError: If invalid parameters are provided.
+        """
+        audio_stream = BytesIO()
+        async for chunk in self.atranscribe_stream(text, voice=voice, model=model,
+                                                   output_format=output_format, **kwargs):
+            audio_stream.write(chunk)
+        audio_stream.seek(0)
+        return audio_stream
+
+    async def atranscribe_stream(self,
+                                 text: str,
+                                 voice: Union[str, Enum, None] = None,
+                                 model: Union[str, Enum, None] = None,
+                                 output_format: Union[str, Enum, None] = None,
+                                 **kwargs) -> AsyncIterator[bytes]:
+        """
+        Asynchronously convert text to speech, streaming from the first target to respond.
+
+        Once a target has delivered its first chunk the others are cancelled and
+        the rest of the audio is streamed from the winner only; a failure after
+        that point is raised, since the audio can't be continued by another voice.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice (Union[str, Enum, None]): The voice, mapped to each target's voices.
+            model (Union[str, Enum, None]): The model of the primary target.
+            output_format (Union[str, Enum, None]): Encoding and sample rate of the audio,
+                mapped to each target's formats.
+            **kwargs: Additional provider-specific parameters.
+
+        Yields:
+            bytes: Chunks of the generated audio, in order.
+
+        Raises:
+            HTTPError: If the requests to all targets fail; the error of the last one.
+            ValueError: If invalid parameters are provided.
+        """
+        streams: dict[asyncio.Task, tuple[int, AsyncIterator[bytes]]] = {}
+        winner: Optional[AsyncIterator[bytes]] = None
+        first: Optional[bytes] = None
+        error: Optional[BaseException] = None
+        try:
+            for index, target in enumerate(self.targets):
+                params = target.request(voice, model, output_format, index == 0, **kwargs)
+                stream = target.provider.atranscribe_stream(text, **params)
+                streams[asyncio.ensure_future(_first_chunk(stream))] = (index, stream)
+                if index:
+                    self._count_hedge()
+                last = index == len(self.targets) - 1
+                while winner is None and streams:
+                    done, _ = await asyncio.wait(streams, timeout=None if last else self.hedge_delay,
+                                                 return_when=asyncio.FIRST_COMPLETED)
+                    if not done:
+                        break
+                    for task in done:
+                        finished, stream = streams.pop(task)
+                        if task.exception() is None:
+                            if winner is None:
+                                winner, first = stream, task.result()
+                                self._count_win(finished)
+                            else:
+                                # Answered at the same time as the winner
+                                await stream.aclose()
+                        else:
+                            error = task.exception()
+                    if winner is None and not last:
+                        # A failure doesn't wait for the delay
+                        break
+                if winner is not None:
+                    break
+        finally:
+            await _cancel_streams(streams)
+        if winner is None:
+            raise error
+
+        try:
+            if first:
+                yield first
+            async for chunk in winner:
+                yield chunk
+        finally:
+            await winner.aclose()
+
+    def _count_hedge(self) -> None:
+        with self._lock:
+            self.hedges += 1
+
+    def _count_win(self, index: int) -> None:
+        with self._lock:
+            self.wins[index] += 1
+
+
+async def _first_chunk(stream: AsyncIterator[bytes]) -> bytes:
+    # An empty response counts as an answer too
+    async for chunk in stream:
+        if chunk:
+            return chunk
+    return b""
+
+
+async def _cancel_streams(streams: dict[asyncio.Task, tuple[int, AsyncIterator[bytes]]]) -> None:
+    """
+    Cancel the requests still racing and release their connections.
+    """
+    for task in streams:
+        task.cancel()
+    await asyncio.gather(*streams, return_exceptions=True)
+    for _, stream in streams.values():
+        await stream.aclose()
+
+
+def _lookup(mapping: dict, value: Union[str, Enum]):
+    # Keys are names, matched case-insensitively like `validate_str_value` does
+    name = value.name if isinstance(value, Enum) else str(value)
+    return mapping.get(name, mapping.get(name.upper()))
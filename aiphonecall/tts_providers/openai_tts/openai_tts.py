@@ -1,9 +1,10 @@
-import requests
-from typing import IO
+from typing import IO, AsyncIterator, Optional
 from io import BytesIO
-from .openai_tts_schema import OpenAITTSModels, OpenAITTSVoices
+from .openai_tts_schema import OpenAITTSModels, OpenAITTSVoices, OpenAITTSOutputFormats
 from aiphonecall.interfaces.tts_provider_interface import TTSProvider
-import aiohttp
+from aiphonecall.utils.deadline import Timeouts
+from aiphonecall.utils.rate_limit import RateLimiter
+from aiphonecall.utils.transport import HTTPTransport
 from aiphonecall.utils.util import validate_str_value
 
 
@@ -15,15 +16,18 @@ class OpenAITTSProvider(TTSProvider):
     models and voices
     """
 
-    def __init__(self, api_key):
-        super().__init__(api_key)
+    def __init__(self,
+                 api_key: str,
+                 transport: Optional[HTTPTransport] = None,
+                 limiter: Optional[RateLimiter] = None):
+        super().__init__(api_key, transport, limiter)
 
     def _create_payload(self, **kwargs) -> tuple[str, dict, dict]:
         """
         Create the API request payload for OPENAI TTS service.
 
         Args:
-            **kwargs: Must include 'text', 'voice' and  'model'
+            **kwargs: Must include 'text', 'voice' and  'model', and optionally 'output_format'
 
         Returns:
             tuple[str, dict, dict]: URL, headers, and data payload for the API request
@@ -43,12 +47,17 @@ class OpenAITTSProvider(TTSProvider):
             "voice": voice.value,
             "input": text
         }
+        if kwargs.get("output_format") is not None:
+            output_format = validate_str_value(OpenAITTSOutputFormats, kwargs.get("output_format"))
+            data["response_format"] = output_format.value
         return url, headers, data
 
     def transcribe(self,
                    text: str,
                    voice: OpenAITTSVoices | str = OpenAITTSVoices.ALLOY,
                    model: OpenAITTSModels | str = OpenAITTSModels.TTS_1_HD,
+                   output_format: OpenAITTSOutputFormats | str | None = None,
+                   timeout: float | Timeouts | None = None,
                    **kwargs) -> IO[bytes]:
         """
         Synchronously convert text to speech using OPENAI API.
@@ -57,21 +66,34 @@ class OpenAITTSProvider(TTSProvider):
             text (str): The text to convert to speech.
             voice (Union[str, OpenAITTSVoices]): The voice to use, defaults to ALLOY.
             model (Union[str, OpenAITTSModels]): The model to use, defaults to TTS_1_HD.
+            output_format (Union[str, OpenAITTSOutputFormats, None]): Encoding and sample
+                rate of the audio, e.g. PCM for raw 24 kHz audio. Defaults to the API's
+                default (MP3).
+            timeout (Union[float, Timeouts, None]): Time budget of the request, either the total
+                seconds or connect, first byte and total timeouts. Defaults to the provider's
+                `timeouts`, and is shortened to the deadline of the context if any.
 
         Returns:
             IO[bytes]: A binary stream containing the generated audio.
 
         Raises:
             HTTPError: If the API request fails.
+            ProviderTimeoutError: If the request runs out of time.
             ValueError: If invalid parameters are provided.
         """
-        url, headers, data = self._create_payload(text=text, voice=voice, model=model)
+        stored = self._stored_phrase(text, voice=voice, model=model, output_format=output_format)
+        if stored is not None:
+            return BytesIO(stored)
 
-        response = requests.post(url, headers=headers, json=data, stream=True)
-        if not response.ok:
-            print(response.text)
-            response.raise_for_status()
-        audio_stream = BytesIO(response.content)
+        url, headers, data = self._create_payload(text=text, voice=voice, model=model,
+                                                  output_format=output_format)
+
+        with self._post(url, units=len(text), timeout=timeout, headers=headers, json=data,
+                        stream=True) as response:
+            if not response.ok:
+                print(response.text)
+                response.raise_for_status()
+            audio_stream = BytesIO(response.content)
 
         return audio_stream
 
@@ -79,6 +101,8 @@ class OpenAITTSProvider(TTSProvider):
                           text: str,
                           voice: OpenAITTSVoices | str = OpenAITTSVoices.ALLOY,
                           model: OpenAITTSModels | str = OpenAITTSModels.TTS_1_HD,
+                          output_format: OpenAITTSOutputFormats | str | None = None,
+                          timeout: float | Timeouts | None = None,
                           **kwargs) -> IO[bytes]:
         """
         Asynchronously convert text to speech using OPENAI API.
@@ -87,19 +111,70 @@ class OpenAITTSProvider(TTSProvider):
             text (str): The text to convert to speech.
             voice (Union[str, OpenAITTSVoices]): The voice to use, defaults to ALLOY.
             model (Union[str, OpenAITTSModels]): The model to use, defaults to TTS_1_HD.
+            output_format (Union[str, OpenAITTSOutputFormats, None]): Encoding and sample
+                rate of the audio, e.g. PCM for raw 24 kHz audio. Defaults to the API's
+                default (MP3).
+            timeout (Union[float, Timeouts, None]): Time budget of the request, either the total
+                seconds or connect, first byte and total timeouts. Defaults to the provider's
+                `timeouts`, and is shortened to the deadline of the context if any.
 
         Returns:
             IO[bytes]: A binary stream containing the generated audio.
 
         Raises:
             HTTPError: If the API request fails.
+            ProviderTimeoutError: If the request runs out of time.
+            ValueError: If invalid parameters are provided.
+        """
+        audio_stream = BytesIO()
+        async for chunk in self.atranscribe_stream(text, voice=voice, model=model,
+                                                   output_format=output_format, timeout=timeout):
+            audio_stream.write(chunk)
+        audio_stream.seek(0)
+        return audio_stream
+
+    async def atranscribe_stream(self,
+                                 text: str,
+                                 voice: OpenAITTSVoices | str = OpenAITTSVoices.ALLOY,
+                                 model: OpenAITTSModels | str = OpenAITTSModels.TTS_1_HD,
+                                 output_format: OpenAITTSOutputFormats | str | None = None,
+                                 timeout: float | Timeouts | None = None,
+                                 **kwargs) -> AsyncIterator[bytes]:
+        """
+        Asynchronously convert text to speech using OPENAI API, yielding the audio as it arrives.
+
+        Chunks are yielded as soon as they come off the socket, so playback can start
+        while the synthesis is still running.
+
+        Args:
+            text (str): The text to convert to speech.
+            voice (Union[str, OpenAITTSVoices]): The voice to use, defaults to ALLOY.
+            model (Union[str, OpenAITTSModels]): The model to use, defaults to TTS_1_HD.
+            output_format (Union[str, OpenAITTSOutputFormats, None]): Encoding and sample
+                rate of the audio, e.g. PCM for raw 24 kHz audio. Defaults to the API's
+                default (MP3).
+            timeout (Union[float, Timeouts, None]): Time budget of the request, either the total
+                seconds or connect, first byte and total timeouts. Defaults to the provider's
+                `timeouts`, and is shortened to the deadline of the context if any.
+
+        Yields:
+            bytes: Chunks of the generated audio, in order.
+
+        Raises:
+            HTTPError: If the API request fails.
+            ProviderTimeoutError: If the request runs out of time.
             ValueError: If invalid parameters are provided.
         """
-        url, headers, data = self._create_payload(text=text, voice=voice, model=model)
-        async with aiohttp.ClientSession() as session:
-            async with session.post(url, headers=headers, json=data) as response:
-                if not response.ok:
-                    print(response.text)
-                    response.raise_for_status()
-                audio_stream = BytesIO(await response.content.read())
-                return audio_stream
+        stored = self._stored_phrase(text, voice=voice, model=model, output_format=output_format)
+        if stored is not None:
+            yield stored
+            return
+
+        url, headers, data = self._create_payload(text=text, voice=voice, model=model,
+                                                  output_format=output_format)
+        async with self._apost(url, units=len(text), timeout=timeout, headers=headers, json=data) as response:
+            if not response.ok:
+                print(await response.text())
+                response.raise_for_status()
+            async for chunk in response.content.iter_any():
+                yield chunk
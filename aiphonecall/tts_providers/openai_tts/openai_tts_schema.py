@@ -16,3 +16,13 @@ class OpenAITTSModels(Enum):
     TTS_1 = "tts-1"
     TTS_1_HD = "tts-1-hd"
 
+@dataclass
+class OpenAITTSOutputFormats(Enum):
+    # OpenAI has no 8 kHz or G.711 output; PCM is raw 24 kHz 16-bit little-endian mono
+    MP3 = "mp3"
+    OPUS = "opus"
+    AAC = "aac"
+    FLAC = "flac"
+    WAV = "wav"
+    PCM = "pcm"
+
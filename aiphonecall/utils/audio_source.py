@@ -0,0 +1,273 @@
+import asyncio
+import hashlib
+import io
+import os
+from contextlib import contextmanager
+from typing import AsyncIterable, BinaryIO, Iterator, Union
+
+AudioSource = Union[str, os.PathLike, bytes, bytearray, memoryview, BinaryIO, AsyncIterable[bytes]]
+"""
+Audio accepted by the STT providers: a file path, an in-memory buffer, a binary
+file object (e.g. BytesIO) or, for the async methods, an async iterator of bytes.
+"""
+
+
+class MemoryReader(io.RawIOBase):
+    """
+    Read-only, seekable binary stream over a buffer, without copying it.
+
+    Lets HTTP clients that only stream file objects upload a memoryview chunk by
+    chunk instead of materializing it as a new bytes object first.
+    """
+
+    def __init__(self, buffer: Union[bytes, bytearray, memoryview]):
+        super().__init__()
+        self._view = memoryview(buffer).cast("B")
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        size = min(len(b), len(self._view) - self._position)
+        if size <= 0:
+            return 0
+        b[:size] = self._view[self._position:self._position + size]
+        self._position += size
+        return size
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._position + offset
+        elif whence == io.SEEK_END:
+            position = len(self._view) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if position < 0:
+            raise ValueError(f"Negative seek position {position}")
+        self._position = position
+        return position
+
+    def tell(self) -> int:
+        return self._position
+
+
+@contextmanager
+def open_audio(audio: AudioSource, asynchronous: bool = False) -> Iterator[Union[bytes, BinaryIO, AsyncIterable[bytes]]]:
+    """
+    Turn an audio source into a request body that is streamed without extra copies.
+
+    Paths are opened here and closed deterministically when the context exits,
+    even if the request fails or is cancelled. File objects passed in by the
+    caller are used as is and left open. Files and file objects are uploaded
+    chunk by chunk by the HTTP clients, so whole recordings are never loaded
+    into memory.
+
+    Args:
+        audio (AudioSource): The audio to upload.
+        asynchronous (bool): Whether the body is for an aiohttp request. Async
+            iterators are only accepted for those, defaults to False.
+
+    Yields:
+        The body to pass as `data` to the HTTP client.
+
+    Raises:
+        FileNotFoundError: If a path is given that does not exist.
+        TypeError: If the source type is not supported.
+    """
+    if isinstance(audio, (str, os.PathLike)):
+        if not os.path.exists(audio):
+            raise FileNotFoundError(f"File not found at {audio}")
+        with open(audio, "rb") as f:
+            yield f
+    elif isinstance(audio, (bytes, bytearray)):
+        yield audio
+    elif isinstance(audio, memoryview):
+        # requests treats any other iterable as a stream of chunks, so wrap it
+        yield audio if asynchronous else MemoryReader(audio)
+    elif hasattr(audio, "__aiter__"):
+        if not asynchronous:
+            raise TypeError("Async iterators of audio are only supported by the async methods")
+        yield audio
+    elif hasattr(audio, "read"):
+        yield audio
+    else:
+        raise TypeError(f"Unsupported audio source type: {type(audio).__name__}")
+
+
+def read_audio(audio: AudioSource) -> bytes:
+    """
+    Read an audio source completely into memory.
+
+    Args:
+        audio (AudioSource): The audio to read; async iterators are not supported.
+
+    Returns:
+        bytes: The audio.
+
+    Raises:
+        FileNotFoundError: If a path is given that does not exist.
+        TypeError: If the source type is not supported.
+    """
+    with open_audio(audio) as data:
+        return bytes(data) if isinstance(data, (bytes, bytearray)) else data.read()
+
+
+async def aread_audio(audio: AudioSource) -> bytes:
+    """
+    Read an audio source, including an async iterator of bytes, completely into memory.
+
+    Paths and file objects are read on a worker thread, so the disk reads don't
+    block the event loop.
+
+    Args:
+        audio (AudioSource): The audio to read.
+
+    Returns:
+        bytes: The audio.
+
+    Raises:
+        FileNotFoundError: If a path is given that does not exist.
+        TypeError: If the source type is not supported.
+    """
+    if hasattr(audio, "__aiter__"):
+        return b"".join([chunk async for chunk in audio])
+    if isinstance(audio, (bytes, bytearray)):
+        return bytes(audio)
+    return await asyncio.to_thread(read_audio, audio)
+
+
+def peek_audio(audio: AudioSource, size: int) -> tuple[bytes, AudioSource]:
+    """
+    Read the first bytes of an audio source without consuming it.
+
+    Paths are opened just for the peek, and seekable file objects are rewound to
+    where they were, so both can still be streamed from disk. Other file objects
+    are read into memory and returned as bytes to be uploaded instead.
+
+    Args:
+        audio (AudioSource): The audio to peek at; async iterators are not supported.
+        size (int): Number of bytes to read.
+
+    Returns:
+        tuple[bytes, AudioSource]: Up to `size` first bytes of the audio, and the source
+        to upload in place of the given one.
+
+    Raises:
+        FileNotFoundError: If a path is given that does not exist.
+        TypeError: If the source type is not supported.
+    """
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        return bytes(audio[:size]), audio
+    if hasattr(audio, "read") and not (hasattr(audio, "seekable") and audio.seekable()):
+        data = audio.read()
+        return data[:size], data
+    with open_audio(audio) as f:
+        position = f.tell()
+        header = f.read(size)
+        f.seek(position)
+    return header, audio
+
+
+async def apeek_audio(audio: AudioSource, size: int) -> tuple[bytes, AudioSource]:
+    """
+    Read the first bytes of an audio source, including an async iterator of bytes,
+    without consuming it.
+
+    Args:
+        audio (AudioSource): The audio to peek at. Async iterators are replaced by one
+            yielding the chunks read for the peek before the rest, so they are still
+            streamed.
+        size (int): Number of bytes to read.
+
+    Returns:
+        tuple[bytes, AudioSource]: Up to `size` first bytes of the audio, and the source
+        to upload in place of the given one.
+
+    Raises:
+        FileNotFoundError: If a path is given that does not exist.
+        TypeError: If the source type is not supported.
+    """
+    if not hasattr(audio, "__aiter__"):
+        # Opening and reading a file blocks on disk, so keep it off the event loop
+        return await asyncio.to_thread(peek_audio, audio, size)
+    iterator = aiter(audio)
+    chunks = []
+    read = 0
+    async for chunk in iterator:
+        chunks.append(chunk)
+        read += len(chunk)
+        if read >= size:
+            break
+
+    async def rest() -> AsyncIterable[bytes]:
+        for chunk in chunks:
+            yield chunk
+        async for chunk in iterator:
+            yield chunk
+
+    return b"".join(chunks)[:size], rest()
+
+
+def hash_audio(audio: AudioSource, chunk_size: int = 1024 * 1024) -> tuple[str, AudioSource]:
+    """
+    Compute the content hash of an audio source without consuming it.
+
+    Files are hashed chunk by chunk, so recordings are not loaded into memory.
+    Seekable file objects are rewound to where they were; other file objects
+    are read into memory and returned as bytes to be uploaded instead.
+
+    Args:
+        audio (AudioSource): The audio to hash; async iterators are not supported.
+        chunk_size (int): Size of the chunks files are read in, defaults to 1 MiB.
+
+    Returns:
+        tuple[str, AudioSource]: The hex sha256 digest of the audio, and the source to
+        upload in place of the given one.
+
+    Raises:
+        FileNotFoundError: If a path is given that does not exist.
+        TypeError: If the source type is not supported.
+    """
+    digest = hashlib.sha256()
+    if isinstance(audio, (bytes, bytearray, memoryview)):
+        digest.update(audio)
+        return digest.hexdigest(), audio
+    if hasattr(audio, "read") and not (hasattr(audio, "seekable") and audio.seekable()):
+        data = audio.read()
+        digest.update(data)
+        return digest.hexdigest(), data
+    with open_audio(audio) as f:
+        position = f.tell()
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+        f.seek(position)
+    return digest.hexdigest(), audio
+
+
+async def ahash_audio(audio: AudioSource) -> tuple[str, AudioSource]:
+    """
+    Compute the content hash of an audio source, including an async iterator of
+    bytes, without consuming it.
+
+    Args:
+        audio (AudioSource): The audio to hash. Async iterators are read into memory
+            and returned as bytes to be uploaded instead.
+
+    Returns:
+        tuple[str, AudioSource]: The hex sha256 digest of the audio, and the source to
+        upload in place of the given one.
+
+    Raises:
+        FileNotFoundError: If a path is given that does not exist.
+        TypeError: If the source type is not supported.
+    """
+    if hasattr(audio, "__aiter__"):
+        return hash_audio(await aread_audio(audio))
+    # Hashing a file blocks on disk reads, so keep it off the event loop
+    return await asyncio.to_thread(hash_audio, audio)
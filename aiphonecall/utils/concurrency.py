@@ -0,0 +1,87 @@
+import asyncio
+from itertools import islice
+from typing import AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, TypeVar, Union
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def map_bounded(func: Callable[[T], Awaitable[R]],
+                      items: Union[Iterable[T], AsyncIterable[T]],
+                      concurrency: int) -> AsyncIterator[R]:
+    """
+    Run `func` over items with bounded concurrency, yielding results as they complete.
+
+    Items are consumed lazily, so at most `concurrency` calls are in flight and
+    arbitrarily large (or unbounded) iterables never materialize as tasks all
+    at once. Exceptions raised by `func` propagate and cancel the remaining
+    calls; catch them inside `func` to keep going after a failure. Calls still
+    in flight are cancelled if the consumer stops iterating early.
+
+    Args:
+        func (Callable[[T], Awaitable[R]]): The coroutine function to run on every item.
+        items (Union[Iterable[T], AsyncIterable[T]]): The items to process. Pass items
+            that block to produce (e.g. files found on disk) through `iterate_in_thread`.
+        concurrency (int): Maximum number of calls in flight.
+
+    Yields:
+        R: The results, in completion order.
+    """
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+    iterator = aiter(items) if hasattr(items, "__aiter__") else _sync_aiter(items)
+    pending: set[asyncio.Task] = set()
+
+    async def fill() -> None:
+        while len(pending) < concurrency:
+            try:
+                item = await anext(iterator)
+            except StopAsyncIteration:
+                return
+            pending.add(asyncio.ensure_future(func(item)))
+
+    try:
+        await fill()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            pending.difference_update(done)
+            # Refill before yielding so the pipeline stays full while the consumer works
+            await fill()
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        if hasattr(iterator, "aclose"):
+            await iterator.aclose()
+
+
+async def iterate_in_thread(items: Iterable[T], batch_size: int = 256) -> AsyncIterator[T]:
+    """
+    Iterate over a blocking iterable off the event loop.
+
+    Items are pulled in batches of `batch_size` through `asyncio.to_thread`, so
+    e.g. walking a directory of tens of thousands of files doesn't stall the
+    loop between uploads, and a thread is only started once per batch.
+
+    Args:
+        items (Iterable[T]): The items, consumed from one worker thread at a time.
+        batch_size (int): Items pulled per thread call, defaults to 256.
+
+    Yields:
+        T: The items, in order.
+    """
+    iterator = iter(items)
+    while True:
+        batch = await asyncio.to_thread(lambda: list(islice(iterator, batch_size)))
+        if not batch:
+            return
+        for item in batch:
+            yield item
+
+
+async def _sync_aiter(items: Iterable[T]) -> AsyncIterator[T]:
+    for item in items:
+        yield item
@@ -0,0 +1,174 @@
+import time
+from contextlib import contextmanager
+from contextvars import Context, ContextVar, copy_context
+from dataclasses import dataclass
+from typing import Iterator, Optional, Union
+
+_deadline: ContextVar[Optional[float]] = ContextVar("aiphonecall_deadline", default=None)
+
+
+class ProviderTimeoutError(TimeoutError):
+    """
+    Raised when a provider request runs out of time.
+
+    Attributes:
+        phase (str): What ran out: "connect", "first_byte", "total", "deadline" for the
+            deadline of the context, or "rate_limit" when the request could not be sent
+            within its budget because of the provider's rate limits.
+        timeout (Optional[float]): The budget in seconds that was exceeded.
+    """
+
+    def __init__(self, phase: str, timeout: Optional[float] = None):
+        self.phase = phase
+        self.timeout = timeout
+        budget = f" of {timeout:.3g}s" if timeout is not None else ""
+        super().__init__(f"Provider request exceeded its {phase.replace('_', ' ')} timeout{budget}")
+
+
+@dataclass
+class Timeouts:
+    """
+    Time budget of a provider request. None means unlimited.
+
+    Attributes:
+        connect (Optional[float]): Seconds to establish the connection.
+        first_byte (Optional[float]): Seconds to the response headers once connected, and
+            the longest pause between two chunks of the body after that.
+        total (Optional[float]): Seconds for the whole request, including reading the body.
+    """
+    connect: Optional[float] = None
+    first_byte: Optional[float] = None
+    total: Optional[float] = None
+
+    def merge(self, override: Union[float, "Timeouts", None]) -> "Timeouts":
+        """
+        Return these timeouts with those of a single call applied.
+
+        Args:
+            override (Union[float, Timeouts, None]): Timeouts of the call; a number is the
+                total timeout. Fields that are None keep the value of these timeouts.
+
+        Returns:
+            Timeouts: The merged timeouts.
+        """
+        if override is None:
+            return self
+        if not isinstance(override, Timeouts):
+            override = Timeouts(total=override)
+        return Timeouts(connect=override.connect if override.connect is not None else self.connect,
+                        first_byte=override.first_byte if override.first_byte is not None else self.first_byte,
+                        total=override.total if override.total is not None else self.total)
+
+
+class RequestBudget:
+    """
+    Time left for an attempt of a request, under its Timeouts and the current deadline.
+
+    Attributes:
+        connect (Optional[float]): Seconds to establish the connection.
+        first_byte (Optional[float]): Seconds to the response headers, and between chunks.
+        total (Optional[float]): Seconds left for the whole request, None if unlimited.
+    """
+
+    def __init__(self, timeouts: Timeouts, started: float):
+        """
+        Compute the time left.
+
+        Args:
+            timeouts (Timeouts): The timeouts of the request.
+            started (float): `time.monotonic()` when the request (its first attempt) started.
+
+        Raises:
+            ProviderTimeoutError: If the total timeout or the deadline has already passed.
+        """
+        self.timeouts = timeouts
+        self.total: Optional[float] = None
+        left = None if timeouts.total is None else timeouts.total - (time.monotonic() - started)
+        # Whichever of the total timeout and the deadline ends first bounds the request
+        self.limit = "total"
+        until_deadline = remaining()
+        if until_deadline is not None and (left is None or until_deadline < left):
+            left, self.limit = until_deadline, "deadline"
+        if left is not None and left <= 0:
+            raise self.error(self.limit)
+        self.total = left
+        self.connect = _min(timeouts.connect, left)
+        self.first_byte = _min(timeouts.first_byte, left)
+
+    def error(self, phase: str) -> ProviderTimeoutError:
+        """
+        Return the error for a timeout that expired, attributed to the budget that caused it.
+
+        Args:
+            phase (str): The timeout that expired: "connect", "first_byte" or "total".
+
+        Returns:
+            ProviderTimeoutError: The error to raise.
+        """
+        requested = getattr(self.timeouts, phase, None) if phase in ("connect", "first_byte") else None
+        if requested is not None and (self.total is None or requested < self.total):
+            return ProviderTimeoutError(phase, requested)
+        if self.limit == "deadline":
+            return ProviderTimeoutError("deadline")
+        return ProviderTimeoutError("total", self.timeouts.total)
+
+
+@contextmanager
+def deadline(seconds: float) -> Iterator[float]:
+    """
+    Give every provider request made in this context a common deadline.
+
+    The deadline is carried by a context variable, so it follows the code into
+    the coroutines and tasks it starts (and threads started through
+    `asyncio.to_thread`), e.g. across the STT, LLM and TTS requests of a turn.
+    Requests are bounded by the time left, and fail with a ProviderTimeoutError
+    once it is up. Nested deadlines can only shorten the outer one.
+
+    Args:
+        seconds (float): Seconds from now.
+
+    Yields:
+        float: The deadline in `time.monotonic()` seconds.
+    """
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    if current is not None:
+        at = min(at, current)
+    token = _deadline.set(at)
+    try:
+        yield at
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """
+    Return the seconds left until the current deadline.
+
+    Returns:
+        Optional[float]: The seconds left (negative once passed), or None without a deadline.
+    """
+    at = _deadline.get()
+    return None if at is None else at - time.monotonic()
+
+
+def without_deadline() -> Context:
+    """
+    Return a copy of the current context without its deadline.
+
+    Work shared by callers with different deadlines (e.g. a coalesced request)
+    runs in it, so it isn't cut short by the deadline of whichever caller
+    started it; each caller bounds its own wait instead.
+
+    Returns:
+        Context: The context, to run the work in with `Context.run`.
+    """
+    context = copy_context()
+    context.run(_deadline.set, None)
+    return context
+
+
+def _min(value: Optional[float], limit: Optional[float]) -> Optional[float]:
+    if limit is None:
+        return value
+    return limit if value is None else min(value, limit)
@@ -0,0 +1,51 @@
+import glob
+import os
+from typing import Iterable, Iterator, Union
+
+
+def iter_files(sources: Union[str, Iterable[str]], recursive: bool = True) -> Iterator[str]:
+    """
+    Expand paths, glob patterns and directories into the files they refer to.
+
+    Sources are expanded lazily, so directories with tens of thousands of files
+    are walked while the first ones are already being processed. Each file is
+    returned once even if several sources match it.
+
+    Args:
+        sources (Union[str, Iterable[str]]): A file path, glob pattern or directory,
+            or an iterable of them.
+        recursive (bool): Whether directories are walked recursively and '**' in
+            patterns matches nested directories, defaults to True.
+
+    Yields:
+        str: The paths of the files, source by source.
+
+    Raises:
+        FileNotFoundError: If a plain path (not a pattern) does not exist.
+    """
+    if isinstance(sources, (str, os.PathLike)):
+        sources = [sources]
+    seen = set()
+    for source in sources:
+        source = os.fspath(source)
+        if os.path.isdir(source):
+            paths = _walk(source, recursive)
+        elif any(char in source for char in "*?["):
+            paths = (path for path in glob.iglob(source, recursive=recursive) if os.path.isfile(path))
+        elif os.path.isfile(source):
+            paths = [source]
+        else:
+            raise FileNotFoundError(f"File not found at {source}")
+        for path in paths:
+            if path not in seen:
+                seen.add(path)
+                yield path
+
+
+def _walk(directory: str, recursive: bool) -> Iterator[str]:
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            yield os.path.join(root, name)
+        if not recursive:
+            return
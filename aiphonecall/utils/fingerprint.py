@@ -0,0 +1,86 @@
+import hashlib
+import inspect
+import json
+from typing import Callable
+
+
+def bind_arguments(method: Callable, *args, **kwargs) -> dict:
+    """
+    Bind call arguments to a method's signature, filling in its defaults.
+
+    Extra keyword arguments collected by a `**kwargs` parameter are flattened
+    into the result so it can be passed straight to `_create_payload`.
+
+    Args:
+        method (Callable): The (bound) method the arguments are meant for.
+        *args: Positional arguments of the call.
+        **kwargs: Keyword arguments of the call.
+
+    Returns:
+        dict: Parameter names mapped to their values for this call.
+
+    Raises:
+        TypeError: If the arguments don't match the signature.
+    """
+    signature = inspect.signature(method)
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = {}
+    for name, value in bound.arguments.items():
+        if signature.parameters[name].kind is inspect.Parameter.VAR_KEYWORD:
+            arguments.update(value)
+        else:
+            arguments[name] = value
+    return arguments
+
+
+def fingerprint(*parts) -> str:
+    """
+    Return a stable content hash of JSON serializable parts.
+
+    Enums and other non JSON types are serialized with `str()`, and dict keys are
+    sorted, so equal requests always hash to the same value.
+
+    Args:
+        *parts: The values identifying a request.
+
+    Returns:
+        str: A hex sha256 digest.
+    """
+    encoded = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def payload_fingerprint(provider, method: Callable, *args, **kwargs) -> str:
+    """
+    Return the fingerprint of the request a provider method would send.
+
+    The call is bound to the provider's own signature (so its defaults apply) and
+    turned into the URL and body by the provider's `_create_payload`. Headers are
+    left out so the API key never ends up in a key.
+
+    Args:
+        provider: The provider the call is made on.
+        method (Callable): The provider method being called, e.g. `provider.atranscribe`.
+        *args: Positional arguments of the call.
+        **kwargs: Keyword arguments of the call.
+
+    Returns:
+        str: A hex sha256 digest identifying the request.
+    """
+    arguments = bind_arguments(method, *args, **kwargs)
+    url, _, data = provider._create_payload(**arguments)
+    return fingerprint(type(provider).__name__, url, data)
+
+
+def normalize_text(text: str) -> str:
+    """
+    Collapse whitespace runs and strip the ends of a text.
+
+    Args:
+        text (str): The text to normalize.
+
+    Returns:
+        str: The normalized text.
+    """
+    return " ".join(text.split())
@@ -0,0 +1,533 @@
+import asyncio
+import hashlib
+import random
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import AsyncIterator, Iterator, Optional
+
+from aiphonecall.utils.deadline import ProviderTimeoutError
+
+
+class TokenBucket:
+    """
+    Token bucket enforcing a per-minute budget, e.g. requests or characters.
+
+    Callers reserve what they need and are told how long to wait for it, so
+    reservations are served in arrival order and a single request larger than
+    the burst size still goes through (after a proportionally longer wait).
+
+    Attributes:
+        rate_per_minute (float): Tokens added per minute.
+        burst (float): Maximum number of tokens that can accumulate while idle.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: Optional[float] = None):
+        """
+        Initialize the bucket, full.
+
+        Args:
+            rate_per_minute (float): Tokens added per minute.
+            burst (Optional[float]): Maximum number of tokens that can accumulate while
+                idle, defaults to a tenth of the per-minute rate (at least 1), so the
+                budget is spread over the minute instead of being spent in one burst.
+        """
+        if rate_per_minute <= 0:
+            raise ValueError(f"rate_per_minute must be positive, got {rate_per_minute}")
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst if burst is not None else max(1.0, rate_per_minute / 10)
+        self._level = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float) -> float:
+        """
+        Take tokens from the bucket, going into debt if there are not enough.
+
+        Args:
+            tokens (float): The number of tokens needed.
+
+        Returns:
+            float: Seconds to wait before the tokens are actually available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            rate = self.rate_per_minute / 60
+            self._level = min(self.burst, self._level + (now - self._updated) * rate)
+            self._updated = now
+            self._level -= tokens
+            return max(0.0, -self._level / rate)
+
+    def refund(self, tokens: float) -> None:
+        """
+        Give back tokens of a reservation that was not used, e.g. a cancelled call.
+
+        Args:
+            tokens (float): The number of tokens to give back.
+        """
+        with self._lock:
+            self._level = min(self.burst, self._level + tokens)
+
+
+class _Waiter:
+    def __init__(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.loop = loop
+        self.event = None if loop is not None else threading.Event()
+        self.future = loop.create_future() if loop is not None else None
+        self.granted = False
+
+    def wake(self) -> None:
+        self.granted = True
+        if self.event is not None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self._resolve)
+
+    def _resolve(self) -> None:
+        if not self.future.done():
+            self.future.set_result(None)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Concurrency limit that adapts with AIMD (additive increase, multiplicative decrease).
+
+    Every successful request grows the limit by 1 / limit, i.e. by about one per
+    round of requests; a throttled (429) or failed (5xx, connection error)
+    request shrinks it by `backoff`. With `latency_tolerance` set, so does a
+    request whose latency exceeds that multiple of the long-term baseline. This
+    is off by default: the latency is measured to the response headers, which
+    for a non-streamed request only arrive once the whole completion, synthesis
+    or transcription is done, so it grows with the output rather than with the
+    load of the service. Like TCP congestion control, the limit is
+    decreased at most once per round: requests started before the last
+    decrease were sent at the old limit and don't count again.
+
+    Permits are shared by threads and event loops alike: sync callers block
+    on `acquire`, async callers await `aacquire`, and waiters are admitted in
+    arrival order.
+
+    Attributes:
+        limit (float): The current concurrency limit.
+        min_limit (int): The limit never drops below this.
+        max_limit (int): The limit never grows above this.
+        in_flight (int): Number of permits currently held.
+    """
+
+    def __init__(self,
+                 initial_limit: int = 16,
+                 min_limit: int = 1,
+                 max_limit: int = 128,
+                 backoff: float = 0.5,
+                 latency_tolerance: Optional[float] = None):
+        """
+        Initialize the limiter.
+
+        Args:
+            initial_limit (int): The starting limit, defaults to 16.
+            min_limit (int): The limit never drops below this, defaults to 1.
+            max_limit (int): The limit never grows above this, defaults to 128.
+            backoff (float): Factor the limit is multiplied with on congestion,
+                defaults to 0.5.
+            latency_tolerance (Optional[float]): Latency, as a multiple of the baseline,
+                above which a request counts as congestion, e.g. 2.5. Only set it for
+                workloads of streamed requests, whose latency is the time to first byte.
+                Defaults to None (latency is ignored).
+        """
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError(f"Expected 1 <= min_limit <= initial_limit <= max_limit, "
+                             f"got {min_limit}, {initial_limit}, {max_limit}")
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self._baseline: Optional[float] = None
+        self._last_decrease = float("-inf")
+        self._waiters: deque[_Waiter] = deque()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until a permit is available and take it.
+
+        Args:
+            timeout (Optional[float]): Longest wait in seconds, defaults to None (unlimited).
+
+        Returns:
+            bool: Whether the permit was taken, False if the timeout expired first.
+        """
+        with self._lock:
+            if self._admit():
+                return True
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+        if waiter.event.wait(timeout):
+            return True
+        with self._lock:
+            if waiter.granted:
+                return True
+            self._waiters.remove(waiter)
+            return False
+
+    async def aacquire(self) -> None:
+        """
+        Wait until a permit is available and take it.
+        """
+        with self._lock:
+            if self._admit():
+                return
+            waiter = _Waiter(asyncio.get_running_loop())
+            self._waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    raise
+            # Granted while being cancelled; pass the permit on
+            self.release()
+            raise
+
+    def release(self, congested: Optional[bool] = None, started: Optional[float] = None) -> None:
+        """
+        Return a permit and adapt the limit to the outcome of its request.
+
+        Args:
+            congested (Optional[bool]): True if the request was throttled or failed, False
+                if it succeeded, None if it says nothing about the service (e.g. cancelled).
+            started (Optional[float]): `time.monotonic()` when the request was sent, so
+                congestion of requests sent before the last decrease is not counted twice.
+        """
+        with self._lock:
+            self.in_flight -= 1
+            if congested:
+                if started is None or started > self._last_decrease:
+                    self.limit = max(self.min_limit, self.limit * self.backoff)
+                    self._last_decrease = time.monotonic()
+            elif congested is False:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            while self._waiters and self.in_flight < int(self.limit):
+                self.in_flight += 1
+                self._waiters.popleft().wake()
+
+    def is_slow(self, latency: float) -> bool:
+        """
+        Tell whether a latency indicates congestion, and learn the baseline from it.
+
+        Args:
+            latency (float): Seconds to the response headers of a successful request.
+
+        Returns:
+            bool: Whether the latency exceeds `latency_tolerance` times the baseline, always
+            False if `latency_tolerance` is None.
+        """
+        if self.latency_tolerance is None:
+            return False
+        with self._lock:
+            if self._baseline is None:
+                self._baseline = latency
+                return False
+            slow = latency > self.latency_tolerance * self._baseline
+            # Slow moving average, so that a sustained change becomes the new normal
+            self._baseline += 0.05 * (latency - self._baseline)
+            return slow
+
+    def _admit(self) -> bool:
+        if not self._waiters and self.in_flight < int(self.limit):
+            self.in_flight += 1
+            return True
+        return False
+
+
+class RequestOutcome:
+    """
+    Outcome of a request made under a RateLimiter slot.
+
+    Attributes:
+        status (Optional[int]): HTTP status of the response, None if none was recorded.
+        latency (Optional[float]): Seconds to the response headers.
+    """
+
+    def __init__(self):
+        self.status: Optional[int] = None
+        self.latency: Optional[float] = None
+
+    def record(self, status: int, latency: float) -> None:
+        """
+        Record the response of the request.
+
+        Args:
+            status (int): HTTP status of the response.
+            latency (float): Seconds to the response headers.
+        """
+        self.status = status
+        self.latency = latency
+
+
+class RateLimiter:
+    """
+    Client-side rate limits and adaptive concurrency for one provider and API key.
+
+    Combines token buckets for requests per minute and units per minute (the
+    characters of TTS text, the estimated tokens of LLM prompts) with an
+    AdaptiveConcurrencyLimiter, and decides how 429 responses are retried:
+    after their Retry-After (or an exponential backoff), during which the other
+    requests of the limiter are held back as well.
+
+    Providers get the limiter registered for their class and API key from
+    `RateLimiter.shared`, so all instances using the same key share one budget
+    across their sync and async methods. The default limiter sets no limits;
+    register limits (e.g. `adaptive=True`) with `configure` before creating
+    providers, or pass a limiter to the provider.
+
+    Attributes:
+        requests (Optional[TokenBucket]): Bucket of requests per minute, if limited.
+        units (Optional[TokenBucket]): Bucket of characters/tokens per minute, if limited.
+        concurrency (Optional[AdaptiveConcurrencyLimiter]): Adaptive concurrency limit, if any.
+        max_retries (int): Times a throttled request is retried.
+        max_retry_after (float): Longest wait in seconds honored for a retry.
+        throttled (int): Number of 429 responses received.
+    """
+
+    _registry: dict[tuple[str, str], "RateLimiter"] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self,
+                 requests_per_minute: Optional[float] = None,
+                 units_per_minute: Optional[float] = None,
+                 concurrency: Optional[AdaptiveConcurrencyLimiter] = None,
+                 adaptive: bool = False,
+                 max_retries: int = 3,
+                 max_retry_after: float = 60.0):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_minute (Optional[float]): Requests per minute, defaults to None
+                (unlimited).
+            units_per_minute (Optional[float]): Characters (TTS) or tokens (LLM) per minute,
+                defaults to None (unlimited).
+            concurrency (Optional[AdaptiveConcurrencyLimiter]): The concurrency limiter,
+                defaults to None. Giving one turns the concurrency limit on.
+            adaptive (bool): Whether to limit concurrency with a new AdaptiveConcurrencyLimiter
+                with its default settings when none is given, defaults to False (unlimited).
+            max_retries (int): Times a throttled request is retried, defaults to 3.
+            max_retry_after (float): Longest wait in seconds honored for a retry, defaults
+                to 60. Longer Retry-After values make the response fail right away.
+        """
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.units = TokenBucket(units_per_minute) if units_per_minute else None
+        if concurrency is None and adaptive:
+            concurrency = AdaptiveConcurrencyLimiter()
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.max_retry_after = max_retry_after
+        self.throttled = 0
+        self._paused_until = 0.0
+
+    @classmethod
+    def shared(cls, provider: str, api_key: str) -> "RateLimiter":
+        """
+        Return the limiter registered for a provider and API key, creating a default one.
+
+        Args:
+            provider (str): Name of the provider, e.g. its class name.
+            api_key (str): The API key; only its hash is kept as registry key.
+
+        Returns:
+            RateLimiter: The shared limiter.
+        """
+        key = (provider, hashlib.sha256((api_key or "").encode()).hexdigest())
+        with cls._registry_lock:
+            if key not in cls._registry:
+                cls._registry[key] = cls()
+            return cls._registry[key]
+
+    @classmethod
+    def configure(cls, provider: str, api_key: str, **kwargs) -> "RateLimiter":
+        """
+        Register a limiter with the given settings for a provider and API key.
+
+        Providers created afterwards with that key use it; existing ones keep theirs.
+
+        Args:
+            provider (str): Name of the provider, e.g. "ElevenLabsTTSProvider".
+            api_key (str): The API key.
+            **kwargs: Arguments of `RateLimiter`.
+
+        Returns:
+            RateLimiter: The registered limiter.
+        """
+        key = (provider, hashlib.sha256((api_key or "").encode()).hexdigest())
+        with cls._registry_lock:
+            cls._registry[key] = cls(**kwargs)
+            return cls._registry[key]
+
+    @contextmanager
+    def slot(self, units: float = 0, max_wait: Optional[float] = None) -> Iterator[RequestOutcome]:
+        """
+        Block until a request fits the limits, and hold a concurrency permit for it.
+
+        Args:
+            units (float): Characters or tokens of the request, defaults to 0.
+            max_wait (Optional[float]): Longest wait in seconds, defaults to None (unlimited).
+
+        Yields:
+            RequestOutcome: Record the response on it to adapt the concurrency limit.
+
+        Raises:
+            ProviderTimeoutError: If the request can't be sent within `max_wait`.
+        """
+        start = time.monotonic()
+        delay = self._reserve(units)
+        if max_wait is not None and delay > max_wait:
+            self._refund(units)
+            raise ProviderTimeoutError("rate_limit", max_wait)
+        time.sleep(delay)
+        if self.concurrency is not None:
+            left = None if max_wait is None else max_wait - (time.monotonic() - start)
+            if not self.concurrency.acquire(left):
+                self._refund(units)
+                raise ProviderTimeoutError("rate_limit", max_wait)
+        outcome = RequestOutcome()
+        started = time.monotonic()
+        failed = False
+        try:
+            # A 429 received while waiting for the permit pauses this request too
+            time.sleep(max(0.0, self._paused_until - started))
+            started = time.monotonic()
+            yield outcome
+        except GeneratorExit:
+            # Cut short by the caller, so the latency says nothing about the service
+            outcome.status = None
+            raise
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._release(outcome, failed, started)
+
+    @asynccontextmanager
+    async def aslot(self, units: float = 0, max_wait: Optional[float] = None) -> AsyncIterator[RequestOutcome]:
+        """
+        Wait until a request fits the limits, and hold a concurrency permit for it.
+
+        Args:
+            units (float): Characters or tokens of the request, defaults to 0.
+            max_wait (Optional[float]): Longest wait in seconds, defaults to None (unlimited).
+
+        Yields:
+            RequestOutcome: Record the response on it to adapt the concurrency limit.
+
+        Raises:
+            ProviderTimeoutError: If the request can't be sent within `max_wait`.
+        """
+        start = time.monotonic()
+        delay = self._reserve(units)
+        if max_wait is not None and delay > max_wait:
+            self._refund(units)
+            raise ProviderTimeoutError("rate_limit", max_wait)
+        try:
+            await asyncio.sleep(delay)
+            if self.concurrency is not None:
+                left = None if max_wait is None else max_wait - (time.monotonic() - start)
+                await asyncio.wait_for(self.concurrency.aacquire(), left)
+        except asyncio.CancelledError:
+            self._refund(units)
+            raise
+        except asyncio.TimeoutError:
+            self._refund(units)
+            raise ProviderTimeoutError("rate_limit", max_wait)
+        outcome = RequestOutcome()
+        started = time.monotonic()
+        failed = False
+        try:
+            # A 429 received while waiting for the permit pauses this request too
+            await asyncio.sleep(max(0.0, self._paused_until - started))
+            started = time.monotonic()
+            yield outcome
+        except (asyncio.CancelledError, GeneratorExit):
+            # Cut short by the caller, so the latency says nothing about the service
+            outcome.status = None
+            raise
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._release(outcome, failed, started)
+
+    def retry_delay(self, status: int, retry_after: Optional[str], attempt: int) -> Optional[float]:
+        """
+        Decide whether and when a response is retried.
+
+        A 429 response pauses the whole limiter for the returned delay, so the
+        other requests don't run into the same limit in the meantime.
+
+        Args:
+            status (int): HTTP status of the response.
+            retry_after (Optional[str]): Its Retry-After header, if any.
+            attempt (int): Number of retries made so far.
+
+        Returns:
+            Optional[float]: Seconds to wait before retrying, or None if the response
+            is final.
+        """
+        if status != 429:
+            return None
+        self.throttled += 1
+        if attempt >= self.max_retries:
+            return None
+        delay = _parse_retry_after(retry_after)
+        if delay is None:
+            # Exponential backoff with jitter, so that throttled callers don't retry in sync
+            delay = min(self.max_retry_after, 2 ** attempt) * random.uniform(0.5, 1.0)
+        if delay > self.max_retry_after:
+            return None
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        return delay
+
+    def _reserve(self, units: float) -> float:
+        delay = max(0.0, self._paused_until - time.monotonic())
+        if self.requests is not None:
+            delay = max(delay, self.requests.reserve(1))
+        if self.units is not None and units:
+            delay = max(delay, self.units.reserve(units))
+        return delay
+
+    def _refund(self, units: float) -> None:
+        if self.requests is not None:
+            self.requests.refund(1)
+        if self.units is not None and units:
+            self.units.refund(units)
+
+    def _release(self, outcome: RequestOutcome, failed: bool, started: float) -> None:
+        if self.concurrency is None:
+            return
+        if outcome.status is None:
+            congested = True if failed else None
+        elif outcome.status == 429 or outcome.status >= 500:
+            congested = True
+        elif outcome.status >= 400:
+            # Client errors say nothing about the load of the service
+            congested = None
+        else:
+            congested = self.concurrency.is_slow(outcome.latency)
+        self.concurrency.release(congested, started)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
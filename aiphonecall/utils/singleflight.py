@@ -0,0 +1,141 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable, Hashable, Optional, TypeVar
+
+from aiphonecall.utils.deadline import ProviderTimeoutError, remaining, without_deadline
+
+T = TypeVar("T")
+
+
+class _AsyncCall:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class _SyncCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical calls into one.
+
+    The first caller of a key starts the call; every caller that arrives with
+    the same key while it is in flight waits for it instead of starting its
+    own, and all of them receive its result or exception. Once the call is done
+    the key is released, so later callers start a new one (put a cache behind
+    the call to serve those).
+
+    The async call runs in its own task. A waiter that is cancelled (e.g. the
+    caller hung up) stops waiting without affecting the others; only when every
+    waiter is gone is the shared call cancelled as well. Results are shared as
+    is, so calls should return immutable values such as bytes or str.
+
+    The shared async call runs without the deadline of the caller that
+    started it (see `deadline`), so a waiter with a longer budget isn't failed
+    by the leader's. Every caller waits at most until its own deadline and
+    then gets a ProviderTimeoutError, leaving the call to the others. Sync
+    calls run in the leader's thread, so their waiters share its deadline.
+
+    The cache wrappers coalesce their misses with it; `CoalescedTTSProvider`
+    and `CoalescedLLMProvider` coalesce requests without caching them.
+
+    Attributes:
+        shared (int): Number of calls that joined one already in flight.
+    """
+
+    def __init__(self):
+        self.shared = 0
+        self._calls: dict[tuple, _AsyncCall] = {}
+        self._sync_calls: dict[Hashable, _SyncCall] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._calls) + len(self._sync_calls)
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `func` for the key, or wait for the run already in flight.
+
+        Args:
+            key (Hashable): Identifies the call; equal keys must mean identical calls.
+            func (Callable[[], Awaitable[T]]): Coroutine function making the call.
+
+        Returns:
+            T: The result of the shared call.
+
+        Raises:
+            ProviderTimeoutError: If the deadline of the caller passes first.
+            Exception: Whatever the shared call raised.
+        """
+        # Tasks belong to one event loop, so keys are too
+        flight = (asyncio.get_running_loop(), key)
+        call = self._calls.get(flight)
+        if call is None:
+            call = _AsyncCall(without_deadline().run(asyncio.ensure_future, func()))
+            self._calls[flight] = call
+            call.task.add_done_callback(lambda _: self._release(flight, call))
+        else:
+            self.shared += 1
+        call.waiters += 1
+        try:
+            # The shield keeps a cancelled (or timed out) waiter from cancelling the call of the others
+            try:
+                return await asyncio.wait_for(asyncio.shield(call.task), remaining())
+            except asyncio.TimeoutError:
+                if call.task.done():
+                    # A timeout of the call itself
+                    raise
+                raise ProviderTimeoutError("deadline") from None
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                call.task.cancel()
+                self._release(flight, call)
+
+    def do_sync(self, key: Hashable, func: Callable[[], T]) -> T:
+        """
+        Run `func` for the key, or block until the run already in flight in another
+        thread is done.
+
+        Args:
+            key (Hashable): Identifies the call; equal keys must mean identical calls.
+            func (Callable[[], T]): Function making the call.
+
+        Returns:
+            T: The result of the shared call.
+
+        Raises:
+            Exception: Whatever the shared call raised.
+        """
+        with self._lock:
+            call = self._sync_calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._sync_calls[key] = _SyncCall()
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._sync_calls[key]
+            call.done.set()
+
+    def _release(self, flight: tuple, call: _AsyncCall) -> None:
+        # A new call may already be registered under the key after a cancellation
+        if self._calls.get(flight) is call:
+            del self._calls[flight]
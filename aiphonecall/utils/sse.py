@@ -0,0 +1,51 @@
+from typing import Optional
+
+
+class SSEDecoder:
+    """
+    Incremental decoder for Server-Sent Events streams.
+
+    Lines are fed one at a time as they come off the socket and the data of an
+    event is returned as soon as its terminating blank line is seen, so nothing
+    is re-buffered beyond the event being decoded.
+    """
+
+    def __init__(self):
+        self._data: list[str] = []
+
+    def feed_line(self, line: bytes | str) -> Optional[str]:
+        """
+        Feed a single line of the stream to the decoder.
+
+        Args:
+            line (bytes | str): A line of the stream, with or without its line terminator.
+
+        Returns:
+            Optional[str]: The data of the event completed by this line, or None if the
+            event is not complete yet.
+        """
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        line = line.rstrip("\r\n")
+        if not line:
+            return self.flush()
+        if line.startswith(":"):
+            # Comment / keep-alive line
+            return None
+        field, _, value = line.partition(":")
+        if field == "data":
+            self._data.append(value[1:] if value.startswith(" ") else value)
+        return None
+
+    def flush(self) -> Optional[str]:
+        """
+        Return the data of the pending event, if any, and reset the decoder.
+
+        Returns:
+            Optional[str]: The data of the pending event, or None if there is none.
+        """
+        if not self._data:
+            return None
+        data = "\n".join(self._data)
+        self._data = []
+        return data
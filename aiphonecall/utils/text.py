@@ -0,0 +1,114 @@
+import re
+
+# Abbreviations whose trailing period does not end a sentence
+_ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "st", "sr", "jr", "prof", "vs", "etc", "e.g", "i.e", "approx"}
+
+_SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s")
+_CLAUSE_END = re.compile(r"[,;:—]\s")
+
+
+class SentenceSegmenter:
+    """
+    Incrementally cuts streamed text at sentence and clause boundaries.
+
+    Text deltas (e.g. from `LLMProvider.achat_stream`) are fed as they arrive and
+    complete segments are returned as soon as their boundary is seen. Segments are
+    cut at sentence ends, and a segment growing past `max_chars` without one is cut
+    at the last clause boundary (or word boundary) instead so no segment waits for
+    an overly long sentence.
+
+    Attributes:
+        min_chars (int): Segments shorter than this are merged with the following text.
+        max_chars (int): Length after which a segment is cut at a clause boundary.
+    """
+
+    def __init__(self, min_chars: int = 1, max_chars: int = 250):
+        """
+        Initialize the segmenter.
+
+        Args:
+            min_chars (int): Segments shorter than this are merged with the following text,
+                defaults to 1.
+            max_chars (int): Length after which a segment is cut at a clause boundary,
+                defaults to 250.
+        """
+        if max_chars < 1 or min_chars > max_chars:
+            raise ValueError(f"Invalid segment bounds: min_chars={min_chars}, max_chars={max_chars}")
+        self.min_chars = min_chars
+        self.max_chars = max_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        """
+        Feed a text delta and return the segments it completes.
+
+        Args:
+            text (str): The next piece of the text.
+
+        Returns:
+            list[str]: The completed segments, in order. Possibly empty.
+        """
+        self._buffer += text
+        segments = []
+        while True:
+            cut = self._find_cut()
+            if cut is None:
+                break
+            segment, self._buffer = self._buffer[:cut].strip(), self._buffer[cut:].lstrip()
+            if segment:
+                segments.append(segment)
+        return segments
+
+    def flush(self) -> list[str]:
+        """
+        Return the remaining buffered text as the final segment(s) and reset the segmenter.
+
+        Returns:
+            list[str]: The remaining segments, in order. Possibly empty.
+        """
+        segments = self.feed(" ")
+        rest, self._buffer = self._buffer.strip(), ""
+        if rest:
+            segments.append(rest)
+        return segments
+
+    def _find_cut(self) -> int | None:
+        buffer = self._buffer
+        for match in _SENTENCE_END.finditer(buffer):
+            end = match.end()
+            if end < self.min_chars:
+                continue
+            if end > self.max_chars:
+                break
+            words = buffer[:match.start()].split()
+            word = words[-1].lower() if words else ""
+            if word in _ABBREVIATIONS or (len(word) == 1 and word.isalpha()):
+                continue
+            return end
+        if len(buffer) <= self.max_chars:
+            return None
+        window = buffer[:self.max_chars]
+        clauses = [m.end() for m in _CLAUSE_END.finditer(window) if m.end() >= self.min_chars]
+        if clauses:
+            return clauses[-1]
+        space = window.rfind(" ")
+        return space + 1 if space >= self.min_chars else self.max_chars
+
+
+def split_sentences(text: str, min_chars: int = 1, max_chars: int = 250) -> list[str]:
+    """
+    Split a complete text into sentence segments.
+
+    Args:
+        text (str): The text to split.
+        min_chars (int): Segments shorter than this are merged with the following text,
+            defaults to 1.
+        max_chars (int): Length after which a segment is cut at a clause boundary,
+            defaults to 250.
+
+    Returns:
+        list[str]: The segments, in order.
+    """
+    segmenter = SentenceSegmenter(min_chars=min_chars, max_chars=max_chars)
+    return segmenter.feed(text) + segmenter.flush()
+
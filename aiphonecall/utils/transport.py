@@ -0,0 +1,225 @@
+import asyncio
+import threading
+from typing import Optional, Union
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class HTTPTransport:
+    """
+    Long-lived, pooled HTTP transport shared by the providers.
+
+    Holds a single aiohttp ClientSession backed by a TCPConnector with
+    per-host limits, keep-alive and DNS caching for the async paths, and a
+    requests.Session with a sized connection pool and connection retries for
+    the sync paths, so consecutive requests reuse warm connections instead of
+    paying DNS, TCP and TLS handshakes every time.
+    Providers that talk to the same host (e.g. OpenAI LLM and OpenAI TTS) share
+    connections when they share a transport; by default every provider uses
+    the process wide transport returned by `HTTPTransport.shared()`.
+    Providers register as users of their transport and only close it once
+    the last of them is closed, so closing one provider doesn't cut the
+    connections of the others.
+
+    Both sessions are created lazily on first use. The aiohttp session is bound
+    to the running event loop; if it is used from a different loop (e.g.
+    consecutive `asyncio.run` calls) a fresh session is created and the stale
+    one is closed. Closing the transport is idempotent and the next request simply opens a new session.
+
+    Attributes:
+        limit (int): Maximum number of simultaneous connections.
+        limit_per_host (int): Maximum number of simultaneous connections per host.
+        keepalive_timeout (float): Seconds an idle connection is kept open.
+        ttl_dns_cache (int): Seconds DNS lookups are cached for.
+        pool_maxsize (int): Connections kept per host by the sync session.
+        max_retries (int): Retries of the sync session on connection errors.
+        timeout (Union[float, tuple[float, float], None]): Default timeout of sync requests,
+            either total seconds or a (connect, read) tuple.
+    """
+
+    _shared: Optional["HTTPTransport"] = None
+
+    def __init__(self,
+                 limit: int = 100,
+                 limit_per_host: int = 20,
+                 keepalive_timeout: float = 30.0,
+                 ttl_dns_cache: int = 300,
+                 pool_maxsize: int = 20,
+                 max_retries: int = 2,
+                 timeout: Union[float, tuple[float, float], None] = None):
+        """
+        Initialize the transport. No connection is opened until the first request.
+
+        Args:
+            limit (int): Maximum number of simultaneous connections, defaults to 100.
+            limit_per_host (int): Maximum number of simultaneous connections per host,
+                defaults to 20.
+            keepalive_timeout (float): Seconds an idle connection is kept open, defaults to 30.
+            ttl_dns_cache (int): Seconds DNS lookups are cached for, defaults to 300.
+            pool_maxsize (int): Connections kept per host by the sync session, defaults to 20.
+                Size it to the number of worker threads sharing the transport.
+            max_retries (int): Retries of the sync session on connection errors, before the
+                request reached the service, defaults to 2.
+            timeout (Union[float, tuple[float, float], None]): Default timeout of sync
+                requests, either total seconds or a (connect, read) tuple, defaults to None.
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._sync_session: Optional[requests.Session] = None
+        self._sync_lock = threading.Lock()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._users = 0
+
+    @classmethod
+    def shared(cls) -> "HTTPTransport":
+        """
+        Return the process wide transport used by providers created without one.
+
+        Returns:
+            HTTPTransport: The shared transport instance.
+        """
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def acquire(self) -> None:
+        """
+        Register a user of the transport, e.g. a provider sending its requests through it.
+        """
+        with self._sync_lock:
+            self._users += 1
+
+    def release(self) -> bool:
+        """
+        Unregister a user of the transport.
+
+        Returns:
+            bool: Whether it was the last user, in which case it should close the transport.
+        """
+        with self._sync_lock:
+            self._users = max(0, self._users - 1)
+            return self._users == 0
+
+    async def asession(self) -> aiohttp.ClientSession:
+        """
+        Return the pooled aiohttp session, creating it on the running loop if needed.
+
+        Returns:
+            aiohttp.ClientSession: A session bound to the current event loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            stale, stale_loop = self._session, self._loop
+            connector = aiohttp.TCPConnector(limit=self.limit,
+                                             limit_per_host=self.limit_per_host,
+                                             keepalive_timeout=self.keepalive_timeout,
+                                             ttl_dns_cache=self.ttl_dns_cache)
+            # Swapped in before closing the stale session, so concurrent callers share the new one
+            session = self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+            await _close_session(stale, stale_loop)
+            return session
+        return self._session
+
+    def session(self) -> requests.Session:
+        """
+        Return the pooled requests session used by the sync paths, creating it if needed.
+
+        Returns:
+            requests.Session: A session with a sized keep-alive pool and retries.
+        """
+        with self._sync_lock:
+            if self._sync_session is None:
+                retry = Retry(total=self.max_retries,
+                              # A read timeout means the request was received; sending it
+                              # again would only multiply the time budget of the call
+                              read=0,
+                              # Nor are responses: a 502/504 from a gateway may come after
+                              # the synthesis or completion already ran (and was billed).
+                              # As on the async path, statuses are left to the providers'
+                              # RateLimiter, which retries 429s and records the rest
+                              status=0,
+                              backoff_factor=0.2,
+                              status_forcelist=(),
+                              allowed_methods=None,
+                              raise_on_status=False,
+                              respect_retry_after_header=False)
+                adapter = HTTPAdapter(pool_connections=self.limit,
+                                      pool_maxsize=self.pool_maxsize,
+                                      max_retries=retry)
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                self._sync_session = session
+            return self._sync_session
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        """
+        Send a POST request through the pooled sync session.
+
+        Args:
+            url (str): The URL to post to.
+            **kwargs: Arguments passed to requests.Session.post. The transport timeout is
+                used unless 'timeout' is given.
+
+        Returns:
+            requests.Response: The response of the request.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session().post(url, **kwargs)
+
+    def close(self) -> None:
+        """
+        Close the pooled requests session and all of its connections.
+        """
+        with self._sync_lock:
+            session, self._sync_session = self._sync_session, None
+        if session is not None:
+            session.close()
+
+    async def aclose(self) -> None:
+        """
+        Close both pooled sessions and all of their connections.
+        """
+        self.close()
+        session, self._session = self._session, None
+        loop, self._loop = self._loop, None
+        await _close_session(session, loop)
+
+    def __enter__(self) -> "HTTPTransport":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "HTTPTransport":
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb) -> None:
+        await self.aclose()
+
+
+async def _close_session(session: Optional[aiohttp.ClientSession], loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """
+    Close a pooled aiohttp session, possibly bound to another event loop than the running one.
+
+    A session whose loop is running in another thread is closed on that loop.
+    Otherwise it is closed from here: the connector closes the connections on
+    its loop if that loop is still open, and just drops them if it is closed
+    (e.g. after `asyncio.run` returned), so the session doesn't leak.
+    """
+    if session is None or session.closed:
+        return
+    if loop is not None and loop is not asyncio.get_running_loop() and loop.is_running():
+        asyncio.run_coroutine_threadsafe(session.close(), loop)
+        return
+    await session.close()
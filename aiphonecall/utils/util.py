@@ -12,14 +12,16 @@ def validate_str_value(model: Type[Enum], value: Enum | str) -> Enum:
     :return:
     """
     if isinstance(value, str):
-        try:
-            # Attempt to convert string to enum
-            value = model[value.upper()]  # Convert string to enum
-        except KeyError:
+        # Match the member name case-insensitively, with "-" standing for "_"
+        # (e.g. "amr-nb" or "gpt-4o-mini"), or else the member value itself
+        name = value.upper().replace("-", "_")
+        member = next((m for n, m in model.__members__.items() if n.upper() == name or m.value == value), None)
+        if member is None:
             # Get all valid voice names from the enum
             valid_values = ', '.join([v.name.replace("-","_") for v in model])
             raise ValueError(
                 f"Invalid voice name: '{value}'.  Expected type: {model.__name__} or str with value in {valid_values}")
+        value = member
     elif not isinstance(value, model):
         valid_values = ', '.join([v.name.replace("-","_") for v in model])
         raise ValueError(
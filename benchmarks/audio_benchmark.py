@@ -0,0 +1,59 @@
+"""
+Throughput of the audio conversion module, in multiples of real time.
+
+A phone call needs at least 1x per concurrent call; the numbers show how many
+calls one core can convert. Run with:
+
+    python -m benchmarks.audio_benchmark
+"""
+import time
+
+import numpy as np
+
+from aiphonecall.audio import TelephonyConverter, pcm16_to_alaw, pcm16_to_ulaw, resample, ulaw_to_pcm16
+
+SECONDS = 60
+CHUNK_BYTES = 4096
+
+
+def _speech_like(sample_rate: int) -> np.ndarray:
+    rng = np.random.default_rng(0)
+    t = np.arange(SECONDS * sample_rate) / sample_rate
+    tone = 6000 * np.sin(2 * np.pi * 180 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))
+    return np.clip(tone + rng.normal(0, 800, len(t)), -32768, 32767).astype(np.int16)
+
+
+def _measure(name: str, func, repeat: int = 3) -> None:
+    best = min(_timed(func) for _ in range(repeat))
+    print(f"{name:<42} {SECONDS / best:>10.0f}x real time")
+
+
+def _timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def _stream(data: bytes, from_rate: int, encoding: str) -> None:
+    converter = TelephonyConverter(from_rate, encoding=encoding)
+    for start in range(0, len(data), CHUNK_BYTES):
+        converter.process(data[start:start + CHUNK_BYTES])
+    converter.flush()
+
+
+def main() -> None:
+    pcm_8k = _speech_like(8000)
+    ulaw = pcm16_to_ulaw(pcm_8k)
+    print(f"{SECONDS} s of audio, best of 3")
+    _measure("mu-law encode (8 kHz)", lambda: pcm16_to_ulaw(pcm_8k))
+    _measure("mu-law decode (8 kHz)", lambda: ulaw_to_pcm16(ulaw))
+    _measure("A-law encode (8 kHz)", lambda: pcm16_to_alaw(pcm_8k))
+    for from_rate in (16000, 22050, 24000, 44100):
+        pcm = _speech_like(from_rate)
+        data = pcm.tobytes()
+        _measure(f"resample {from_rate} -> 8000 Hz", lambda: resample(pcm, from_rate, 8000))
+        _measure(f"stream {from_rate} Hz PCM -> 8 kHz mu-law", lambda: _stream(data, from_rate, "ulaw"))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,10 @@ from aiphonecall.stt_providers import DeepgramSTTModels
 from aiphonecall.llm_providers import OpenAILLMProvider
 from aiphonecall.llm_providers import OpenAILLMModels
 
+from aiphonecall.pipelines import CallSession, SentencePipeline
+from aiphonecall.audio import FakeAudioSource
+from aiphonecall.conversation import Conversation
+
 from dotenv import load_dotenv
 import os
 load_dotenv()
@@ -32,6 +36,15 @@ async def example_async_tts():
     with open("output.mp3", "wb") as f:
         f.write(speech.read())
 
+async def example_async_tts_stream():
+    tts = ElevenLabsTTSProvider(ELEVENLABS_API_KEY)
+    text = "Hi , How are you. I wanted to invite for the party tonight. If you are willing to come please respond soon."
+    with open("output.mp3", "wb") as f:
+        # Chunks arrive while the synthesis is still running
+        async for chunk in tts.atranscribe_stream(text, model=ElevenLabsTTSModels.ELEVEN_TURBO_V2_5,
+                                                  voice=ElevenLabTTSVoices.ROGER):
+            f.write(chunk)
+
 def example_stt():
     stt = DeepgramSTTProvider(DEEPGRAM_API_KEY)
     file = "output.mp3"
@@ -58,6 +71,50 @@ async def example_async_llm():
     print(response)
 
 
+async def example_async_llm_stream():
+    llm = OpenAILLMProvider(OPENAI_API_KEY)
+    async for delta in llm.achat_stream("What is Black Box problem?"):
+        print(delta, end="", flush=True)
+    print()
+
+
+async def example_async_llm_to_speech():
+    llm = OpenAILLMProvider(OPENAI_API_KEY)
+    tts = ElevenLabsTTSProvider(ELEVENLABS_API_KEY)
+    pipeline = SentencePipeline(tts, max_concurrency=3, voice=ElevenLabTTSVoices.ROGER)
+    with open("output.mp3", "wb") as f:
+        # Audio of the first sentence arrives while the LLM is still writing the rest
+        async for chunk in pipeline.run(llm.achat_stream("Tell me a short story.")):
+            f.write(chunk)
+
+
+async def example_async_conversation():
+    llm = OpenAILLMProvider(OPENAI_API_KEY)
+    # The history is trimmed (and summarized) when the prompt grows past max_tokens
+    conversation = Conversation("You are a friendly receptionist of a dental clinic.",
+                                max_tokens=2000, summarizer=llm)
+    for text in ["Hi, I'd like to book a cleaning.", "Next Tuesday morning, please.", "What did I ask for?"]:
+        print(await llm.achat(text, conversation=conversation))
+
+
+async def example_async_call_session():
+    stt = DeepgramSTTProvider(DEEPGRAM_API_KEY)
+    llm = OpenAILLMProvider(OPENAI_API_KEY)
+    tts = ElevenLabsTTSProvider(ELEVENLABS_API_KEY)
+    # A recording played like the inbound audio of a call, 20 ms frames of 8 kHz 16-bit PCM
+    with open("caller.wav", "rb") as f:
+        caller = FakeAudioSource(sample_rate=8000).add_audio(f.read()).add_silence(2.0)
+    session = CallSession(stt, llm, tts, conversation=Conversation("You are a friendly receptionist."),
+                          stt_kwargs={"sample_rate": 8000}, tts_kwargs={"output_format": "ulaw_8000"},
+                          turn_timeout=20.0, bytes_per_second=caller.bytes_per_second)
+    with open("reply.ulaw", "wb") as f:
+        async for chunk in session.run(caller):
+            f.write(chunk)
+    for turn in session.turns:
+        print(f"{turn.text!r}: stt {turn.stt_latency}, llm {turn.llm_latency}, tts {turn.tts_latency}, "
+              f"total {turn.response_latency}")
+
+
 if __name__ == "__main__":
     # example_llm()
     asyncio.run(example_async_llm())
\ No newline at end of file
@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from aiphonecall.routing.backend_pool import Backend, BackendPool
+from aiphonecall.routing.health import CircuitState, NoHealthyBackendError
+from aiphonecall.utils.deadline import ProviderTimeoutError
+
+
+class FakeProvider:
+    """
+    Provider answering with its name, or raising `error` while it is set.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.error = None
+        self.calls = 0
+
+    def chat(self, **kwargs) -> str:
+        self.calls += 1
+        if self.error is not None:
+            raise self.error
+        return self.name
+
+    async def achat(self, **kwargs) -> str:
+        return self.chat(**kwargs)
+
+    def close(self) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
+
+
+def _pool(*names: str, **health_kwargs) -> tuple[BackendPool, list[FakeProvider]]:
+    providers = [FakeProvider(name) for name in names]
+    pool = BackendPool([Backend(provider=p, name=p.name) for p in providers], **health_kwargs)
+    return pool, providers
+
+
+def _states(pool: BackendPool) -> list[CircuitState]:
+    return [backend.health.state for backend in pool.backends]
+
+
+def test_fails_over_and_opens_circuit():
+    pool, (a, b) = _pool("a", "b", failure_threshold=1, reset_timeout=60)
+    a.error = ConnectionError("down")
+    assert pool.call("chat") == "b"
+    assert _states(pool) == [CircuitState.OPEN, CircuitState.CLOSED]
+    # The open backend is skipped without being sent the request
+    assert pool.call("chat") == "b"
+    assert a.calls == 1
+
+
+def test_failing_backend_ranks_after_healthy_one():
+    pool, (a, b) = _pool("a", "b", failure_threshold=5)
+    a.error = ConnectionError("down")
+    assert pool.call("chat") == "b"
+    assert pool.candidates()[0].name == "b"
+
+
+def test_raises_when_every_circuit_is_open():
+    pool, providers = _pool("a", "b", failure_threshold=1, reset_timeout=60)
+    for provider in providers:
+        provider.error = ConnectionError("down")
+    with pytest.raises(ConnectionError):
+        pool.call("chat")
+    with pytest.raises(NoHealthyBackendError):
+        pool.call("chat")
+
+
+def test_trials_close_every_recovered_circuit():
+    pool, providers = _pool("a", "b", failure_threshold=1, reset_timeout=0)
+    for provider in providers:
+        provider.error = ConnectionError("down")
+    with pytest.raises(ConnectionError):
+        pool.call("chat")
+    assert _states(pool) == [CircuitState.OPEN, CircuitState.OPEN]
+
+    for provider in providers:
+        provider.error = None
+    pool.call("chat")
+    pool.call("chat")
+    assert _states(pool) == [CircuitState.CLOSED, CircuitState.CLOSED]
+
+
+def test_failed_trial_reopens_circuit():
+    pool, (a,) = _pool("a", failure_threshold=1, reset_timeout=0)
+    a.error = ConnectionError("down")
+    with pytest.raises(ConnectionError):
+        pool.call("chat")
+    with pytest.raises(ConnectionError):
+        pool.call("chat")
+    assert _states(pool) == [CircuitState.OPEN]
+    a.error = None
+    assert pool.call("chat") == "a"
+    assert _states(pool) == [CircuitState.CLOSED]
+
+
+def test_request_errors_are_neutral():
+    pool, (a, b) = _pool("a", "b", failure_threshold=1)
+    a.error = ValueError("invalid model")
+    with pytest.raises(ValueError):
+        pool.call("chat")
+    assert b.calls == 0
+    assert a.calls == 1
+    assert _states(pool) == [CircuitState.CLOSED, CircuitState.CLOSED]
+    assert pool.backends[0].health.failures == 0
+
+
+@pytest.mark.parametrize("phase", ["deadline", "rate_limit"])
+def test_caller_timeouts_are_neutral(phase):
+    pool, providers = _pool("a", "b", "c", failure_threshold=1)
+    for provider in providers:
+        provider.error = ProviderTimeoutError(phase, 1.0)
+
+    async def run():
+        with pytest.raises(ProviderTimeoutError):
+            await pool.acall("achat")
+
+    asyncio.run(run())
+    assert [provider.calls for provider in providers] == [1, 0, 0]
+    assert _states(pool) == [CircuitState.CLOSED] * 3
+
+
+def test_backend_timeouts_fail_over():
+    pool, (a, b) = _pool("a", "b", failure_threshold=1)
+    a.error = ProviderTimeoutError("first_byte", 1.0)
+
+    async def run():
+        return await pool.acall("achat")
+
+    assert asyncio.run(run()) == "b"
+    assert _states(pool) == [CircuitState.OPEN, CircuitState.CLOSED]
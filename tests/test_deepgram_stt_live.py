@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from aiphonecall.interfaces.stt_stream_session_interface import STTStreamEventType
+from aiphonecall.stt_providers import DeepgramSTTProvider
+from aiphonecall.utils.transport import HTTPTransport
+
+RESULTS = {"type": "Results", "is_final": True, "speech_final": True, "start": 0.0, "duration": 1.0,
+           "channel": {"alternatives": [{"transcript": "hello", "words": [{"end": 0.8}]}]}}
+
+
+async def _run_session(close_code: int, finish: bool = True) -> tuple[list, list, object]:
+    """
+    Stream a frame through a live session served by a local WebSocket stand-in of
+    Deepgram, which answers it with a final transcript and closes with `close_code`
+    once it receives CloseStream (or right after the transcript).
+    """
+    received = []
+
+    async def listen(request: web.Request) -> web.WebSocketResponse:
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        async for message in ws:
+            if message.type == aiohttp.WSMsgType.BINARY:
+                received.append(message.data)
+                await ws.send_str(json.dumps(RESULTS))
+                if not finish:
+                    await ws.close(code=close_code)
+            elif json.loads(message.data)["type"] == "CloseStream":
+                await ws.close(code=close_code)
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/v1/listen", listen)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = runner.addresses[0][1]
+
+    transport = HTTPTransport()
+    stt = DeepgramSTTProvider("test-key", transport=transport)
+    stt.live_url = f"ws://127.0.0.1:{port}/v1/listen"
+    events, error = [], None
+    try:
+        async with stt.aspeech2text_stream() as session:
+            await session.send(b"\x00" * 320)
+            if finish:
+                await session.finish()
+            try:
+                async for event in session:
+                    events.append(event)
+            except aiohttp.WebSocketError as e:
+                error = e
+    finally:
+        await stt.aclose()
+        await runner.cleanup()
+    return received, events, error
+
+
+def test_live_session_delivers_events_until_finished():
+    received, events, error = asyncio.run(_run_session(aiohttp.WSCloseCode.OK))
+    assert error is None
+    assert received == [b"\x00" * 320]
+    assert [event.type for event in events] == [STTStreamEventType.FINAL]
+    assert events[0].text == "hello"
+    assert events[0].speech_final
+    assert events[0].end == pytest.approx(0.8)
+
+
+def test_live_session_raises_on_abnormal_close():
+    _, events, error = asyncio.run(_run_session(aiohttp.WSCloseCode.INTERNAL_ERROR))
+    assert [event.type for event in events] == [STTStreamEventType.FINAL]
+    assert error is not None
+    assert error.code == aiohttp.WSCloseCode.INTERNAL_ERROR
+
+
+def test_live_session_raises_on_close_before_finish():
+    _, _, error = asyncio.run(_run_session(aiohttp.WSCloseCode.OK, finish=False))
+    assert error is not None
+    assert error.code == aiohttp.WSCloseCode.OK